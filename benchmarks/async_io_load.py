@@ -0,0 +1,126 @@
+"""Load test: blocking vs async outbound I/O under a bounded thread pool.
+
+Starts a stub Places API (every response delayed by ``--latency`` ms) and
+resolves ``--requests`` distinct business names concurrently, two ways:
+
+* ``sync``  — ``resolve_google_place`` in a worker thread, the way FastAPI runs
+  a plain ``def`` route (pool capped at ``--threads``, like Starlette's).
+* ``async`` — ``resolve_google_place_async`` on the shared ``httpx`` client.
+
+Every lookup misses the cache, so each one costs exactly one upstream call.
+
+    python -m benchmarks.async_io_load [--requests 200] [--threads 40] [--latency 100] [--json out.json]
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import socket
+import statistics
+import time
+from pathlib import Path
+
+import anyio.to_thread
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from services import places_cache, resolve_google_place, resolve_google_place_async
+from services.http import close_async_client
+
+
+def _stub_app(latency: float) -> Starlette:
+    async def search_text(request: Request):
+        query = (await request.json())["textQuery"]
+        await asyncio.sleep(latency)
+        return JSONResponse({"places": [{"id": f"stub-{query}", "displayName": {"text": query}}]})
+
+    return Starlette(routes=[Route("/v1/places:searchText", search_text, methods=["POST"])])
+
+
+def _serve_stub(sock: socket.socket, latency: float) -> None:
+    uvicorn.Server(uvicorn.Config(_stub_app(latency), log_level="warning", backlog=2048)).run(sockets=[sock])
+
+
+def _start_stub(latency: float) -> tuple[multiprocessing.Process, str]:
+    """Run the stub in its own process so it doesn't compete for this one's GIL."""
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    proc = multiprocessing.Process(target=_serve_stub, args=(sock, latency), daemon=True)
+    proc.start()
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.1).close()
+            break
+        except OSError:
+            time.sleep(0.05)
+    return proc, f"http://127.0.0.1:{port}/v1"
+
+
+async def _scenario(mode: str, n: int, threads: int) -> dict:
+    anyio.to_thread.current_default_thread_limiter().total_tokens = threads
+    latencies: list[float] = []
+
+    async def one(i: int) -> None:
+        name = f"{mode} cafe {i}"
+        t0 = time.perf_counter()
+        if mode == "sync":
+            result = await anyio.to_thread.run_sync(resolve_google_place, name)
+        else:
+            result = await resolve_google_place_async(name)
+        assert result, name
+        latencies.append((time.perf_counter() - t0) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(n)))
+    elapsed = time.perf_counter() - start
+    await close_async_client()
+
+    latencies.sort()
+    return {
+        "requests": n,
+        "seconds": round(elapsed, 3),
+        "rps": round(n / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies), 1),
+        "p95_ms": round(latencies[int(0.95 * (n - 1))], 1),
+    }
+
+
+def run(n: int, threads: int, latency_ms: float) -> dict:
+    proc, base = _start_stub(latency_ms / 1000)
+    os.environ["PLACES_API_BASE"] = base
+    os.environ["GOOGLE_MAPS_API_KEY"] = "bench"
+    results = {}
+    try:
+        for mode in ("sync", "async"):
+            places_cache.clear()
+            results[mode] = asyncio.run(_scenario(mode, n, threads))
+    finally:
+        proc.terminate()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--threads", type=int, default=40)
+    parser.add_argument("--latency", type=float, default=100.0, help="stub latency in ms")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    results = run(args.requests, args.threads, args.latency)
+    print(f"{'mode':<6} {'seconds':>8} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8}")
+    for mode, r in results.items():
+        print(f"{mode:<6} {r['seconds']:>8.3f} {r['rps']:>8.1f} {r['p50_ms']:>8.1f} {r['p95_ms']:>8.1f}")
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,280 @@
+"""Benchmark: /api/dashboard queries on a seeded SQLite database.
+
+Seeds ``--rows`` review requests spread over ``--businesses`` businesses,
+then times, for random businesses:
+
+* ``legacy``  — the old three statements (two COUNTs + newest 100 rows)
+  without the composite indexes
+* ``current`` — ``routes.api.dashboard_stats`` with
+  ``(business_id, created_at)`` and ``(business_id, status)`` indexed
+* ``offset_last_page`` / ``keyset_last_page`` — the oldest page of the list,
+  reached with OFFSET vs with a keyset cursor
+* ``timeseries_raw`` / ``timeseries_rollup`` — 90 days of sends and clicks,
+  grouped from raw rows vs read from ``daily_review_stats``
+
+Every statement ``current`` issues is run through ``EXPLAIN QUERY PLAN``; the
+run fails if any of them scans ``review_requests`` or sorts in a temp B-tree.
+
+    python -m benchmarks.dashboard_query [--rows 1000000] [--db bench.db] [--json out.json]
+"""
+
+import argparse
+import json
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Optional
+
+from sqlalchemy import create_engine, event, func
+from sqlalchemy.orm import sessionmaker
+
+from database import Base
+from models import ReviewRequest
+from routes.api import dashboard_stats
+from services.stats import rebuild_stats, review_timeseries
+
+STATUSES = ["pending", "sent", "sent", "clicked"]
+COMPOSITE = ("ix_review_requests_business_created", "ix_review_requests_business_status")
+
+
+def legacy_dashboard(business_id: int, db) -> dict:
+    """The endpoint as it was: two COUNT scans plus the newest 100 rows."""
+    total = db.query(func.count(ReviewRequest.id)).filter(ReviewRequest.business_id == business_id).scalar()
+    clicked = db.query(func.count(ReviewRequest.id)).filter(
+        ReviewRequest.business_id == business_id, ReviewRequest.status == "clicked"
+    ).scalar()
+    reviews = (
+        db.query(ReviewRequest)
+        .filter(ReviewRequest.business_id == business_id)
+        .order_by(ReviewRequest.created_at.desc())
+        .limit(100)
+        .all()
+    )
+    return {"total": total, "clicked": clicked, "reviews": len(reviews)}
+
+
+def seed(path: Path, rows: int, businesses: int) -> None:
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    engine.dispose()
+
+    rng = random.Random(42)
+    start = datetime(2024, 1, 1)
+    conn = sqlite3.connect(path)
+    conn.executemany(
+        "INSERT INTO businesses (id, name, google_place_id, created_at) VALUES (?, ?, ?, ?)",
+        ((i, f"Business {i}", f"place{i}", start.isoformat(" ")) for i in range(1, businesses + 1)),
+    )
+    def row(i: int) -> tuple:
+        status = rng.choice(STATUSES)
+        created = start + timedelta(seconds=i * 30)
+        sent = created + timedelta(minutes=1) if status != "pending" else None
+        clicked = created + timedelta(hours=1) if status == "clicked" else None
+        return (
+            rng.randint(1, businesses),
+            f"555{i:07d}",
+            f"c{i:07d}",
+            "Great service, friendly staff and quick turnaround.",
+            status,
+            created.isoformat(" "),
+            sent.isoformat(" ") if sent else None,
+            clicked.isoformat(" ") if clicked else None,
+        )
+
+    conn.executemany(
+        "INSERT INTO review_requests"
+        " (business_id, customer_contact, short_code, review_text, status, created_at, sent_at, clicked_at)"
+        " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        (row(i) for i in range(rows)),
+    )
+    conn.commit()
+    conn.close()
+
+    engine = create_engine(f"sqlite:///{path}")
+    with sessionmaker(bind=engine)() as db:
+        rebuild_stats(db)
+    engine.dispose()
+
+
+def _set_indexes(path: Path, present: bool) -> None:
+    conn = sqlite3.connect(path)
+    if present:
+        conn.execute("CREATE INDEX IF NOT EXISTS ix_review_requests_business_created ON review_requests (business_id, created_at)")
+        conn.execute("CREATE INDEX IF NOT EXISTS ix_review_requests_business_status ON review_requests (business_id, status)")
+        conn.execute("ANALYZE")
+    else:
+        for name in COMPOSITE:
+            conn.execute(f"DROP INDEX IF EXISTS {name}")
+    conn.commit()
+    conn.close()
+
+
+def _time(fn, session_factory, business_ids: list[int]) -> dict:
+    timings = []
+    for business_id in business_ids:
+        db = session_factory()
+        try:
+            t0 = time.perf_counter()
+            fn(business_id, db=db)
+            timings.append((time.perf_counter() - t0) * 1000)
+        finally:
+            db.close()
+    timings.sort()
+    return {
+        "p50_ms": round(statistics.median(timings), 2),
+        "p95_ms": round(timings[int(0.95 * (len(timings) - 1))], 2),
+        "max_ms": round(timings[-1], 2),
+    }
+
+
+def legacy_timeseries(business_id: int, db, days: int = 90) -> list:
+    """90 days of sends/clicks computed from raw rows (what the rollup replaces)."""
+    end = db.query(func.max(ReviewRequest.created_at)).scalar()
+    start = end - timedelta(days=days)
+    result = []
+    for column in (ReviewRequest.sent_at, ReviewRequest.clicked_at):
+        result += (
+            db.query(func.date(column), func.count(ReviewRequest.id))
+            .filter(ReviewRequest.business_id == business_id, column >= start)
+            .group_by(func.date(column))
+            .all()
+        )
+    return result
+
+
+def _deep_cursor(db, business_id: int) -> str:
+    """Cursor for the last page of a business's history."""
+    from routes.api import _encode_cursor
+
+    total = db.query(func.count(ReviewRequest.id)).filter(ReviewRequest.business_id == business_id).scalar()
+    row = (
+        db.query(ReviewRequest.created_at, ReviewRequest.id)
+        .filter(ReviewRequest.business_id == business_id)
+        .order_by(ReviewRequest.created_at.desc(), ReviewRequest.id.desc())
+        .offset(max(0, total - 101))
+        .first()
+    )
+    return _encode_cursor(row.created_at, row.id)
+
+
+def legacy_deep_page(business_id: int, db) -> int:
+    """OFFSET paging to the same page, for comparison."""
+    total = db.query(func.count(ReviewRequest.id)).filter(ReviewRequest.business_id == business_id).scalar()
+    return len(
+        db.query(ReviewRequest)
+        .filter(ReviewRequest.business_id == business_id)
+        .order_by(ReviewRequest.created_at.desc())
+        .offset(max(0, total - 100))
+        .limit(100)
+        .all()
+    )
+
+
+def _explain(engine, business_id: int) -> list[str]:
+    db = sessionmaker(bind=engine)()
+    deep = _deep_cursor(db, business_id)
+    statements = []
+    listener = lambda conn, cursor, statement, params, *rest: statements.append((statement, params))  # noqa: E731
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        dashboard_stats(business_id, db=db)
+        dashboard_stats(business_id, cursor=deep, db=db)
+    finally:
+        db.close()
+        event.remove(engine, "before_cursor_execute", listener)
+
+    plans = []
+    with engine.connect() as conn:
+        for statement, params in statements:
+            rows = conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, tuple(params))
+            plan = " | ".join(row[-1] for row in rows)
+            if "SCAN review_requests" in plan or "TEMP B-TREE" in plan:
+                raise SystemExit(f"Unindexed dashboard query:\n{statement}\n{plan}")
+            plans.append(plan)
+    return plans
+
+
+def run(rows: int, businesses: int, samples: int, db_path: Optional[str]) -> dict:
+    tmp = None
+    if db_path:
+        path = Path(db_path)
+    else:
+        tmp = tempfile.TemporaryDirectory()
+        path = Path(tmp.name) / "dashboard.db"
+    try:
+        if not path.exists():
+            t0 = time.perf_counter()
+            seed(path, rows, businesses)
+            print(f"seeded {rows} rows in {time.perf_counter() - t0:.1f}s")
+
+        engine = create_engine(f"sqlite:///{path}")
+        session_factory = sessionmaker(bind=engine)
+        rng = random.Random(1)
+        business_ids = [rng.randint(1, businesses) for _ in range(samples)]
+
+        _set_indexes(path, present=False)
+        legacy = _time(legacy_dashboard, session_factory, business_ids)
+        _set_indexes(path, present=True)
+        current = _time(dashboard_stats, session_factory, business_ids)
+        offset_deep = _time(legacy_deep_page, session_factory, business_ids)
+
+        db = session_factory()
+        cursors = {business_id: _deep_cursor(db, business_id) for business_id in set(business_ids)}
+        db.close()
+        keyset_deep = _time(
+            lambda business_id, db: dashboard_stats(business_id, cursor=cursors[business_id], db=db),
+            session_factory,
+            business_ids,
+        )
+        db = session_factory()
+        last_day = db.query(func.max(ReviewRequest.created_at)).scalar().date()
+        db.close()
+        raw_series = _time(legacy_timeseries, session_factory, business_ids)
+        rollup_series = _time(
+            lambda business_id, db: review_timeseries(db, business_id, 90, today=last_day),
+            session_factory,
+            business_ids,
+        )
+        plans = _explain(engine, business_ids[0])
+        engine.dispose()
+        return {
+            "rows": rows,
+            "legacy": legacy,
+            "current": current,
+            "offset_last_page": offset_deep,
+            "keyset_last_page": keyset_deep,
+            "timeseries_raw": raw_series,
+            "timeseries_rollup": rollup_series,
+            "plans": plans,
+        }
+    finally:
+        if tmp:
+            tmp.cleanup()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--businesses", type=int, default=200)
+    parser.add_argument("--samples", type=int, default=30)
+    parser.add_argument("--db", help="reuse (or create) this SQLite file instead of a temp one")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    results = run(args.rows, args.businesses, args.samples, args.db)
+    print(f"{'variant':<17} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8}")
+    for variant in ("legacy", "current", "offset_last_page", "keyset_last_page", "timeseries_raw", "timeseries_rollup"):
+        r = results[variant]
+        print(f"{variant:<17} {r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f} {r['max_ms']:>8.2f}")
+    for plan in results["plans"]:
+        print("plan:", plan)
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
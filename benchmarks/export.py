@@ -0,0 +1,147 @@
+"""Benchmark: peak RSS and time to first byte of a review-request export, by row count.
+
+Seeds one business with ``max(--rows)`` review requests spread evenly over
+time, then exports the first N of them (a ``until`` date range) for each N,
+each run in a fresh subprocess so its peak RSS is its own:
+
+* ``legacy``    — the rows loaded as ORM objects with ``.all()`` and the
+  whole CSV built before the first byte is sent
+* ``streaming`` — ``services.export.stream``: a ``yield_per`` cursor,
+  written out chunk by chunk
+
+Peak RSS is ``ru_maxrss`` of the child; ``baseline`` is its RSS once
+everything is imported, before the export starts. Time to first byte is
+when the first chunk is ready, time to first row when the first data row is.
+
+    python -m benchmarks.export [--rows 10000,100000,500000] [--json out.json]
+"""
+
+import argparse
+import csv
+import io
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+DAYS = 120
+# The seed's last row is created just before this.
+END = datetime(2025, 1, 1)
+
+
+def _rss_mb() -> float:
+    # kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def legacy_export(db, business_id: int, until: datetime) -> bytes:
+    """Load every row, then build the whole file."""
+    from models import ReviewRequest
+    from services.export import FIELDS, _csv_cell
+
+    records = (
+        db.query(ReviewRequest)
+        .filter(ReviewRequest.business_id == business_id, ReviewRequest.created_at < until)
+        .order_by(ReviewRequest.created_at, ReviewRequest.id)
+        .all()
+    )
+    buffer = io.StringIO()
+    out = csv.writer(buffer)
+    out.writerow(FIELDS)
+    for r in records:
+        out.writerow([_csv_cell(getattr(r, f)) for f in FIELDS])
+    return buffer.getvalue().encode()
+
+
+def _child(mode: str, url: str, until: str) -> None:
+    """Run one export into /dev/null and print its measurements as JSON."""
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+
+    from services.export import FIELDS, stream
+
+    db = sessionmaker(bind=create_engine(url))()
+    until_dt = datetime.fromisoformat(until)
+    baseline = _rss_mb()
+    first_byte = first_row = None
+    size = 0
+    header = len(",".join(FIELDS)) + 2
+    t0 = time.perf_counter()
+    with open(os.devnull, "wb") as sink:
+        chunks = [legacy_export(db, 1, until_dt)] if mode == "legacy" else stream(db, 1, "csv", until=until_dt)
+        for chunk in chunks:
+            if first_byte is None:
+                first_byte = time.perf_counter() - t0
+            sink.write(chunk)
+            size += len(chunk)
+            if first_row is None and size > header:
+                first_row = time.perf_counter() - t0
+    seconds = time.perf_counter() - t0
+    print(json.dumps({
+        "seconds": round(seconds, 2),
+        "first_byte_ms": round(first_byte * 1000, 1),
+        "first_row_ms": round(first_row * 1000, 1),
+        "baseline_rss_mb": round(baseline, 1),
+        "peak_rss_mb": round(_rss_mb(), 1),
+        "output_mb": round(size / 1e6, 1),
+    }))
+
+
+def _measure(mode: str, url: str, until: datetime) -> dict:
+    out = subprocess.run(
+        [sys.executable, "-m", "benchmarks.export", "--child", mode, url, until.isoformat()],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    return json.loads(out.stdout)
+
+
+def run(rows: list[int]) -> dict:
+    from benchmarks.seed import seed
+
+    total = max(rows)
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{tmp}/export.db"
+        seed(url, businesses=1, requests=total, days=DAYS)
+        start = END - timedelta(days=DAYS)
+        results = []
+        for n in sorted(rows):
+            # Rows are evenly spaced, so the first n end just before this.
+            until = start + timedelta(seconds=DAYS * 86400 * n / total)
+            results.append({
+                "rows": n,
+                "legacy": _measure("legacy", url, until),
+                "streaming": _measure("streaming", url, until),
+            })
+        return {"results": results}
+
+
+def main() -> None:
+    if len(sys.argv) == 5 and sys.argv[1] == "--child":
+        _child(*sys.argv[2:])
+        return
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", default="10000,100000,500000", help="comma-separated row counts")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    results = run([int(n) for n in args.rows.split(",")])
+    print(f"{'rows':>8} {'mode':<10} {'seconds':>8} {'first byte':>11} {'first row':>11}"
+          f" {'baseline':>9} {'peak RSS':>9} {'output':>9}")
+    for row in results["results"]:
+        for mode in ("legacy", "streaming"):
+            r = row[mode]
+            print(f"{row['rows']:>8} {mode:<10} {r['seconds']:>8.2f} {r['first_byte_ms']:>8.1f} ms"
+                  f" {r['first_row_ms']:>8.1f} ms {r['baseline_rss_mb']:>6.1f} MB {r['peak_rss_mb']:>6.1f} MB"
+                  f" {r['output_mb']:>6.1f} MB")
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+"""Benchmark: origin bytes and latency of /r/{code} during an SMS blast.
+
+Seeds ``--codes`` sent review requests and replays ``--clicks`` clicks on
+them through the app in-process: each click opens the next unopened link,
+except that ``--revisit`` of them come back to one already opened (customers
+tapping the SMS twice, link previews).
+
+* ``legacy``  — the old landing page: CSS and JS inlined, no validators, so
+  every click downloads the full page
+* ``current`` — markup plus inline payload with immutable ``/a/`` assets;
+  revisits send ``If-None-Match`` and get a 304. The assets are counted once,
+  as a CDN would fetch them
+
+Origin bytes include the status line and headers.
+
+    python -m benchmarks.landing [--codes 20000] [--clicks 20000] [--revisit 0.3] [--json out.json]
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+os.environ.setdefault("DB_INIT_ON_STARTUP", "0")
+# One in-process client plays every recipient: no per-IP or per-code shedding.
+os.environ.setdefault("SHORT_LINK_RATE_PER_IP", "0")
+os.environ.setdefault("SHORT_LINK_RATE_PER_CODE", "0")
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+from starlette.testclient import TestClient
+
+from benchmarks.seed import seed
+from database import get_read_db
+from main import app
+from models import ReviewRequest
+from services import assets, click_recorder, short_link_cache
+
+
+def legacy_render_landing(review_text: str, place_id: str) -> bytes:
+    """The page as it was: ~2 KB with the CSS and JS inlined, rebuilt for every code."""
+    review_url = f"https://search.google.com/local/writereview?placeid={place_id}"
+    review_text_json = json.dumps(review_text)
+
+    return f"""\
+<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width,initial-scale=1">
+<title>Redirecting…</title>
+<style>
+  body {{ margin:0; display:flex; align-items:center; justify-content:center;
+         min-height:100vh; font-family:system-ui,sans-serif; background:#fafafa; color:#333; }}
+  .wrap {{ text-align:center; padding:2rem; }}
+  .btn {{ display:inline-block; margin:.5rem; padding:.6rem 1.2rem; border:none;
+          border-radius:.5rem; font-size:.9rem; cursor:pointer; text-decoration:none; }}
+  .copy {{ background:#ffe17c; color:#171e19; }}
+  .open {{ background:#171e19; color:#fff; }}
+  .hidden {{ display:none; }}
+</style>
+</head>
+<body>
+<div class="wrap">
+  <p id="status">Copying review &amp; redirecting to Google…</p>
+  <div id="fallback" class="hidden">
+    <button class="btn copy" onclick="doCopy()">Copy Review Text</button>
+    <a class="btn open" href="{review_url}">Open Google Reviews</a>
+  </div>
+</div>
+<script>
+const reviewText = {review_text_json};
+const reviewUrl = "{review_url}";
+async function doCopy() {{
+  try {{
+    await navigator.clipboard.writeText(reviewText);
+    document.querySelector('.copy').textContent = 'Copied!';
+  }} catch(e) {{
+    prompt('Copy this review:', reviewText);
+  }}
+}}
+(async () => {{
+  try {{
+    await navigator.clipboard.writeText(reviewText);
+    document.getElementById('status').textContent = 'Review copied! Redirecting…';
+    setTimeout(() => {{ window.location.href = reviewUrl; }}, 1500);
+  }} catch(e) {{
+    document.getElementById('status').textContent = 'Tap Copy, then open Google Reviews.';
+    document.getElementById('fallback').classList.remove('hidden');
+  }}
+}})();
+</script>
+</body>
+</html>""".encode("utf-8")
+
+
+def _wire_bytes(resp) -> int:
+    status_line = len(f"HTTP/1.1 {resp.status_code} {resp.reason_phrase}\r\n")
+    headers = sum(len(k) + len(v) + 4 for k, v in resp.headers.raw)
+    return status_line + headers + 2 + len(resp.content)
+
+
+def _blast(client: TestClient, codes: list[str], clicks: int, revisit: float, conditional: bool) -> dict:
+    rng = random.Random(7)
+    fresh = iter(codes)
+    seen: dict[str, str] = {}
+    opened: list[str] = []
+    timings, origin, not_modified = [], 0, 0
+    for _ in range(clicks):
+        code = next(fresh, None) if not seen or rng.random() >= revisit else None
+        if code is None:
+            code = rng.choice(opened)
+        headers = {"If-None-Match": seen[code]} if conditional and code in seen else {}
+        t0 = time.perf_counter()
+        resp = client.get(f"/r/{code}", headers=headers)
+        timings.append((time.perf_counter() - t0) * 1000)
+        assert resp.status_code in (200, 304), resp.status_code
+        not_modified += resp.status_code == 304
+        origin += _wire_bytes(resp)
+        if code not in seen:
+            seen[code] = resp.headers.get("etag", "")
+            opened.append(code)
+    timings.sort()
+    return {
+        "clicks": clicks,
+        "not_modified": not_modified,
+        "origin_bytes": origin,
+        "bytes_per_click": round(origin / clicks, 1),
+        "p50_ms": round(statistics.median(timings), 3),
+        "p95_ms": round(timings[int(0.95 * (len(timings) - 1))], 3),
+    }
+
+
+def run(codes: int = 20000, clicks: int = 20000, revisit: float = 0.3) -> dict:
+    with tempfile.TemporaryDirectory(prefix="landing-bench-") as tmp:
+        url = f"sqlite:///{tmp}/landing.db"
+        seed(url, businesses=20, requests=codes * 2)
+        engine = create_engine(url)
+        factory = sessionmaker(bind=engine)
+        with factory() as db:
+            sent = list(db.scalars(select(ReviewRequest.short_code).where(ReviewRequest.status == "sent")))
+
+        def read_db():
+            with factory() as db:
+                yield db
+
+        app.dependency_overrides[get_read_db] = read_db
+        click_recorder.session_factory = factory
+        results = {}
+        try:
+            with TestClient(app) as client:
+                short_link_cache.clear()
+                with patch("routes.public._render_landing", legacy_render_landing):
+                    results["legacy"] = _blast(client, sent[:codes], clicks, revisit, conditional=False)
+                    results["legacy"]["page_bytes"] = len(legacy_render_landing("x" * 200, "p" * 27))
+
+                short_link_cache.clear()
+                results["current"] = _blast(client, sent[codes:2 * codes] or sent[:codes], clicks, revisit, conditional=True)
+                results["current"]["page_bytes"] = len(_current_page())
+                asset_bytes = sum(_wire_bytes(client.get(assets.url(name))) for name in assets.ASSETS)
+                results["current"]["asset_bytes"] = asset_bytes
+                results["current"]["origin_bytes"] += asset_bytes
+                results["current"]["bytes_per_click"] = round(results["current"]["origin_bytes"] / clicks, 1)
+        finally:
+            app.dependency_overrides.pop(get_read_db, None)
+            short_link_cache.clear()
+            engine.dispose()
+
+    results["origin_bytes_saved_pct"] = round(
+        100 * (1 - results["current"]["origin_bytes"] / results["legacy"]["origin_bytes"]), 1
+    )
+    return results
+
+
+def _current_page() -> bytes:
+    from routes.public import _render_landing
+
+    return _render_landing("x" * 200, "p" * 27)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--codes", type=int, default=20000)
+    parser.add_argument("--clicks", type=int, default=20000)
+    parser.add_argument("--revisit", type=float, default=0.3, help="share of clicks on an already opened link")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    results = run(args.codes, args.clicks, args.revisit)
+    for name in ("legacy", "current"):
+        r = results[name]
+        print(f"{name:<8} page {r['page_bytes']:>5} B  {r['bytes_per_click']:>7.1f} B/click  "
+              f"{r['origin_bytes'] / 1e6:>6.2f} MB total  304s {r['not_modified']:>6}  "
+              f"p50 {r['p50_ms']:.3f} ms  p95 {r['p95_ms']:.3f} ms")
+    print(f"origin bytes saved: {results['origin_bytes_saved_pct']}%")
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
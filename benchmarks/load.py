@@ -0,0 +1,366 @@
+"""Load test of the whole request pipeline against a seeded database and stubbed services.
+
+Seeds a fresh SQLite database (``benchmarks.seed``), starts the Places,
+Twilio and SMTP stubs (``benchmarks.stubs``), runs the app under uvicorn in a
+child process pointed at them and drives it with an asyncio client:
+
+* ``clicks``    — ``GET /r/{code}`` storm, most hits on a small set of hot codes
+* ``send``      — ``POST /api/send`` batches of pending requests, each polled on
+  ``/api/jobs/{id}`` until delivered; latency is end to end per batch
+* ``dashboard`` — first page of ``/api/dashboard``, the next page through
+  ``next_cursor``, and ``/api/dashboard/timeseries``
+* ``resolve``   — ``/api/resolve-place`` by business name, half of them repeats
+
+Each scenario reports count, errors, p50/p95/p99 latency and throughput. With
+``--json`` the results are written together with the commit they were measured
+on; ``--compare`` prints the change against an earlier results file.
+
+    python -m benchmarks.load [--requests 50000] [--concurrency 32] [--json out.json] [--compare base.json]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+
+import httpx
+from sqlalchemy import create_engine, text
+
+from benchmarks.seed import seed
+from benchmarks.stubs import places_app, start_http_stub, start_smtp_stub, twilio_app
+
+ROOT = Path(__file__).resolve().parent.parent
+SCENARIOS = ("clicks", "send", "dashboard", "resolve")
+# httpx's own User-Agent would be answered as a link preview on /r/{code}.
+BROWSER_UA = "Mozilla/5.0 (iPhone; CPU iPhone OS 17_0 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Mobile/15E148"
+
+
+def _percentile(ordered: list[float], q: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def _summary(latencies: list[float], errors: int, elapsed: float, units: Optional[int] = None) -> dict:
+    ordered = sorted(latencies)
+    result = {
+        "count": len(latencies),
+        "errors": errors,
+        "p50_ms": round(_percentile(ordered, 0.50) * 1000, 2),
+        "p95_ms": round(_percentile(ordered, 0.95) * 1000, 2),
+        "p99_ms": round(_percentile(ordered, 0.99) * 1000, 2),
+        "rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+    }
+    if units is not None:
+        result["msgs_per_s"] = round(units / elapsed, 1) if elapsed else 0.0
+    return result
+
+
+async def _drive(total: int, concurrency: int, request) -> dict:
+    """Call ``request(i)`` for i in range(total) from ``concurrency`` workers."""
+    latencies: list[float] = []
+    errors = 0
+    next_i = 0
+
+    async def worker():
+        nonlocal errors, next_i
+        while next_i < total:
+            i, next_i = next_i, next_i + 1
+            start = time.perf_counter()
+            try:
+                ok = await request(i)
+            except httpx.HTTPError:
+                ok = False
+            latencies.append(time.perf_counter() - start)
+            errors += not ok
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return {"latencies": latencies, "errors": errors, "elapsed": time.perf_counter() - start}
+
+
+# ── Scenarios ────────────────────────────────────────────────────────────────
+
+async def clicks(client: httpx.AsyncClient, fixtures: dict, count: int, concurrency: int) -> dict:
+    rng = random.Random(1)
+    codes = fixtures["sent_codes"]
+    hot = codes[:50]
+    picks = [rng.choice(hot) if rng.random() < 0.8 else rng.choice(codes) for _ in range(count)]
+
+    async def one(i):
+        resp = await client.get(f"/r/{picks[i]}")
+        return resp.status_code == 200
+
+    run = await _drive(count, concurrency, one)
+    return _summary(run["latencies"], run["errors"], run["elapsed"])
+
+
+async def send(client: httpx.AsyncClient, fixtures: dict, batches: int, batch_size: int, concurrency: int) -> dict:
+    pending = fixtures["pending_ids"]
+    carrier = fixtures["carrier"]
+    delivered = 0
+
+    async def one(i):
+        nonlocal delivered
+        ids = pending[i * batch_size:(i + 1) * batch_size]
+        items = [{"id": rid, "sms_body": f"Thanks for visiting! Review #{rid}"} for rid in ids]
+        resp = await client.post("/api/send", json={"reviews": items, "carrier": carrier})
+        if resp.status_code != 202:
+            return False
+        job_id = resp.json()["job_id"]
+        deadline = time.monotonic() + 120
+        while time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+            progress = (await client.get(f"/api/jobs/{job_id}")).json()
+            if progress["status"] == "done":
+                delivered += len(progress["sent"])
+                return not progress["failed"]
+        return False
+
+    batches = min(batches, len(pending) // batch_size)
+    run = await _drive(batches, concurrency, one)
+    return _summary(run["latencies"], run["errors"], run["elapsed"], units=delivered)
+
+
+async def dashboard(client: httpx.AsyncClient, fixtures: dict, count: int, concurrency: int) -> dict:
+    rng = random.Random(3)
+    businesses = fixtures["business_ids"]
+
+    async def one(i):
+        business_id = rng.choice(businesses)
+        kind = i % 3
+        if kind == 2:
+            resp = await client.get("/api/dashboard/timeseries", params={"business_id": business_id, "days": 90})
+            return resp.status_code == 200
+        resp = await client.get("/api/dashboard", params={"business_id": business_id, "limit": 50})
+        if resp.status_code != 200:
+            return False
+        cursor = resp.json()["next_cursor"]
+        if kind == 1 and cursor:
+            resp = await client.get("/api/dashboard", params={"business_id": business_id, "limit": 50, "cursor": cursor})
+        return resp.status_code == 200
+
+    run = await _drive(count, concurrency, one)
+    return _summary(run["latencies"], run["errors"], run["elapsed"])
+
+
+async def resolve(client: httpx.AsyncClient, fixtures: dict, count: int, concurrency: int) -> dict:
+    names = [f"Bench Diner {i // 2}" for i in range(count)]
+
+    async def one(i):
+        resp = await client.get("/api/resolve-place", params={"url": names[i]})
+        return resp.status_code == 200
+
+    run = await _drive(count, concurrency, one)
+    return _summary(run["latencies"], run["errors"], run["elapsed"])
+
+
+# ── Setup ────────────────────────────────────────────────────────────────────
+
+def _fixtures(url: str, sms_backend: str) -> dict:
+    engine = create_engine(url)
+    with engine.connect() as conn:
+        fixtures = {
+            "business_ids": [r[0] for r in conn.execute(text("SELECT id FROM businesses ORDER BY id"))],
+            "sent_codes": [r[0] for r in conn.execute(
+                text("SELECT short_code FROM review_requests WHERE status = 'sent' ORDER BY id LIMIT 20000")
+            )],
+            "pending_ids": [r[0] for r in conn.execute(
+                text("SELECT id FROM review_requests WHERE status = 'pending' ORDER BY id")
+            )],
+        }
+    engine.dispose()
+    fixtures["carrier"] = "tmobile" if sms_backend == "email" else ""
+    return fixtures
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _start_app(env: dict, workers: int) -> tuple[subprocess.Popen, str]:
+    port = _free_port()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning", "--no-access-log"],
+        cwd=ROOT,
+        env=env,
+    )
+    base = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"App exited with code {proc.returncode}")
+        try:
+            if httpx.get(f"{base}/api/carriers", timeout=1).status_code == 200:
+                return proc, base
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.1)
+    proc.kill()
+    raise RuntimeError("App did not start")
+
+
+def _commit() -> dict:
+    def git(*args):
+        out = subprocess.run(["git", *args], cwd=ROOT, capture_output=True, text=True)
+        return out.stdout.strip() if out.returncode == 0 else None
+
+    return {"commit": git("rev-parse", "HEAD"), "dirty": bool(git("status", "--porcelain", "--untracked-files=no"))}
+
+
+def run(
+    requests: int = 50_000,
+    businesses: int = 200,
+    count: int = 2000,
+    concurrency: int = 32,
+    batches: int = 20,
+    batch_size: int = 50,
+    latency_ms: float = 50.0,
+    sms_backend: str = "twilio",
+    workers: int = 1,
+    scenarios: tuple = SCENARIOS,
+) -> dict:
+    latency = latency_ms / 1000
+    stubs, app = [], None
+    with tempfile.TemporaryDirectory(prefix="review-boost-load-") as tmp:
+        url = f"sqlite:///{tmp}/load.db"
+        seeded = seed(url, businesses, requests)
+        fixtures = _fixtures(url, sms_backend)
+        try:
+            places, places_base = start_http_stub(places_app, latency=latency)
+            twilio, twilio_base = start_http_stub(twilio_app, latency=latency)
+            smtp, smtp_port = start_smtp_stub()
+            stubs += [places, twilio, smtp]
+            env = {
+                **os.environ,
+                "DATABASE_URL": url,
+                "DB_INIT_ON_STARTUP": "0",
+                "OUTBOX_WORKER": "thread",
+                "SMS_BACKEND": sms_backend,
+                "TWILIO_API_BASE": twilio_base,
+                "TWILIO_ACCOUNT_SID": "AC" + "0" * 32,
+                "TWILIO_AUTH_TOKEN": "load-test",
+                "TWILIO_FROM_NUMBER": "+15550000000",
+                "TWILIO_MESSAGING_SERVICE_SID": "",
+                "SMTP_HOST": "127.0.0.1",
+                "SMTP_PORT": str(smtp_port),
+                "SMTP_USER": "load@example.com",
+                "SMTP_PASSWORD": "load-test",
+                "SMTP_STARTTLS": "0",
+                "PLACES_API_BASE": f"{places_base}/v1",
+                "GOOGLE_MAPS_API_KEY": "load-test",
+                "OTEL_EXPORTER_OTLP_ENDPOINT": "",
+                # Every click comes from this one address, mostly on 50 hot codes.
+                "SHORT_LINK_RATE_PER_IP": "0",
+                "SHORT_LINK_RATE_PER_CODE": "0",
+            }
+            app, base = _start_app(env, workers)
+            results = asyncio.run(_scenarios(base, fixtures, scenarios, count, concurrency, batches, batch_size))
+        finally:
+            if app is not None:
+                app.terminate()
+                app.wait(30)
+            for stub in stubs:
+                stub.terminate()
+                stub.join(10)
+
+    return {
+        **_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "params": {
+            "requests": requests, "businesses": businesses, "count": count, "concurrency": concurrency,
+            "batches": batches, "batch_size": batch_size, "latency_ms": latency_ms,
+            "sms_backend": sms_backend, "workers": workers,
+        },
+        "seed_seconds": seeded["seconds"],
+        "scenarios": results,
+    }
+
+
+async def _scenarios(base: str, fixtures: dict, scenarios: tuple, count: int, concurrency: int,
+                     batches: int, batch_size: int) -> dict:
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    results = {}
+    async with httpx.AsyncClient(base_url=base, limits=limits, timeout=60, headers={"User-Agent": BROWSER_UA}) as client:
+        for name in scenarios:
+            if name == "clicks":
+                results[name] = await clicks(client, fixtures, count, concurrency)
+            elif name == "send":
+                results[name] = await send(client, fixtures, batches, batch_size, max(1, concurrency // 8))
+            elif name == "dashboard":
+                results[name] = await dashboard(client, fixtures, count, concurrency)
+            elif name == "resolve":
+                results[name] = await resolve(client, fixtures, min(count, 500), concurrency)
+    return results
+
+
+def compare(current: dict, baseline: dict) -> list[str]:
+    """One line per scenario metric: baseline -> current and the relative change."""
+    lines = [f"vs {(baseline.get('commit') or 'unknown')[:10]} ({baseline.get('timestamp', '?')})"]
+    for name, now in current["scenarios"].items():
+        before = baseline.get("scenarios", {}).get(name)
+        if not before:
+            continue
+        for metric in ("p50_ms", "p95_ms", "p99_ms", "rps", "msgs_per_s"):
+            if metric not in now or metric not in before:
+                continue
+            change = (now[metric] - before[metric]) / before[metric] * 100 if before[metric] else 0.0
+            lines.append(f"  {name:<10} {metric:<11} {before[metric]:>10} -> {now[metric]:<10} ({change:+.1f}%)")
+    return lines
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=50_000, help="review requests to seed")
+    parser.add_argument("--businesses", type=int, default=200)
+    parser.add_argument("--count", type=int, default=2000, help="requests per read scenario")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--batches", type=int, default=20, help="/api/send batches")
+    parser.add_argument("--batch-size", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=50.0, help="ms the stubs add to every call")
+    parser.add_argument("--sms-backend", choices=("twilio", "email"), default="twilio")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--scenario", action="append", choices=SCENARIOS, help="run only these (repeatable)")
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--compare", help="results file from an earlier run to diff against")
+    args = parser.parse_args()
+
+    results = run(
+        requests=args.requests,
+        businesses=args.businesses,
+        count=args.count,
+        concurrency=args.concurrency,
+        batches=args.batches,
+        batch_size=args.batch_size,
+        latency_ms=args.latency,
+        sms_backend=args.sms_backend,
+        workers=args.workers,
+        scenarios=tuple(args.scenario or SCENARIOS),
+    )
+    print(f"commit {(results['commit'] or 'unknown')[:10]}{' (dirty)' if results['dirty'] else ''}")
+    for name, r in results["scenarios"].items():
+        extra = f"  {r['msgs_per_s']:>7.1f} msgs/s" if "msgs_per_s" in r else ""
+        print(f"{name:<10} n={r['count']:<6} err={r['errors']:<4} p50={r['p50_ms']:>8.2f} ms  "
+              f"p95={r['p95_ms']:>8.2f} ms  p99={r['p99_ms']:>8.2f} ms  {r['rps']:>8.1f} req/s{extra}")
+    if args.compare:
+        print("\n".join(compare(results, json.loads(Path(args.compare).read_text()))))
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""Micro-benchmark: Maps URL extraction from saved share-page HTML.
+
+Compares the original eight-pass ``re.IGNORECASE`` extractor with the
+current ``services.google_places._find_maps_url_in_html`` on the fixtures in
+``benchmarks/fixtures/share_pages``. Each fixture is padded to the 200 KB the
+extractor reads, with filler that never matches, at its ``<!-- PAD -->``
+marker. Fails if any result differs.
+
+    python -m benchmarks.maps_matcher [--repeat 50] [--json out.json]
+"""
+
+import argparse
+import json
+import random
+import re
+import time
+import urllib.parse
+from pathlib import Path
+from typing import Optional
+
+from services.google_places import _MAPS_URL_PATTERNS, _find_maps_url_in_html
+
+FIXTURES = Path(__file__).parent / "fixtures" / "share_pages"
+PAGE_SIZE = 200_000
+
+
+def legacy_find_maps_url(body: str) -> Optional[str]:
+    """The extractor as it was: one uncompiled case-insensitive scan per pattern."""
+    for pattern in _MAPS_URL_PATTERNS:
+        m = re.search(pattern, body, re.IGNORECASE)
+        if m:
+            found = m.group(1)
+            if "%" in found:
+                found = urllib.parse.unquote(found)
+            return found
+    return None
+
+
+def _filler(size: int, seed: int) -> str:
+    rng = random.Random(seed)
+    parts: list[str] = []
+    total = 0
+    while total < size:
+        r = rng.random()
+        if r < 0.3:
+            part = f'<a href="https://example.com/p/{rng.randint(0, 10**6)}">more</a>\n'
+        elif r < 0.5:
+            part = f'<div class="c{rng.randint(0, 99)}">lorem ipsum dolor sit amet</div>\n'
+        elif r < 0.6:
+            part = '<meta name="x" content="y">\n'
+        else:
+            part = f'var a{rng.randint(0, 10**6)} = "https://www.gstatic.com/_/js/{rng.randint(0, 10**6)}.js";\n'
+        parts.append(part)
+        total += len(part)
+    return "".join(parts)
+
+
+def load_pages() -> dict[str, str]:
+    pages = {}
+    for i, path in enumerate(sorted(FIXTURES.glob("*.html"))):
+        template = path.read_text(encoding="utf-8")
+        pad = _filler(max(0, PAGE_SIZE - len(template)), seed=i)
+        pages[path.stem] = template.replace("<!-- PAD -->", pad)[:PAGE_SIZE]
+    return pages
+
+
+def _time(fn, body: str, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(body)
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def run(repeat: int) -> dict:
+    results = {}
+    for name, body in load_pages().items():
+        old, new = legacy_find_maps_url(body), _find_maps_url_in_html(body)
+        if old != new:
+            raise SystemExit(f"{name}: results differ\n  legacy: {old}\n  current: {new}")
+        results[name] = {
+            "url": new,
+            "legacy_ms": round(_time(legacy_find_maps_url, body, repeat), 3),
+            "current_ms": round(_time(_find_maps_url_in_html, body, repeat), 3),
+        }
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    results = run(args.repeat)
+    print(f"{'fixture':<16} {'legacy ms':>10} {'current ms':>11} {'speedup':>8}")
+    for name, r in results.items():
+        speedup = r["legacy_ms"] / r["current_ms"] if r["current_ms"] else float("inf")
+        print(f"{name:<16} {r['legacy_ms']:>10.3f} {r['current_ms']:>11.3f} {speedup:>7.1f}x")
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
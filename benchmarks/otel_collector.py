@@ -0,0 +1,51 @@
+"""Stand-in OTLP/HTTP collector for trying out trace export locally.
+
+Accepts ``POST /v1/traces`` (what the app's exporter sends when
+``OTEL_EXPORTER_OTLP_ENDPOINT`` points here), logs the size of each export
+and keeps running totals at ``GET /stats``. Payloads are not decoded, so no
+OpenTelemetry packages are needed on the collector side.
+
+    python -m benchmarks.otel_collector [--port 4318]
+    OTEL_EXPORTER_OTLP_ENDPOINT=http://127.0.0.1:4318 python main.py --sms-backend email
+"""
+
+import argparse
+import logging
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+logger = logging.getLogger("otel-collector")
+
+
+def collector_app() -> Starlette:
+    totals = {"exports": 0, "bytes": 0}
+
+    async def traces(request: Request):
+        body = await request.body()
+        totals["exports"] += 1
+        totals["bytes"] += len(body)
+        logger.info("export #%d: %d bytes (%s)", totals["exports"], len(body), request.headers.get("content-type"))
+        # An empty ExportTraceServiceResponse.
+        return Response(b"", media_type="application/x-protobuf")
+
+    async def stats(request: Request):
+        return JSONResponse(totals)
+
+    return Starlette(routes=[Route("/v1/traces", traces, methods=["POST"]), Route("/stats", stats)])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=4318)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    uvicorn.run(collector_app(), host="127.0.0.1", port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""Benchmark: bytes transferred and modelled time-to-interactive of the portal pages.
+
+Loads ``/portal/send`` and ``/portal/dashboard`` plus the stylesheet they link,
+in-process, the way a browser sending ``Accept-Encoding: gzip, deflate, br``
+would:
+
+* ``first``  — empty cache
+* ``repeat`` — the page again with a warm cache: validators from the first
+  load are sent back, and a resource marked ``immutable`` is not requested
+
+``legacy`` is how the pages were served before: ``FileResponse`` for the HTML
+and ``StaticFiles`` for the stylesheet, uncompressed and with no
+``Cache-Control`` (treated as revalidate-every-time). ``current`` is the
+fingerprinted, precompressed pipeline in ``services.assets``.
+
+Time-to-interactive is modelled for the origin's share of the critical path
+(HTML, then the render-blocking stylesheet): per request one round trip plus
+server time plus transfer time at the profile's bandwidth, averaged over
+the two pages (requests and bytes are totals for both). The third-party
+fonts and Tailwind script are the same before and after and are left out.
+
+    python -m benchmarks.portal [--json out.json]
+"""
+
+import argparse
+import json
+import os
+import re
+import time
+from pathlib import Path
+from typing import Optional
+
+os.environ.setdefault("DB_INIT_ON_STARTUP", "0")
+
+from fastapi import FastAPI
+from fastapi.responses import FileResponse
+from fastapi.staticfiles import StaticFiles
+from starlette.testclient import TestClient
+
+from main import app
+from services import assets
+
+STATIC = Path(__file__).resolve().parent.parent / "static"
+PAGES = ("/portal/send", "/portal/dashboard")
+# (round trip in seconds, bandwidth in bytes per second)
+PROFILES = {"slow_4g": (0.150, 1.6e6 / 8), "cable": (0.020, 20e6 / 8)}
+ACCEPT = {"Accept-Encoding": "gzip, deflate, br"}
+
+
+def legacy_app() -> FastAPI:
+    """The portal as it was served before the asset pipeline."""
+    legacy = FastAPI()
+    legacy.mount("/static", StaticFiles(directory=STATIC), name="static")
+
+    @legacy.get("/portal/send")
+    def portal_send():
+        return FileResponse(STATIC / "send.html")
+
+    @legacy.get("/portal/dashboard")
+    def portal_dashboard():
+        return FileResponse(STATIC / "dashboard.html")
+
+    return legacy
+
+
+def _fetch(client: TestClient, url: str, cache: dict) -> Optional[dict]:
+    """One request as a browser with ``cache`` would make it; None if served from cache."""
+    cached = cache.get(url)
+    if cached and "immutable" in cached["cache_control"]:
+        return None
+    headers = dict(ACCEPT)
+    if cached and cached["etag"]:
+        headers["If-None-Match"] = cached["etag"]
+    t0 = time.perf_counter()
+    resp = client.get(url, headers=headers)
+    server = time.perf_counter() - t0
+    assert resp.status_code in (200, 304), (url, resp.status_code)
+    head = len(f"HTTP/1.1 {resp.status_code} {resp.reason_phrase}\r\n") + 2
+    head += sum(len(k) + len(v) + 4 for k, v in resp.headers.raw)
+    if resp.status_code == 200:
+        cache[url] = {
+            "etag": resp.headers.get("etag"),
+            "cache_control": resp.headers.get("cache-control", ""),
+            "text": resp.text,
+        }
+    return {"bytes": head + resp.num_bytes_downloaded, "server_s": server}
+
+
+def _load(client: TestClient, page: str, cache: dict) -> list[dict]:
+    """The page and its stylesheet: the origin's part of the critical path."""
+    fetched = [_fetch(client, page, cache)]
+    css = re.search(r'href="(/(?:static|a)/style[\w.]*\.css)"', cache[page]["text"]).group(1)
+    fetched.append(_fetch(client, css, cache))
+    return [f for f in fetched if f is not None]
+
+
+def _tti_ms(fetched: list[dict], profile: str) -> float:
+    rtt, bandwidth = PROFILES[profile]
+    return round(sum(rtt + f["server_s"] + f["bytes"] / bandwidth for f in fetched) * 1000, 1)
+
+
+def _measure(client: TestClient) -> dict:
+    results = {}
+    for visit in ("first", "repeat"):
+        results[visit] = {"requests": 0, "bytes": 0, **{f"tti_{p}_ms": 0.0 for p in PROFILES}}
+    for page in PAGES:
+        cache: dict = {}
+        for visit in ("first", "repeat"):
+            fetched = _load(client, page, cache)
+            row = results[visit]
+            row["requests"] += len(fetched)
+            row["bytes"] += sum(f["bytes"] for f in fetched)
+            for profile in PROFILES:
+                row[f"tti_{profile}_ms"] = round(row[f"tti_{profile}_ms"] + _tti_ms(fetched, profile) / len(PAGES), 1)
+    return results
+
+
+def run() -> dict:
+    assets.reset()
+    with TestClient(legacy_app()) as legacy, TestClient(app) as current:
+        # Warm-up, so neither side pays for first-use loading.
+        for client in (legacy, current):
+            for page in PAGES:
+                _load(client, page, {})
+        return {"legacy": _measure(legacy), "current": _measure(current)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    results = run()
+    print(f"{'':<8} {'visit':<7} {'requests':>8} {'bytes':>8}" + "".join(f" {'tti ' + p:>14}" for p in PROFILES))
+    for name in ("legacy", "current"):
+        for visit, r in results[name].items():
+            print(f"{name:<8} {visit:<7} {r['requests']:>8} {r['bytes']:>8}"
+                  + "".join(f" {r[f'tti_{p}_ms']:>11.1f} ms" for p in PROFILES))
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Benchmark: memory and time to import a large recipient CSV.
+
+Writes a ``--rows`` CSV (name, phone) to a temp file, in mixed formats with
+~10% duplicates and ~2% invalid numbers, then reads it back:
+
+* ``legacy``    — the whole upload decoded into memory, every row parsed into
+  a list, one JSON document built at the end
+* ``streaming`` — ``services.recipients.ndjson``: rows read and reported
+  one at a time
+
+Peak Python heap is measured with ``tracemalloc``.
+
+    python -m benchmarks.recipient_import [--rows 100000] [--json out.json]
+"""
+
+import argparse
+import csv
+import io
+import json
+import random
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from services.recipients import ndjson
+from services.sms import normalize_us_phone
+
+FORMATS = ("({a}) {b}-{c}", "+1 {a} {b} {c}", "{a}.{b}.{c}", "1{a}{b}{c}", "{a}-{b}-{c}")
+
+
+def write_csv(path: Path, rows: int, seed: int = 5) -> None:
+    rng = random.Random(seed)
+    with path.open("w", newline="") as f:
+        out = csv.writer(f)
+        out.writerow(["Name", "Phone"])
+        for i in range(rows):
+            n = rng.randrange(rows) if rng.random() < 0.1 else i
+            if rng.random() < 0.02:
+                phone = f"555-{n % 10000:04d}"
+            else:
+                a, b, c = f"{200 + n % 800:03d}", f"{n // 800 % 1000:03d}", f"{n % 10000:04d}"
+                phone = rng.choice(FORMATS).format(a=a, b=b, c=c)
+            out.writerow([f"Customer {i}", phone])
+
+
+def legacy_import(file) -> bytes:
+    """Read everything, then answer in one piece."""
+    text = file.read().decode("utf-8-sig")
+    rows = list(csv.reader(io.StringIO(text)))[1:]
+    phones, errors, seen = [], [], set()
+    for number, row in enumerate(rows, start=2):
+        digits = normalize_us_phone(row[1])
+        if digits is None:
+            errors.append({"row": number, "error": f"Invalid US phone number: {row[1]}"})
+        elif digits not in seen:
+            seen.add(digits)
+            phones.append(f"+1{digits}")
+    return json.dumps({"phones": phones, "errors": errors}).encode()
+
+
+def _streaming(file) -> int:
+    return sum(len(line) for line in ndjson(file, "csv"))
+
+
+def _measure(fn, path: Path) -> dict:
+    # Timed and traced in separate passes: tracemalloc slows allocation-heavy code down.
+    with path.open("rb") as f:
+        t0 = time.perf_counter()
+        out = fn(f)
+        seconds = time.perf_counter() - t0
+    with path.open("rb") as f:
+        tracemalloc.start()
+        fn(f)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    size = out if isinstance(out, int) else len(out)
+    return {"seconds": round(seconds, 2), "peak_mb": round(peak / 1e6, 1), "output_bytes": size}
+
+
+def run(rows: int = 100_000) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "recipients.csv"
+        write_csv(path, rows)
+        return {
+            "rows": rows,
+            "file_mb": round(path.stat().st_size / 1e6, 1),
+            "legacy": _measure(legacy_import, path),
+            "streaming": _measure(_streaming, path),
+        }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    results = run(args.rows)
+    print(f"{results['rows']} rows, {results['file_mb']} MB")
+    for name in ("legacy", "streaming"):
+        r = results[name]
+        print(f"{name:<10} {r['seconds']:>6.2f} s  peak {r['peak_mb']:>7.1f} MB  output {r['output_bytes']} B")
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""Load test: sequential vs hedged share-link resolution (``_follow_redirects``).
+
+Starts a local share-link stub and resolves ``--links`` links drawn from a
+fixed mix of behaviours:
+
+* ``fast``      — both UAs get a page with the Maps URL after ``--latency`` ms
+* ``bot_empty`` — the bot UA gets a page without it; the browser UA works
+* ``bot_stall`` — the bot UA hangs for ``--stall`` s; the browser UA works
+* ``dead``      — the link hangs for every UA (served on a second host name,
+  so the circuit breaker only trips for that host)
+
+``legacy`` is the old behaviour: one UA after the other, 15 s timeout each,
+no overall deadline or breaker. ``hedged`` races both UAs under
+``REDIRECT_DEADLINE`` with the per-host breaker.
+
+    python -m benchmarks.redirect_hedge [--links 200] [--concurrency 20] [--json out.json]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import multiprocessing
+import random
+import socket
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest.mock import patch
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import HTMLResponse
+from starlette.routing import Route
+
+from services import google_places
+from services.circuit import CircuitBreaker
+
+MAPS_URL = "https://www.google.com/maps/place/Stub+Cafe/data=!1sChIJstub"
+MIX = {"fast": 0.70, "bot_empty": 0.15, "bot_stall": 0.10, "dead": 0.05}
+
+
+def _stub_app(latency: float, stall: float) -> Starlette:
+    found = f'<html><head><meta property="og:url" content="{MAPS_URL}"></head></html>'
+
+    async def share(request: Request):
+        kind = request.path_params["kind"]
+        is_bot = "facebookexternalhit" in request.headers.get("user-agent", "")
+        if kind == "dead" or (kind == "bot_stall" and is_bot):
+            await asyncio.sleep(stall)
+            return HTMLResponse("<html></html>")
+        await asyncio.sleep(latency)
+        if kind == "bot_empty" and is_bot:
+            return HTMLResponse("<html></html>")
+        return HTMLResponse(found)
+
+    return Starlette(routes=[Route("/s/{kind}/{n}", share)])
+
+
+def _serve_stub(sock: socket.socket, latency: float, stall: float) -> None:
+    config = uvicorn.Config(_stub_app(latency, stall), log_level="warning", backlog=2048, timeout_keep_alive=60)
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def _start_stub(latency: float, stall: float) -> tuple[multiprocessing.Process, int]:
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    proc = multiprocessing.Process(target=_serve_stub, args=(sock, latency, stall), daemon=True)
+    proc.start()
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.1).close()
+            break
+        except OSError:
+            time.sleep(0.05)
+    return proc, port
+
+
+def _links(n: int, port: int, seed: int = 7) -> list[str]:
+    rng = random.Random(seed)
+    kinds = rng.choices(list(MIX), weights=list(MIX.values()), k=n)
+    # "dead" links live on their own host name so the breaker is scoped to them.
+    return [
+        f"http://{'localhost' if kind == 'dead' else '127.0.0.1'}:{port}/s/{kind}/{i}"
+        for i, kind in enumerate(kinds)
+    ]
+
+
+def _scenario(links: list[str], concurrency: int) -> dict:
+    def one(url: str) -> tuple[float, bool]:
+        t0 = time.perf_counter()
+        found = google_places._follow_redirects(url) == MAPS_URL
+        return (time.perf_counter() - t0) * 1000, found
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        results = list(pool.map(one, links))
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(ms for ms, _ in results)
+    n = len(latencies)
+    return {
+        "links": n,
+        "resolved": sum(found for _, found in results),
+        "seconds": round(elapsed, 2),
+        "p50_ms": round(statistics.median(latencies), 1),
+        "p95_ms": round(latencies[int(0.95 * (n - 1))], 1),
+        "p99_ms": round(latencies[int(0.99 * (n - 1))], 1),
+    }
+
+
+def run(n: int, concurrency: int, latency_ms: float, stall: float) -> dict:
+    proc, port = _start_stub(latency_ms / 1000, stall)
+    links = _links(n, port)
+    modes = {
+        "legacy": dict(_HEDGE=False, _REDIRECT_DEADLINE=float("inf"), redirect_breaker=CircuitBreaker(threshold=10**9)),
+        "hedged": dict(_HEDGE=True, redirect_breaker=CircuitBreaker(threshold=5, cooldown=60)),
+    }
+    results = {}
+    try:
+        for mode, attrs in modes.items():
+            with patch.multiple(google_places, **attrs):
+                results[mode] = _scenario(links, concurrency)
+    finally:
+        proc.terminate()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--links", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=50.0, help="stub latency in ms")
+    parser.add_argument("--stall", type=float, default=20.0, help="seconds a stalled request hangs")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    logging.getLogger("services").setLevel(logging.ERROR)
+    results = run(args.links, args.concurrency, args.latency, args.stall)
+    print(f"{'mode':<7} {'resolved':>9} {'seconds':>8} {'p50 ms':>8} {'p95 ms':>9} {'p99 ms':>9}")
+    for mode, r in results.items():
+        print(
+            f"{mode:<7} {r['resolved']:>4}/{r['links']:<4} {r['seconds']:>8.2f} "
+            f"{r['p50_ms']:>8.1f} {r['p95_ms']:>9.1f} {r['p99_ms']:>9.1f}"
+        )
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""Stress test: short-code allocation, probe-per-code vs sequence allocator.
+
+* ``legacy``   — ``generate_unique_short_code`` per code: a random code plus a
+  SELECT against ``review_requests``, inserting each code so the table grows
+  (``--legacy-codes``, default 200k)
+* ``sequence`` — ``--workers`` processes, each with its own
+  ``SequenceAllocator`` on one shared SQLite counter, hand out ``--codes``
+  codes (default 10M) in ``--batch``-sized calls
+
+Every code handed out is checked for duplicates, and call latency is reported
+per tenth of the run to show whether it stays flat as codes accumulate.
+
+    python -m benchmarks.short_codes [--codes 10000000] [--workers 4] [--json out.json]
+"""
+
+import argparse
+import json
+import multiprocessing
+import statistics
+import tempfile
+import time
+from array import array
+from pathlib import Path
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from database import Base
+from models import Business, ReviewRequest
+from services.review import generate_unique_short_code
+from services.shortcodes import SequenceAllocator
+
+
+def legacy_allocate(db, count: int) -> list[str]:
+    """The old path: one random code and one lookup per code."""
+    return [generate_unique_short_code(db) for _ in range(count)]
+
+
+def _deciles(latencies: list[float]) -> list[dict]:
+    size = max(1, len(latencies) // 10)
+    out = []
+    for i in range(0, len(latencies), size):
+        part = sorted(latencies[i:i + size])
+        out.append({
+            "p50_ms": round(statistics.median(part), 3),
+            "p99_ms": round(part[int(0.99 * (len(part) - 1))], 3),
+        })
+    return out[:10]
+
+
+def _legacy(path: Path, codes: int, batch: int) -> dict:
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    latencies = []
+    with sessionmaker(bind=engine)() as db:
+        biz = Business(name="Bench Biz", google_place_id="bench")
+        db.add(biz)
+        db.commit()
+        for _ in range(codes // batch):
+            t0 = time.perf_counter()
+            batch_codes = legacy_allocate(db, batch)
+            latencies.append((time.perf_counter() - t0) * 1000)
+            db.add_all(
+                ReviewRequest(business_id=biz.id, customer_contact="0", short_code=c, review_text="x")
+                for c in batch_codes
+            )
+            db.commit()
+    engine.dispose()
+    return {"codes": len(latencies) * batch, "deciles": _deciles(latencies)}
+
+
+def _worker(args: tuple) -> tuple[bytes, list[float]]:
+    path, calls, batch, block = args
+    engine = create_engine(f"sqlite:///{path}", connect_args={"timeout": 30})
+    allocator = SequenceAllocator(sessionmaker(bind=engine), block_size=block, key="bench")
+    numbers = array("q")
+    latencies = []
+    for _ in range(calls):
+        t0 = time.perf_counter()
+        codes = allocator.allocate(None, batch)
+        latencies.append((time.perf_counter() - t0) * 1000)
+        numbers.extend(int(code, 36) for code in codes)
+    engine.dispose()
+    return numbers.tobytes(), latencies
+
+
+def _sequence(path: Path, codes: int, batch: int, workers: int, block: int) -> dict:
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    engine.dispose()
+
+    calls = codes // batch // workers
+    start = time.perf_counter()
+    with multiprocessing.Pool(workers) as pool:
+        results = pool.map(_worker, [(path, calls, batch, block)] * workers)
+    elapsed = time.perf_counter() - start
+
+    numbers = array("q")
+    latencies = [[] for _ in range(10)]
+    for raw, worker_latencies in results:
+        numbers.frombytes(raw)
+        for i, decile in enumerate(_deciles(worker_latencies)):
+            latencies[i].append(decile)
+    ordered = sorted(numbers)
+    duplicates = sum(1 for a, b in zip(ordered, ordered[1:]) if a == b)
+    return {
+        "codes": len(numbers),
+        "duplicates": duplicates,
+        "seconds": round(elapsed, 1),
+        "codes_per_second": round(len(numbers) / elapsed),
+        # Worst worker per tenth of the run.
+        "deciles": [
+            {k: max(d[k] for d in per_worker) for k in ("p50_ms", "p99_ms")} for per_worker in latencies
+        ],
+    }
+
+
+def run(codes: int, legacy_codes: int, batch: int, workers: int, block: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        results = {}
+        if legacy_codes:
+            results["legacy"] = _legacy(Path(tmp) / "legacy.db", legacy_codes, batch)
+        results["sequence"] = _sequence(Path(tmp) / "sequence.db", codes, batch, workers, block)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--codes", type=int, default=10_000_000)
+    parser.add_argument("--legacy-codes", type=int, default=200_000)
+    parser.add_argument("--batch", type=int, default=100, help="codes per allocation call")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--block", type=int, default=1000, help="SHORT_CODE_BLOCK")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    results = run(args.codes, args.legacy_codes, args.batch, args.workers, args.block)
+    for variant, r in results.items():
+        extra = f", {r['duplicates']} duplicates, {r['codes_per_second']} codes/s" if "duplicates" in r else ""
+        print(f"{variant}: {r['codes']} codes{extra}")
+        print(f"  {'tenth':<6} {'p50 ms':>8} {'p99 ms':>8}")
+        for i, d in enumerate(r["deciles"], 1):
+            print(f"  {i:<6} {d['p50_ms']:>8.3f} {d['p99_ms']:>8.3f}")
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
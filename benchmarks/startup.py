@@ -0,0 +1,101 @@
+"""Benchmark: cold start of the app, as a fresh serverless instance sees it.
+
+In a new interpreter, times ``import main`` and the first response
+(``GET /api/carriers`` through an in-process client, client import excluded),
+lists which heavy SDKs got imported, and breaks the import down per
+top-level package with ``python -X importtime``.
+
+``tests/test_startup.py`` runs this and fails when a heavy SDK is imported
+eagerly again or the numbers exceed ``STARTUP_IMPORT_BUDGET_MS`` /
+``STARTUP_FIRST_RESPONSE_BUDGET_MS``.
+
+    python -m benchmarks.startup [--repeat 5] [--json out.json]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+# SDKs that must only be imported when first used.
+HEAVY = ("anthropic", "twilio", "requests", "pyngrok")
+
+_PROBE = """
+import json, sys, time
+t0 = time.perf_counter()
+import main
+t1 = time.perf_counter()
+from starlette.testclient import TestClient
+t2 = time.perf_counter()
+status = TestClient(main.app).get("/api/carriers").status_code
+t3 = time.perf_counter()
+heavy = sorted(m for m in {heavy!r} if m in sys.modules)
+print(json.dumps({{
+    "import_ms": (t1 - t0) * 1000,
+    "first_response_ms": (t1 - t0 + t3 - t2) * 1000,
+    "status": status,
+    "heavy": heavy,
+}}))
+""".format(heavy=HEAVY)
+
+
+def _probe(*flags: str) -> tuple[dict, str]:
+    env = {**os.environ, "DB_INIT_ON_STARTUP": "0"}
+    proc = subprocess.run(
+        [sys.executable, *flags, "-c", _PROBE],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(proc.stdout.strip().splitlines()[-1]), proc.stderr
+
+
+def _by_package(importtime: str, top: int = 10) -> list[dict]:
+    """Import time spent in each top-level package (own modules only), slowest first."""
+    packages: dict[str, int] = {}
+    for line in importtime.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        own, _, name = line[len("import time:"):].split("|")
+        package = name.strip().split(".")[0]
+        packages[package] = packages.get(package, 0) + int(own)
+    ranked = sorted(packages.items(), key=lambda item: -item[1])[:top]
+    return [{"package": name, "ms": round(us / 1000, 1)} for name, us in ranked]
+
+
+def run(repeat: int = 3) -> dict:
+    samples = [_probe()[0] for _ in range(repeat)]
+    _, importtime = _probe("-X", "importtime")
+    return {
+        # Best of ``repeat``: the least noisy estimate on a shared machine.
+        "import_ms": round(min(s["import_ms"] for s in samples), 1),
+        "first_response_ms": round(min(s["first_response_ms"] for s in samples), 1),
+        "status": samples[-1]["status"],
+        "heavy_imported": samples[-1]["heavy"],
+        "packages": _by_package(importtime),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    results = run(args.repeat)
+    print(f"import main:     {results['import_ms']:.1f} ms")
+    print(f"first response:  {results['first_response_ms']:.1f} ms (HTTP {results['status']})")
+    print(f"heavy SDKs:      {', '.join(results['heavy_imported']) or 'none'}")
+    for p in results["packages"]:
+        print(f"  {p['package']:<20} {p['ms']:>8.1f} ms")
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
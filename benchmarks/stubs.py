@@ -0,0 +1,208 @@
+"""Local stand-ins for the external services, for load tests.
+
+* ``places_app``  — Places API (New): ``places:searchText`` and Place Details
+* ``twilio_app``  — Twilio's Messages resource
+* ``SMTPStub``    — a plain-text SMTP server that accepts and discards mail
+
+Each HTTP stub delays every response by ``latency`` seconds and counts what it
+served at ``GET /stats``. ``start_http_stub`` / ``start_smtp_stub`` run them
+in their own process so they don't compete with the code under test for the
+GIL. Point the app at them with ``PLACES_API_BASE``, ``TWILIO_API_BASE`` and
+``SMTP_HOST``/``SMTP_PORT`` (with ``SMTP_STARTTLS=0``).
+
+    python -m benchmarks.stubs [--places-port 9101] [--twilio-port 9102] [--smtp-port 9125]
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import socket
+import time
+import uuid
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+
+def places_app(latency: float = 0.05) -> Starlette:
+    served = {"search_text": 0, "details": 0}
+
+    async def search_text(request: Request):
+        query = (await request.json())["textQuery"]
+        await asyncio.sleep(latency)
+        served["search_text"] += 1
+        place_id = "stub-" + uuid.uuid5(uuid.NAMESPACE_URL, query).hex[:16]
+        return JSONResponse({"places": [{"id": place_id, "displayName": {"text": query}}]})
+
+    async def details(request: Request):
+        await asyncio.sleep(latency)
+        served["details"] += 1
+        place_id = request.path_params["place_id"]
+        return JSONResponse({"id": place_id, "displayName": {"text": f"Business {place_id}"}})
+
+    async def stats(request: Request):
+        return JSONResponse(served)
+
+    return Starlette(routes=[
+        Route("/v1/places:searchText", search_text, methods=["POST"]),
+        Route("/v1/places/{place_id}", details),
+        Route("/stats", stats),
+    ])
+
+
+def twilio_app(latency: float = 0.05, failure_rate: float = 0.0) -> Starlette:
+    served = {"messages": 0, "failed": 0}
+
+    async def messages(request: Request):
+        form = await request.form()
+        await asyncio.sleep(latency)
+        served["messages"] += 1
+        if failure_rate and served["messages"] % round(1 / failure_rate) == 0:
+            served["failed"] += 1
+            return JSONResponse({"code": 30003, "message": "Unreachable destination handset", "status": 400}, status_code=400)
+        return JSONResponse(
+            {
+                "sid": "SM" + uuid.uuid4().hex,
+                "account_sid": request.path_params["sid"],
+                "to": form.get("To"),
+                "from": form.get("From"),
+                "body": form.get("Body"),
+                "status": "queued",
+            },
+            status_code=201,
+        )
+
+    async def stats(request: Request):
+        return JSONResponse(served)
+
+    return Starlette(routes=[
+        Route("/2010-04-01/Accounts/{sid}/Messages.json", messages, methods=["POST"]),
+        Route("/stats", stats),
+    ])
+
+
+class SMTPStub:
+    """Minimal SMTP server: EHLO/HELO, MAIL, RCPT, DATA, RSET, NOOP, QUIT. No AUTH, no TLS."""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.messages = 0
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        async def reply(line: str) -> None:
+            writer.write(line.encode() + b"\r\n")
+            await writer.drain()
+
+        await reply("220 stub ESMTP")
+        try:
+            while line := await reader.readline():
+                verb = line.decode(errors="replace").strip().split(" ", 1)[0].upper()
+                if verb == "EHLO":
+                    await reply("250-stub\r\n250 8BITMIME")
+                elif verb in ("HELO", "MAIL", "RCPT", "RSET", "NOOP"):
+                    await reply("250 OK")
+                elif verb == "DATA":
+                    await reply("354 End data with <CR><LF>.<CR><LF>")
+                    while (await reader.readline()) not in (b".\r\n", b".\n", b""):
+                        pass
+                    if self.latency:
+                        await asyncio.sleep(self.latency)
+                    self.messages += 1
+                    await reply("250 OK queued")
+                elif verb == "QUIT":
+                    await reply("221 Bye")
+                    break
+                else:
+                    await reply("502 Command not implemented")
+        finally:
+            writer.close()
+
+    async def serve(self, sock: socket.socket) -> None:
+        server = await asyncio.start_server(self.handle, sock=sock)
+        async with server:
+            await server.serve_forever()
+
+
+def _bind() -> socket.socket:
+    sock = socket.socket()
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind(("127.0.0.1", 0))
+    return sock
+
+
+def _wait_for(port: int, timeout: float = 10.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.1).close()
+            return
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError(f"Stub on port {port} did not start")
+
+
+def _serve_http(sock: socket.socket, factory, kwargs: dict) -> None:
+    config = uvicorn.Config(factory(**kwargs), log_level="warning", backlog=2048, timeout_keep_alive=60)
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def _serve_smtp(sock: socket.socket, latency: float) -> None:
+    asyncio.run(SMTPStub(latency).serve(sock))
+
+
+def start_http_stub(factory, **kwargs) -> tuple[multiprocessing.Process, str]:
+    """Run ``factory(**kwargs)`` in a child process. Returns (process, base URL)."""
+    sock = _bind()
+    port = sock.getsockname()[1]
+    proc = multiprocessing.Process(target=_serve_http, args=(sock, factory, kwargs), daemon=True)
+    proc.start()
+    _wait_for(port)
+    return proc, f"http://127.0.0.1:{port}"
+
+
+def start_smtp_stub(latency: float = 0.0) -> tuple[multiprocessing.Process, int]:
+    """Run an ``SMTPStub`` in a child process. Returns (process, port)."""
+    sock = _bind()
+    sock.listen(512)
+    port = sock.getsockname()[1]
+    proc = multiprocessing.Process(target=_serve_smtp, args=(sock, latency), daemon=True)
+    proc.start()
+    _wait_for(port)
+    return proc, port
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--places-port", type=int, default=9101)
+    parser.add_argument("--twilio-port", type=int, default=9102)
+    parser.add_argument("--smtp-port", type=int, default=9125)
+    parser.add_argument("--latency", type=float, default=50.0, help="ms added to every response")
+    args = parser.parse_args()
+
+    latency = args.latency / 1000
+    procs = []
+    for factory, port in ((places_app, args.places_port), (twilio_app, args.twilio_port)):
+        sock = socket.socket()
+        sock.bind(("127.0.0.1", port))
+        procs.append(multiprocessing.Process(target=_serve_http, args=(sock, factory, {"latency": latency})))
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", args.smtp_port))
+    sock.listen(512)
+    procs.append(multiprocessing.Process(target=_serve_smtp, args=(sock, 0.0)))
+    for proc in procs:
+        proc.start()
+    print(f"PLACES_API_BASE=http://127.0.0.1:{args.places_port}/v1")
+    print(f"TWILIO_API_BASE=http://127.0.0.1:{args.twilio_port}")
+    print(f"SMTP_HOST=127.0.0.1 SMTP_PORT={args.smtp_port} SMTP_STARTTLS=0")
+    try:
+        for proc in procs:
+            proc.join()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,150 @@
+import itertools
+import logging
 import os
+import threading
+import time
+from typing import Optional
 
-from sqlalchemy import create_engine
+from fastapi import Request, Response
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import DBAPIError, TimeoutError as PoolTimeoutError
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
+from sqlalchemy.pool import NullPool, QueuePool
+
+logger = logging.getLogger(__name__)
 
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./reviews.db")
+# Comma-separated read replicas for get_read_db (empty = read from the primary).
+REPLICA_URLS = [u.strip() for u in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if u.strip()]
+# Cookie that pins a browser's reads to the primary for a while after it wrote.
+READ_YOUR_WRITES_COOKIE = "rb_primary_until"
+READ_YOUR_WRITES_SECONDS = int(os.getenv("DB_READ_YOUR_WRITES_SECONDS", "10"))
+
+
+class PoolStats:
+    """Checkout wait times and timeouts for one connection pool."""
+
+    def __init__(self, capacity: int = 0):
+        self.capacity = capacity
+        self._lock = threading.Lock()
+        self.reset()
+
+    def observe(self, wait: float, timed_out: bool = False) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.wait_total += wait
+            self.wait_max = max(self.wait_max, wait)
+            self.timeouts += timed_out
+
+    def reset(self) -> None:
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_avg_ms": round(self.wait_total / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                "wait_max_ms": round(self.wait_max * 1000, 3),
+            }
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that times how long each checkout waits for a connection."""
+
+    stats: PoolStats
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except PoolTimeoutError:
+            self.stats.observe(time.perf_counter() - start, timed_out=True)
+            raise
+        self.stats.observe(time.perf_counter() - start)
+        return conn
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
 
-connect_args: dict = {}
-if DATABASE_URL.startswith("sqlite"):
-    connect_args["check_same_thread"] = False
 
-engine = create_engine(DATABASE_URL, connect_args=connect_args)
+def _profile(url: str) -> str:
+    """``DB_PROFILE`` if set, else sqlite / serverless (on Vercel) / pooled."""
+    profile = os.getenv("DB_PROFILE", "").strip().lower()
+    if profile:
+        return profile
+    if url.startswith("sqlite"):
+        return "sqlite"
+    return "serverless" if os.getenv("VERCEL") else "pooled"
+
+
+def _sqlite_pragmas(dbapi_conn, connection_record) -> None:
+    cursor = dbapi_conn.cursor()
+    # WAL lets the click/outbox threads write while requests read.
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA busy_timeout={int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', '5000'))}")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute(f"PRAGMA cache_size=-{int(os.getenv('SQLITE_CACHE_KB', '20000'))}")
+    cursor.close()
+
+
+def build_engine(url: str, profile: Optional[str] = None):
+    """Create the engine for a connection profile.
+
+    * ``pooled``     — long-running uvicorn: a bounded, pre-pinged, recycled
+      ``QueuePool`` (``DB_POOL_SIZE``, ``DB_MAX_OVERFLOW``, ``DB_POOL_TIMEOUT``,
+      ``DB_POOL_RECYCLE``)
+    * ``serverless`` — Vercel: ``NullPool``, one short-lived connection per
+      session, meant to sit behind an external pooler (PgBouncer, Neon/Supabase
+      pooled URL) so cold instances don't each hold server slots
+    * ``sqlite``     — local file: WAL journal and tuned pragmas
+    """
+    profile = profile or _profile(url)
+    connect_args: dict = {}
+    kwargs: dict = {}
+
+    if url.startswith("sqlite"):
+        connect_args["check_same_thread"] = False
+    elif url.startswith("postgres"):
+        connect_args["connect_timeout"] = int(os.getenv("DB_CONNECT_TIMEOUT", "5"))
+
+    if profile == "serverless":
+        kwargs["poolclass"] = NullPool
+    elif profile == "pooled":
+        kwargs.update(
+            poolclass=InstrumentedQueuePool,
+            pool_size=int(os.getenv("DB_POOL_SIZE", "5")),
+            max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "10")),
+            pool_timeout=float(os.getenv("DB_POOL_TIMEOUT", "30")),
+            pool_recycle=int(os.getenv("DB_POOL_RECYCLE", "1800")),
+            pool_pre_ping=True,
+        )
+    elif profile != "sqlite":
+        raise ValueError(f"Unknown DB_PROFILE {profile!r}")
+
+    engine = create_engine(url, connect_args=connect_args, **kwargs)
+    if isinstance(engine.pool, InstrumentedQueuePool):
+        engine.pool.stats = PoolStats(capacity=kwargs["pool_size"] + max(kwargs["max_overflow"], 0))
+    if profile == "sqlite" and url.startswith("sqlite") and ":memory:" not in url:
+        event.listen(engine, "connect", _sqlite_pragmas)
+    logger.debug("Database engine profile: %s", profile)
+    return engine
+
+
+DB_PROFILE = _profile(DATABASE_URL)
+engine = build_engine(DATABASE_URL, DB_PROFILE)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+replica_engines = [build_engine(url) for url in REPLICA_URLS]
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False)
+
+_replica_turn = itertools.count()
+_replica_breaker = None
 
 
 class Base(DeclarativeBase):
@@ -25,6 +159,120 @@ def get_db():
         db.close()
 
 
+_initialized = False
+_init_lock = threading.Lock()
+
+
+def init_db(bind=None) -> None:
+    """Create missing tables and indexes, and backfill counters for new stats tables.
+
+    Idempotent and run once per process; called from the app's startup (see
+    ``DB_INIT_ON_STARTUP``) rather than at import, and runnable on its own as
+    a deploy step: ``python -c "from database import init_db; init_db()"``.
+    """
+    global _initialized
+    from sqlalchemy import inspect
+
+    import models  # noqa: F401  (registers tables)
+    from services.stats import rebuild_stats
+
+    bind = bind or engine
+    with _init_lock:
+        if _initialized and bind is engine:
+            return
+        # Counters introduced after review_requests existed start from a backfill.
+        backfill_stats = not inspect(bind).has_table("business_stats")
+        Base.metadata.create_all(bind=bind)
+        # create_all skips tables that already exist; add indexes introduced since.
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(bind=bind, checkfirst=True)
+        if backfill_stats:
+            with sessionmaker(bind=bind)() as db:
+                rebuild_stats(db)
+        if bind is engine:
+            _initialized = True
+
+
+def get_read_db(request: Request):
+    """Session for read-only endpoints: a healthy replica if any, else the primary.
+
+    Replicas are tried round-robin; one that fails to hand out a connection is
+    skipped for ``DB_REPLICA_COOLDOWN`` seconds. Requests carrying the
+    read-your-writes cookie (see ``pin_reads_to_primary``) always get the
+    primary. Replica sessions have ``info["replica"]`` set to the replica's
+    index.
+    """
+    db = None
+    if replica_engines and not _pinned_to_primary(request):
+        db = _replica_session()
+    db = db or SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def pin_reads_to_primary(response: Response) -> None:
+    """After a write, send this browser's reads to the primary until replicas catch up."""
+    response.set_cookie(
+        READ_YOUR_WRITES_COOKIE,
+        str(int(time.time()) + READ_YOUR_WRITES_SECONDS),
+        max_age=READ_YOUR_WRITES_SECONDS,
+        httponly=True,
+        samesite="lax",
+    )
+
+
+def _pinned_to_primary(request: Request) -> bool:
+    try:
+        return int(request.cookies.get(READ_YOUR_WRITES_COOKIE, "0")) > time.time()
+    except ValueError:
+        return False
+
+
+def _replica_session():
+    global _replica_breaker
+    if _replica_breaker is None:
+        from services.circuit import CircuitBreaker
+
+        _replica_breaker = CircuitBreaker(threshold=1, cooldown=float(os.getenv("DB_REPLICA_COOLDOWN", "30")))
+
+    start = next(_replica_turn)
+    for offset in range(len(replica_engines)):
+        index = (start + offset) % len(replica_engines)
+        key = f"replica{index}"
+        if not _replica_breaker.allow(key):
+            continue
+        db = ReadSessionLocal(bind=replica_engines[index], info={"replica": index})
+        try:
+            db.connection()  # fail over now rather than on the first query
+        except (DBAPIError, PoolTimeoutError) as e:
+            db.close()
+            _replica_breaker.record(key, False)
+            logger.warning("Read replica %d unavailable, using the primary: %s", index, e)
+            continue
+        _replica_breaker.record(key, True)
+        return db
+    return None
+
+
+def pool_stats(bind=None) -> dict:
+    """Profile, occupancy and checkout waits for the engine's connection pool."""
+    pool = (bind or engine).pool
+    stats = {"profile": DB_PROFILE if bind is None else None, "pool": type(pool).__name__}
+    if isinstance(pool, InstrumentedQueuePool):
+        capacity = pool.stats.capacity
+        stats.update(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            overflow=max(pool.overflow(), 0),
+            saturation=round(pool.checkedout() / capacity, 3) if capacity else 0.0,
+            **pool.stats.snapshot(),
+        )
+    return stats
+
+
 def get_configured_base_url() -> str:
     """Read BASE_URL from environment. Returns empty string if not set."""
     return os.getenv("BASE_URL", "").strip()
@@ -1,22 +1,53 @@
 import logging
 import os
+from contextlib import asynccontextmanager
 from pathlib import Path
 
 from dotenv import load_dotenv
-from fastapi import FastAPI
-from fastapi.responses import FileResponse
+from fastapi import FastAPI, Request
+from fastapi.responses import PlainTextResponse, Response
 from fastapi.staticfiles import StaticFiles
 
 logger = logging.getLogger(__name__)
 
-from database import Base, engine, get_configured_base_url
+from database import DB_PROFILE, get_configured_base_url, init_db
 from routes import api_router, public_router
+from routes.public import Answered
+from services import assets, click_recorder, outbox_worker
+from services.http import close_async_client
+from services.metrics import MetricsMiddleware, registry
+from services.smtp_pool import close_smtp_pool
 
 load_dotenv()
 
-Base.metadata.create_all(bind=engine)
 
-app = FastAPI(title="Review Boost")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Schema setup runs here, not at import, to keep cold imports cheap. On the
+    # serverless profile every cold start would pay for it, so it's off by
+    # default there and run once per deploy instead (see README).
+    default = "0" if DB_PROFILE == "serverless" else "1"
+    if (os.getenv("DB_INIT_ON_STARTUP", "").strip() or default) != "0":
+        init_db()
+    click_recorder.start()
+    if os.getenv("OUTBOX_WORKER", "").lower() == "thread":
+        outbox_worker.start()
+    yield
+    # Flush buffered clicks and finish in-flight sends before the process exits.
+    click_recorder.close()
+    outbox_worker.close()
+    close_smtp_pool()
+    await close_async_client()
+
+
+app = FastAPI(title="Review Boost", lifespan=lifespan)
+app.add_middleware(MetricsMiddleware)
+
+
+@app.exception_handler(Answered)
+async def answered(request: Request, exc: Answered):
+    return exc.response
+
 
 # ── Routers ──────────────────────────────────────────────────────────────────
 app.include_router(api_router)
@@ -27,15 +58,28 @@ _static = Path(__file__).parent / "static"
 app.mount("/static", StaticFiles(directory=_static), name="static")
 
 
-# ── Portal pages (served as static HTML) ─────────────────────────────────────
+# ── Portal pages (static HTML, revalidated by ETag) ──────────────────────────
 @app.get("/portal/send")
-def portal_send():
-    return FileResponse(_static / "send.html")
+def portal_send(request: Request):
+    return assets.respond(request, assets.get("send.html"), assets.REVALIDATE)
 
 
 @app.get("/portal/dashboard")
-def portal_dashboard():
-    return FileResponse(_static / "dashboard.html")
+def portal_dashboard(request: Request):
+    return assets.respond(request, assets.get("dashboard.html"), assets.REVALIDATE)
+
+
+# ── Metrics ──────────────────────────────────────────────────────────────────
+@app.get("/metrics")
+def metrics(request: Request):
+    """Prometheus scrape endpoint: bearer ADMIN_TOKEN, or open with METRICS_PUBLIC=1."""
+    if os.getenv("METRICS_PUBLIC", "").strip().lower() not in ("1", "true", "yes"):
+        token = os.getenv("ADMIN_TOKEN", "").strip()
+        if not token:
+            return Response(status_code=403)
+        if request.headers.get("authorization") != f"Bearer {token}":
+            return Response(status_code=401)
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
 
 
 # ── Local dev entry point ────────────────────────────────────────────────────
@@ -55,6 +99,8 @@ if __name__ == "__main__":
     args = parser.parse_args()
 
     os.environ["SMS_BACKEND"] = args.sms_backend
+    # Long-running server: send queued SMS from an in-process worker thread.
+    os.environ.setdefault("OUTBOX_WORKER", "thread")
     port = int(os.getenv("PORT", "8000"))
 
     base = get_configured_base_url()
@@ -1,6 +1,6 @@
 from datetime import datetime, timezone
 
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Text
+from sqlalchemy import BigInteger, Column, Date, DateTime, ForeignKey, Index, Integer, String, Text
 from sqlalchemy.orm import relationship
 
 from database import Base
@@ -19,6 +19,11 @@ class Business(Base):
 
 class ReviewRequest(Base):
     __tablename__ = "review_requests"
+    __table_args__ = (
+        # Dashboard: newest-first list and per-status counts for one business.
+        Index("ix_review_requests_business_created", "business_id", "created_at"),
+        Index("ix_review_requests_business_status", "business_id", "status"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     business_id = Column(Integer, ForeignKey("businesses.id"), nullable=False)
@@ -31,3 +36,95 @@ class ReviewRequest(Base):
     clicked_at = Column(DateTime, nullable=True)
 
     business = relationship("Business", back_populates="review_requests")
+
+
+class BusinessStats(Base):
+    """Running per-business counters, kept in step with review request status.
+
+    ``total`` counts every request, ``sent`` those that reached ``sent`` (and
+    may since have been clicked), ``clicked`` those in ``clicked``.
+    """
+
+    __tablename__ = "business_stats"
+
+    business_id = Column(Integer, ForeignKey("businesses.id", ondelete="CASCADE"), primary_key=True)
+    total = Column(Integer, nullable=False, default=0)
+    sent = Column(Integer, nullable=False, default=0)
+    clicked = Column(Integer, nullable=False, default=0)
+
+
+class DailyReviewStats(Base):
+    """Sends and clicks per business per UTC day (by ``sent_at`` / ``clicked_at``)."""
+
+    __tablename__ = "daily_review_stats"
+
+    business_id = Column(Integer, ForeignKey("businesses.id", ondelete="CASCADE"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    sent = Column(Integer, nullable=False, default=0)
+    clicked = Column(Integer, nullable=False, default=0)
+
+
+class SendJob(Base):
+    """One /api/send batch. Progress is derived from its outbox messages."""
+
+    __tablename__ = "send_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    idempotency_key = Column(String, unique=True, nullable=True)
+    carrier = Column(String, default="")
+    total = Column(Integer, default=0)
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+
+    messages = relationship("OutboxMessage", back_populates="job")
+
+
+class OutboxMessage(Base):
+    __tablename__ = "outbox_messages"
+    __table_args__ = (Index("ix_outbox_messages_status_next_attempt", "status", "next_attempt_at"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    job_id = Column(Integer, ForeignKey("send_jobs.id"), nullable=False, index=True)
+    review_request_id = Column(Integer, ForeignKey("review_requests.id", ondelete="SET NULL"), nullable=True)
+    idempotency_key = Column(String, unique=True, nullable=False)
+    recipient = Column(String, nullable=False)
+    body = Column(Text, nullable=False)
+    carrier = Column(String, default="")
+    status = Column(String, default="pending")  # pending -> sending -> sent | failed
+    attempts = Column(Integer, default=0)
+    next_attempt_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    claim_token = Column(String, nullable=True)
+    claimed_at = Column(DateTime, nullable=True)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    sent_at = Column(DateTime, nullable=True)
+
+    job = relationship("SendJob", back_populates="messages")
+
+
+class PlaceCacheEntry(Base):
+    """Persistent tier of the Google Places resolution cache.
+
+    ``key`` is ``input:<normalized input>``, ``url:<canonical Maps URL>`` or
+    ``place:<place_id>``. A row with no ``place_id`` is a cached "not found".
+    """
+
+    __tablename__ = "place_cache"
+
+    key = Column(String, primary_key=True)
+    place_id = Column(String, nullable=True, index=True)
+    name = Column(String, nullable=True)
+    expires_at = Column(DateTime, nullable=False)
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+
+
+class ShortCodeSequence(Base):
+    """Counter the ``sequence`` short-code allocator reserves blocks from.
+
+    ``key`` is the permutation key used when ``SHORT_CODE_KEY`` is not set.
+    """
+
+    __tablename__ = "short_code_sequence"
+
+    name = Column(String, primary_key=True)
+    next_value = Column(BigInteger, nullable=False, default=0)
+    key = Column(String, nullable=False)
@@ -1,18 +1,59 @@
 """JSON API endpoints — consumed by the portal frontend."""
 
-from datetime import datetime, timezone
-
-from fastapi import APIRouter, Depends, Request
-from fastapi.responses import JSONResponse
-from sqlalchemy import func
+import base64
+import binascii
+import logging
+import os
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, BackgroundTasks, Depends, Request, Response, UploadFile
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy import case, func, insert, tuple_
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
-from database import get_configured_base_url, get_db
-from models import Business, ReviewRequest
-from services import SMS_GATEWAYS, diagnose_sms, generate_review_text, generate_unique_short_code, resolve_google_place, send_sms
+from database import (
+    get_configured_base_url,
+    get_db,
+    get_read_db,
+    pin_reads_to_primary,
+    pool_stats,
+    replica_engines,
+)
+from models import Business, BusinessStats, ReviewRequest
+from services import (
+    EXPORT_FORMATS,
+    SMS_GATEWAYS,
+    bump_business_stats,
+    diagnose_sms,
+    enqueue_send,
+    export_review_requests,
+    forget_review_request,
+    generate_review_text,
+    job_progress,
+    normalize_us_phone,
+    outbox_worker,
+    places_cache,
+    purge_place_cache_entries,
+    recipient_file_kind,
+    recipient_import_ndjson,
+    reserve_short_codes,
+    resolve_google_place,
+    resolve_google_place_async,
+    review_timeseries,
+    send_sms_async,
+    short_link_cache,
+)
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api")
 
+# /api/generate makes one model call per phone inside the request; the portal
+# sends longer lists in batches of at most this many.
+GENERATE_MAX_PHONES = int(os.getenv("GENERATE_MAX_PHONES", "50"))
+
 
 def _base_url(request: Request) -> str:
     env = get_configured_base_url()
@@ -29,10 +70,10 @@ def list_carriers():
 
 
 @router.get("/resolve-place")
-def resolve_place(url: str):
+async def resolve_place(url: str, db: Session = Depends(get_db)):
     if not url.strip():
         return JSONResponse({"error": "URL is required"}, status_code=400)
-    result = resolve_google_place(url.strip())
+    result = await resolve_google_place_async(url.strip(), db=db)
     if result:
         return result
     return JSONResponse(
@@ -42,7 +83,7 @@ def resolve_place(url: str):
 
 
 @router.get("/businesses")
-def list_businesses(db: Session = Depends(get_db)):
+def list_businesses(db: Session = Depends(get_read_db)):
     rows = db.query(Business).order_by(Business.name).all()
     return [
         {"id": b.id, "name": b.name, "google_place_id": b.google_place_id}
@@ -51,15 +92,23 @@ def list_businesses(db: Session = Depends(get_db)):
 
 
 @router.post("/generate")
-def generate_reviews(request: Request, payload: dict, db: Session = Depends(get_db)):
+def generate_reviews(request: Request, payload: dict, response: Response, db: Session = Depends(get_db)):
     """Resolve business, generate reviews, create DB records with real links."""
     google_link = (payload.get("google_link") or "").strip()
-    phones = [p.strip() for p in payload.get("phones", []) if p.strip()]
+    phones = _unique_phones(payload.get("phones", []))
 
     if not phones:
         return JSONResponse({"error": "At least one phone number is required."}, status_code=400)
+    if len(phones) > GENERATE_MAX_PHONES:
+        return JSONResponse(
+            {
+                "error": f"At most {GENERATE_MAX_PHONES} phone numbers per request; send longer lists in batches.",
+                "max_phones": GENERATE_MAX_PHONES,
+            },
+            status_code=413,
+        )
 
-    place = resolve_google_place(google_link)
+    place = resolve_google_place(google_link, db=db)
     if not place:
         return JSONResponse(
             {"error": "Could not resolve Google link. Check GOOGLE_MAPS_API_KEY and the link."},
@@ -73,36 +122,28 @@ def generate_reviews(request: Request, payload: dict, db: Session = Depends(get_
         db.commit()
         db.refresh(biz)
 
-    base = _base_url(request)
-    reviews = []
+    review_texts = []
     for phone in phones:
         try:
-            review_text = generate_review_text(biz.name)
+            review_texts.append(generate_review_text(biz.name))
         except Exception as e:
             return JSONResponse(
                 {"error": f"Failed to generate review text: {e}"},
                 status_code=502,
             )
-        code = generate_unique_short_code(db)
-        link = f"{base}/r/{code}"
-        sms_body = f"Thanks for visiting {biz.name}! We'd love a quick Google review: {link}"
-
-        rr = ReviewRequest(
-            business_id=biz.id,
-            customer_contact=phone,
-            short_code=code,
-            review_text=review_text,
-            status="pending",
-        )
-        db.add(rr)
-        db.commit()
-        db.refresh(rr)
 
+    ids, codes = _insert_review_requests(db, biz.id, phones, review_texts)
+    pin_reads_to_primary(response)
+
+    base = _base_url(request)
+    reviews = []
+    for review_id, phone, review_text, code in zip(ids, phones, review_texts, codes):
+        link = f"{base}/r/{code}"
         reviews.append({
-            "id": rr.id,
+            "id": review_id,
             "phone": phone,
             "review_text": review_text,
-            "sms_body": sms_body,
+            "sms_body": f"Thanks for visiting {biz.name}! We'd love a quick Google review: {link}",
             "link": link,
         })
 
@@ -112,94 +153,315 @@ def generate_reviews(request: Request, payload: dict, db: Session = Depends(get_
     }
 
 
+def _unique_phones(raw: list[str]) -> list[str]:
+    """Stripped, non-empty numbers, each person once: US numbers compare by their 10 digits."""
+    phones, seen = [], set()
+    for value in raw:
+        value = value.strip()
+        key = normalize_us_phone(value) or value
+        if value and key not in seen:
+            seen.add(key)
+            phones.append(value)
+    return phones
+
+
+@router.post("/recipients/import")
+def import_recipients(file: UploadFile):
+    """Read a CSV/XLSX recipient list and stream the result as NDJSON.
+
+    Batches of normalized, de-duplicated numbers and per-row errors are sent
+    as the file is read; the last line is a summary (see services.recipients).
+    FastAPI 0.118+ closes the upload only after the body has been streamed.
+    """
+    kind = recipient_file_kind(file.filename, file.content_type)
+    if kind is None:
+        return JSONResponse({"error": "Upload a .csv or .xlsx file."}, status_code=400)
+    if kind == "xlsx":
+        try:
+            import openpyxl  # noqa: F401
+        except ImportError:
+            return JSONResponse(
+                {"error": "XLSX import needs openpyxl (pip install openpyxl); upload a CSV instead."},
+                status_code=400,
+            )
+    return StreamingResponse(recipient_import_ndjson(file.file, kind), media_type="application/x-ndjson")
+
+
+def _insert_review_requests(
+    db: Session, business_id: int, phones: list[str], review_texts: list[str], attempts: int = 3
+) -> tuple[list[int], list[str]]:
+    """Insert the whole batch with one INSERT … RETURNING. Returns (ids, short codes).
+
+    Codes are reserved up front; if a concurrent batch takes one of them
+    first, the unique constraint rejects the insert and we retry with fresh
+    codes.
+    """
+    for attempt in range(attempts):
+        codes = reserve_short_codes(db, len(phones))
+        try:
+            # Rows come back in any order; short codes are unique, so map by code.
+            # (sort_by_parameter_order would make SQLite fall back to one INSERT per row.)
+            inserted = db.execute(
+                insert(ReviewRequest).returning(ReviewRequest.short_code, ReviewRequest.id),
+                [
+                    {
+                        "business_id": business_id,
+                        "customer_contact": phone,
+                        "short_code": code,
+                        "review_text": review_text,
+                        "status": "pending",
+                    }
+                    for phone, review_text, code in zip(phones, review_texts, codes)
+                ],
+            ).all()
+            id_by_code = dict(inserted)
+            ids = [id_by_code[code] for code in codes]
+            bump_business_stats(db, business_id, total=len(ids))
+            db.commit()
+            return ids, codes
+        except IntegrityError:
+            db.rollback()
+            if attempt == attempts - 1:
+                raise
+            logger.warning("Short code collision on insert, retrying with new codes")
+
+
 @router.post("/send")
-def send_review(payload: dict, db: Session = Depends(get_db)):
-    """Send previously generated reviews. Accepts edited sms_body and review_text."""
+def send_review(request: Request, payload: dict, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
+    """Queue previously generated reviews for sending. Accepts edited sms_body and review_text.
+
+    Returns a job id right away; poll /api/jobs/{job_id} for progress. An
+    Idempotency-Key header (or "idempotency_key" field) makes retries safe.
+    """
     items = payload.get("reviews", [])
     carrier = (payload.get("carrier") or "").strip()
 
     if not items:
         return JSONResponse({"error": "No reviews to send."}, status_code=400)
 
-    sent_to: list[str] = []
-    failed: list[str] = []
-    errors: list[str] = []
-    for item in items:
-        rr_id = item.get("id")
-        sms_body = (item.get("sms_body") or "").strip()
-        review_text = (item.get("review_text") or "").strip()
-
-        rr = db.query(ReviewRequest).filter(ReviewRequest.id == rr_id).first()
-        if not rr:
-            continue
-
-        # Apply edits from preview
-        if review_text:
-            rr.review_text = review_text
-        rr.status = "sent"
-        rr.sent_at = datetime.now(timezone.utc)
-        db.commit()
+    key = (request.headers.get("idempotency-key") or payload.get("idempotency_key") or "").strip()
+    job = enqueue_send(db, items, carrier=carrier, idempotency_key=key or None)
 
-        result = send_sms(to=rr.customer_contact, body=sms_body, carrier=carrier)
-        if result["ok"]:
-            sent_to.append(rr.customer_contact)
-        else:
-            failed.append(rr.customer_contact)
-            errors.append(f"{rr.customer_contact}: {result.get('error', 'unknown')}")
+    if outbox_worker.running:
+        outbox_worker.wake()
+    else:
+        # No resident worker (serverless): start draining once the response is out.
+        background_tasks.add_task(outbox_worker.drain, float(os.getenv("OUTBOX_DRAIN_BUDGET", "20")))
 
-    resp = {"sent": sent_to, "failed": failed}
-    if errors:
-        resp["errors"] = errors
+    resp = JSONResponse({"job_id": job.id, "total": job.total, "status": "queued"}, status_code=202)
+    pin_reads_to_primary(resp)
     return resp
 
 
+@router.get("/jobs/{job_id}")
+def send_job_status(job_id: int, db: Session = Depends(get_db)):
+    """Progress of a send job, with the same sent/failed/errors lists /api/send used to return."""
+    progress = job_progress(db, job_id)
+    if progress is None:
+        return JSONResponse({"error": "Not found"}, status_code=404)
+    return progress
+
+
+@router.get("/outbox/drain")
+def drain_outbox(request: Request):
+    """Process due outbox messages. Called by the Vercel cron (see vercel.json)."""
+    secret = os.getenv("CRON_SECRET", "").strip()
+    if not secret:
+        return JSONResponse({"error": "CRON_SECRET is not configured"}, status_code=403)
+    if request.headers.get("authorization") != f"Bearer {secret}":
+        return JSONResponse({"error": "Unauthorized"}, status_code=401)
+    processed = outbox_worker.drain(float(os.getenv("OUTBOX_DRAIN_BUDGET", "20")))
+    return {"processed": processed}
+
+
+_STATUSES = ("pending", "sent", "clicked")
+_PAGE_MAX = 500
+
+
 @router.get("/dashboard")
-def dashboard_stats(business_id: int, db: Session = Depends(get_db)):
-    total = db.query(func.count(ReviewRequest.id)).filter(
-        ReviewRequest.business_id == business_id
-    ).scalar()
-    clicked = db.query(func.count(ReviewRequest.id)).filter(
-        ReviewRequest.business_id == business_id,
-        ReviewRequest.status == "clicked",
-    ).scalar()
-
-    reviews = (
-        db.query(ReviewRequest)
-        .filter(ReviewRequest.business_id == business_id)
-        .order_by(ReviewRequest.created_at.desc())
-        .limit(100)
+def dashboard_stats(
+    business_id: int,
+    cursor: Optional[str] = None,
+    limit: int = 100,
+    status: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    db: Session = Depends(get_read_db),
+):
+    """Stats plus one page of review requests, newest first.
+
+    Pages are keyed on ``(created_at, id)``: pass the returned ``next_cursor``
+    back as ``cursor`` to get the next page. ``status`` filters by one or more
+    comma-separated statuses, ``since`` (inclusive) and ``until`` (exclusive)
+    by ``created_at``. Stats are only computed for the first page.
+    """
+    try:
+        after = _decode_cursor(cursor) if cursor else None
+        since_dt = datetime.fromisoformat(since) if since else None
+        until_dt = datetime.fromisoformat(until) if until else None
+    except ValueError:
+        return JSONResponse({"error": "Invalid cursor or date."}, status_code=400)
+    statuses = [s for s in (status or "").split(",") if s]
+    limit = max(1, min(limit, _PAGE_MAX))
+
+    resp = {}
+    if after is None:
+        resp["stats"] = _business_stats(db, business_id)
+
+    # Only the columns the list renders, walking (business_id, created_at).
+    query = db.query(
+        ReviewRequest.id,
+        ReviewRequest.customer_contact,
+        ReviewRequest.status,
+        ReviewRequest.created_at,
+        ReviewRequest.sent_at,
+        ReviewRequest.clicked_at,
+    ).filter(ReviewRequest.business_id == business_id)
+    if statuses:
+        query = query.filter(ReviewRequest.status.in_(statuses))
+    if since_dt:
+        query = query.filter(ReviewRequest.created_at >= since_dt)
+    if until_dt:
+        query = query.filter(ReviewRequest.created_at < until_dt)
+    if after:
+        query = query.filter(tuple_(ReviewRequest.created_at, ReviewRequest.id) < after)
+    rows = (
+        query.order_by(ReviewRequest.created_at.desc(), ReviewRequest.id.desc())
+        .limit(limit + 1)
         .all()
     )
 
+    page = rows[:limit]
+    resp["reviews"] = [
+        {
+            "id": r.id,
+            "customer_contact": r.customer_contact,
+            "status": r.status,
+            "sent_at": r.sent_at.isoformat() if r.sent_at else None,
+            "clicked_at": r.clicked_at.isoformat() if r.clicked_at else None,
+        }
+        for r in page
+    ]
+    resp["next_cursor"] = _encode_cursor(page[-1].created_at, page[-1].id) if len(rows) > limit else None
+    return resp
+
+
+def _business_stats(db: Session, business_id: int) -> dict:
+    stats = db.get(BusinessStats, business_id)
+    if stats is not None:
+        total, clicked = stats.total, stats.clicked
+        by_status = {"pending": total - stats.sent, "sent": stats.sent - clicked, "clicked": clicked}
+    else:
+        # No counters yet (e.g. rows written before business_stats existed):
+        # one pass over the (business_id, status) index instead.
+        counts = db.query(
+            func.count(ReviewRequest.id),
+            *(
+                func.coalesce(func.sum(case((ReviewRequest.status == s, 1), else_=0)), 0)
+                for s in _STATUSES
+            ),
+        ).filter(ReviewRequest.business_id == business_id).one()
+        total, by_status = counts[0], dict(zip(_STATUSES, counts[1:]))
+        clicked = by_status["clicked"]
     return {
-        "stats": {
-            "total_sent": total,
-            "total_clicked": clicked,
-            "click_rate": round(clicked / total * 100, 1) if total else 0,
-        },
-        "reviews": [
-            {
-                "id": r.id,
-                "customer_contact": r.customer_contact,
-                "status": r.status,
-                "sent_at": r.sent_at.isoformat() if r.sent_at else None,
-                "clicked_at": r.clicked_at.isoformat() if r.clicked_at else None,
-            }
-            for r in reviews
-        ],
+        "total_sent": total,
+        "total_clicked": clicked,
+        "click_rate": round(clicked / total * 100, 1) if total else 0,
+        "by_status": by_status,
     }
 
 
+@router.get("/dashboard/timeseries")
+def dashboard_timeseries(business_id: int, days: int = 90, db: Session = Depends(get_read_db)):
+    """Daily sent/clicked counts for the last ``days`` days (max 366), from the rollup table."""
+    days = max(1, min(days, 366))
+    return {"business_id": business_id, "days": review_timeseries(db, business_id, days)}
+
+
+@router.get("/export")
+def export_reviews(
+    business_id: int,
+    format: str = "csv",
+    status: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    db: Session = Depends(get_read_db),
+):
+    """Every review request of a business as CSV or NDJSON, oldest first, streamed.
+
+    Takes the same ``status``, ``since`` and ``until`` filters as ``/dashboard``.
+    The session stays open until the body has been sent: FastAPI 0.118+
+    (the minimum in pyproject.toml) runs the dependency's teardown after a
+    streaming response completes.
+    """
+    if format not in EXPORT_FORMATS:
+        return JSONResponse({"error": f"format must be one of: {', '.join(EXPORT_FORMATS)}"}, status_code=400)
+    try:
+        since_dt = datetime.fromisoformat(since) if since else None
+        until_dt = datetime.fromisoformat(until) if until else None
+    except ValueError:
+        return JSONResponse({"error": "Invalid date."}, status_code=400)
+    statuses = [s for s in (status or "").split(",") if s]
+
+    body = export_review_requests(db, business_id, format, since=since_dt, until=until_dt, statuses=statuses)
+    filename = f"review-requests-{business_id}.{format}"
+    return StreamingResponse(
+        body,
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+def _encode_cursor(created_at: datetime, review_id: int) -> str:
+    raw = f"{created_at.isoformat()}|{review_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, review_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(created_at), int(review_id)
+    except (UnicodeDecodeError, binascii.Error) as e:
+        raise ValueError(str(e)) from e
+
+
 @router.delete("/review/{review_id}")
-def delete_review(review_id: int, db: Session = Depends(get_db)):
+def delete_review(review_id: int, response: Response, db: Session = Depends(get_db)):
     rr = db.query(ReviewRequest).filter(ReviewRequest.id == review_id).first()
     if not rr:
         return JSONResponse({"error": "Not found"}, status_code=404)
+    forget_review_request(db, rr)
     db.delete(rr)
     db.commit()
+    short_link_cache.pop(rr.short_code)
+    pin_reads_to_primary(response)
     return {"ok": True}
 
 
+@router.get("/cache-stats")
+def cache_stats():
+    """Hit/miss counters for the in-process caches."""
+    return {"short_links": short_link_cache.stats(), "places": places_cache.stats()}
+
+
+@router.get("/pool-stats")
+def database_pool_stats():
+    """Connection pool occupancy and checkout waits for the primary and each replica."""
+    return {**pool_stats(), "replicas": [pool_stats(e) for e in replica_engines]}
+
+
+@router.delete("/place-cache")
+def purge_place_cache(request: Request, target: str = "", db: Session = Depends(get_db)):
+    """Admin: drop cached place resolutions for one input/URL/place id, or all of them."""
+    token = os.getenv("ADMIN_TOKEN", "").strip()
+    if not token:
+        return JSONResponse({"error": "ADMIN_TOKEN is not configured"}, status_code=403)
+    if request.headers.get("authorization") != f"Bearer {token}":
+        return JSONResponse({"error": "Unauthorized"}, status_code=401)
+    return {"ok": True, "removed": purge_place_cache_entries(db, target.strip())}
+
+
 @router.get("/sms-diagnose")
 def sms_diagnose():
     """Quick diagnostic: checks SMS backend config and SMTP connectivity."""
@@ -207,11 +469,11 @@ def sms_diagnose():
 
 
 @router.post("/sms-test")
-def sms_test(payload: dict):
+async def sms_test(payload: dict):
     """Send a plain-text test SMS (no URL) to verify carrier gateway."""
     phone = (payload.get("phone") or "").strip()
     carrier = (payload.get("carrier") or "").strip()
     if not phone or not carrier:
         return JSONResponse({"error": "phone and carrier are required"}, status_code=400)
-    result = send_sms(to=phone, body="Test message from ReviewBoost. If you see this, SMS is working!", carrier=carrier)
+    result = await send_sms_async(to=phone, body="Test message from ReviewBoost. If you see this, SMS is working!", carrier=carrier)
     return result
@@ -1,85 +1,185 @@
 """Public routes: short-link redirect with clipboard copy."""
 
+import html
 import json
-from datetime import datetime, timezone
+from dataclasses import dataclass
+from urllib.parse import quote
 
-from fastapi import APIRouter, Depends
-from fastapi.responses import HTMLResponse, RedirectResponse
+from fastapi import APIRouter, BackgroundTasks, Depends, Request
+from fastapi.responses import HTMLResponse, RedirectResponse, Response
 from sqlalchemy.orm import Session
 
-from database import get_db
+from database import SessionLocal, get_read_db
 from models import Business, ReviewRequest
+from services import admission, assets, click_recorder, short_link_cache
+from services.metrics import short_link_admissions
 
 router = APIRouter()
 
 
+@dataclass
+class LandingEntry:
+    """Cached resolution of a short code: enough to serve a click without the DB."""
+
+    review_id: int
+    status: str
+    place_id: str
+    page: bytes
+    etag: str
+
+    def mark_clicked(self) -> None:
+        self.status = "clicked"
+
+
+class Answered(Exception):
+    """Raised by a dependency that has already decided the response; see ``main``."""
+
+    def __init__(self, response: Response):
+        self.response = response
+
+
+# What link previews and scanners get: no business data, never cached for anyone
+# else. Someone taken for one can carry on through the link (``?go=1``).
+PREVIEW_PAGE = """\
+<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<meta name="robots" content="noindex">
+<title>Leave a review</title>
+<meta property="og:title" content="Leave a review">
+<meta property="og:description" content="Tap to copy your review and open Google.">
+</head>
+<body><p><a href="{href}" rel="nofollow">Continue to leave your review</a></p></body>
+</html>"""
+
+
+def _render_preview(code: str) -> bytes:
+    href = f"/r/{quote(code, safe='')}?go=1"
+    return PREVIEW_PAGE.format(href=html.escape(href)).encode()
+
+
 @router.get("/", response_class=RedirectResponse)
 def root():
     return RedirectResponse("/portal/send")
 
 
-@router.get("/r/{code}", response_class=HTMLResponse)
-def review_landing(code: str, db: Session = Depends(get_db)):
-    rr = db.query(ReviewRequest).filter(ReviewRequest.short_code == code).first()
-    if not rr:
-        return HTMLResponse("<h1>Link not found</h1>", status_code=404)
+def admit_short_link(code: str, request: Request) -> None:
+    """Answer previews and floods before a session is opened.
+
+    Every client is held to its per-IP bucket. Previews, prefetches and
+    scanners (``services.admission.classify``) then get ``PREVIEW_PAGE``;
+    anything else, including whoever follows its link, must also fit the
+    link's per-code bucket. Over a limit is a 429.
+    """
+    confirmed = request.query_params.get("go") == "1"
+    if not admission.ip_limiter.try_acquire(admission.client_ip(request)):
+        outcome = "shed_ip"
+    elif admission.classify(request.method, request.headers, confirmed):
+        outcome = "preview"
+    elif not admission.code_limiter.try_acquire(code):
+        outcome = "shed_code"
+    else:
+        short_link_admissions.inc("admitted")
+        return
+    short_link_admissions.inc(outcome)
+    if outcome == "preview":
+        raise Answered(HTMLResponse(_render_preview(code), headers={"Cache-Control": "no-store", "X-Robots-Tag": "noindex"}))
+    raise Answered(Response("Too many requests", status_code=429, headers={"Retry-After": "1"}))
+
+
+@router.api_route(
+    "/r/{code}", methods=["GET", "HEAD"], response_class=HTMLResponse, dependencies=[Depends(admit_short_link)]
+)
+def review_landing(
+    code: str,
+    request: Request,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_read_db),
+):
+    """Landing page of a short link.
+
+    The page is a few hundred bytes: markup plus an inline JSON payload, with
+    CSS and JS from immutable ``/a/`` URLs. It is sent with an ETag and
+    ``no-cache``, so a repeat visit revalidates (and is counted) but gets a
+    body-less 304. Previews and floods never get here (``admit_short_link``).
+    """
+    entry = short_link_cache.get(code)
+    if entry is None:
+        row = _landing_row(db, code)
+        if db.info.get("replica") is not None and (row is None or row.status == "pending"):
+            # Possibly replication lag on a link that was just created or sent.
+            with SessionLocal() as primary:
+                row = _landing_row(primary, code)
+        if not row:
+            return HTMLResponse("<h1>Link not found</h1>", status_code=404)
+        page = _render_landing(row.review_text, row.google_place_id)
+        entry = LandingEntry(
+            review_id=row.id,
+            status=row.status,
+            place_id=row.google_place_id,
+            page=page,
+            etag=assets.etag_for(page),
+        )
+        # A pending link turns "sent" in whichever process runs the outbox
+        # worker, which can't reach this cache; read it again until then.
+        if row.status != "pending":
+            short_link_cache.set(code, entry)
+
+    # The click is buffered and written after the response goes out. The
+    # entry only turns "clicked" once that write has committed, so until then
+    # a repeat visit records it again (coalesced in the buffer).
+    if entry.status == "sent":
+        if click_recorder.record(entry.review_id, on_written=entry.mark_clicked):
+            background_tasks.add_task(click_recorder.flush)
+
+    headers = {"ETag": entry.etag, "Cache-Control": assets.REVALIDATE}
+    if assets.etag_matches(request.headers.get("if-none-match"), entry.etag):
+        return Response(status_code=304, headers=headers)
+    return HTMLResponse(entry.page, headers=headers)
+
+
+@router.get("/a/{name}")
+def static_asset(name: str, request: Request):
+    """Fingerprinted asset (see services.assets)."""
+    asset, current = assets.lookup(name)
+    if asset is None:
+        return Response(status_code=404)
+    return assets.respond(request, asset, assets.IMMUTABLE if current else assets.REVALIDATE)
+
+
+def _landing_row(db: Session, code: str):
+    return (
+        db.query(ReviewRequest.id, ReviewRequest.status, ReviewRequest.review_text, Business.google_place_id)
+        .join(Business, Business.id == ReviewRequest.business_id)
+        .filter(ReviewRequest.short_code == code)
+        .first()
+    )
 
-    if rr.status == "sent":
-        rr.status = "clicked"
-        rr.clicked_at = datetime.now(timezone.utc)
-        db.commit()
 
-    biz = db.query(Business).filter(Business.id == rr.business_id).first()
-    review_url = f"https://search.google.com/local/writereview?placeid={biz.google_place_id}"
-    review_text_json = json.dumps(rr.review_text)
+def _render_landing(review_text: str, place_id: str) -> bytes:
+    review_url = f"https://search.google.com/local/writereview?placeid={place_id}"
+    # "<" escaped so the text can't close the <script> element it sits in.
+    payload = json.dumps({"text": review_text, "url": review_url}).replace("<", "\\u003c")
 
-    return HTMLResponse(f"""\
+    return f"""\
 <!DOCTYPE html>
 <html lang="en">
 <head>
 <meta charset="utf-8">
 <meta name="viewport" content="width=device-width,initial-scale=1">
 <title>Redirecting…</title>
-<style>
-  body {{ margin:0; display:flex; align-items:center; justify-content:center;
-         min-height:100vh; font-family:system-ui,sans-serif; background:#fafafa; color:#333; }}
-  .wrap {{ text-align:center; padding:2rem; }}
-  .btn {{ display:inline-block; margin:.5rem; padding:.6rem 1.2rem; border:none;
-          border-radius:.5rem; font-size:.9rem; cursor:pointer; text-decoration:none; }}
-  .copy {{ background:#ffe17c; color:#171e19; }}
-  .open {{ background:#171e19; color:#fff; }}
-  .hidden {{ display:none; }}
-</style>
+<link rel="stylesheet" href="{assets.url('landing.css')}">
+<script src="{assets.url('landing.js')}" defer></script>
 </head>
 <body>
 <div class="wrap">
   <p id="status">Copying review &amp; redirecting to Google…</p>
   <div id="fallback" class="hidden">
-    <button class="btn copy" onclick="doCopy()">Copy Review Text</button>
-    <a class="btn open" href="{review_url}">Open Google Reviews</a>
+    <button class="btn copy">Copy Review Text</button>
+    <a class="btn open" href="{html.escape(review_url)}">Open Google Reviews</a>
   </div>
 </div>
-<script>
-const reviewText = {review_text_json};
-const reviewUrl = "{review_url}";
-async function doCopy() {{
-  try {{
-    await navigator.clipboard.writeText(reviewText);
-    document.querySelector('.copy').textContent = 'Copied!';
-  }} catch(e) {{
-    prompt('Copy this review:', reviewText);
-  }}
-}}
-(async () => {{
-  try {{
-    await navigator.clipboard.writeText(reviewText);
-    document.getElementById('status').textContent = 'Review copied! Redirecting…';
-    setTimeout(() => {{ window.location.href = reviewUrl; }}, 1500);
-  }} catch(e) {{
-    document.getElementById('status').textContent = 'Tap Copy, then open Google Reviews.';
-    document.getElementById('fallback').classList.remove('hidden');
-  }}
-}})();
-</script>
+<script id="review" type="application/json">{payload}</script>
 </body>
-</html>""")
+</html>""".encode("utf-8")
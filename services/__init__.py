@@ -1,3 +1,28 @@
-from .google_places import resolve_google_place
-from .review import generate_review_text, generate_short_code, generate_unique_short_code
-from .sms import SMS_GATEWAYS, diagnose_sms, send_sms
+from .cache import TTLCache, short_link_cache
+from .clicks import ClickRecorder, click_recorder
+from .dispatch import dispatch_sms
+from .export import FORMATS as EXPORT_FORMATS
+from .export import stream as export_review_requests
+from .google_places import resolve_google_place, resolve_google_place_async
+from .outbox import OutboxWorker, enqueue_send, job_progress, outbox_worker
+from .places_cache import places_cache
+from .places_cache import purge as purge_place_cache_entries
+from .ratelimit import TokenBucket
+from .recipients import file_kind as recipient_file_kind
+from .recipients import ndjson as recipient_import_ndjson
+from .review import (
+    generate_review_text,
+    generate_short_code,
+    generate_unique_short_code,
+    probe_short_codes,
+    reserve_short_codes,
+)
+from .shortcodes import CodePermutation, short_code_allocator
+from .sms import SMS_GATEWAYS, diagnose_sms, normalize_us_phone, send_sms, send_sms_async
+from .stats import (
+    bump_business_stats,
+    check_stats,
+    forget_review_request,
+    rebuild_stats,
+    review_timeseries,
+)
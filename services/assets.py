@@ -0,0 +1,248 @@
+"""Fingerprinted, precompressed static assets.
+
+Sub-resources (``ASSETS``) are served from ``/a/<name>.<hash>.<ext>``. The
+hash changes whenever the file does, so browsers and CDNs may keep a response
+forever (``immutable``) and a deploy is picked up through the new URL. A
+request for an older hash of a known asset still gets the current file,
+without the long cache, so pages rendered before a deploy keep their styles.
+
+The portal pages (``PAGES``) keep their URLs; they are sent with an ETag and
+``no-cache`` so a reload costs a 304, and their ``/static/`` references to
+``ASSETS`` are rewritten to the fingerprinted URLs.
+
+Every file is available gzip- and (with the ``brotli`` package installed)
+brotli-encoded, picked by ``Accept-Encoding``. ``python -m services.assets
+build`` writes the encoded files and a manifest to ``static/build/`` ahead of
+time; without it, files are compressed in memory on first use.
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import mimetypes
+import re
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+logger = logging.getLogger(__name__)
+
+ASSET_DIR = Path(__file__).resolve().parent.parent / "static"
+BUILD_DIR = ASSET_DIR / "build"
+# Files that may be served from /a/.
+ASSETS = ("landing.css", "landing.js", "style.css")
+# HTML entry points, served under their own routes.
+PAGES = ("send.html", "dashboard.html")
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+
+# Preferred first. Files that don't shrink by at least this much stay identity-only.
+ENCODINGS = ("br", "gzip")
+_MIN_SAVING = 0.1
+_SUFFIX = {"br": "br", "gzip": "gz"}
+
+
+@dataclass(frozen=True)
+class Asset:
+    name: str  # landing.css
+    path: str  # /a/landing.1a2b3c4d.css
+    body: bytes
+    media_type: str
+    etag: str
+    encoded: dict = field(default_factory=dict)  # encoding -> bytes
+
+
+_assets: dict[str, Asset] = {}
+_lock = threading.RLock()
+
+
+def etag_for(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=8).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an ``If-None-Match`` header covers ``etag`` (weak comparison, as RFC 9110 asks)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag.removeprefix("W/") in tags
+
+
+def negotiate(accept_encoding: Optional[str], available) -> Optional[str]:
+    """The preferred encoding in ``available`` the client accepts, or None for identity."""
+    accepted: dict[str, float] = {}
+    for part in (accept_encoding or "").lower().split(","):
+        coding, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if coding:
+            accepted[coding] = q
+    best, best_q = None, 0.0
+    for coding in ENCODINGS:
+        q = accepted.get(coding, accepted.get("*", 0.0))
+        if coding in available and q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+def _compress(body: bytes, encoding: str) -> Optional[bytes]:
+    if encoding == "gzip":
+        # mtime=0 keeps the output identical across builds.
+        return gzip.compress(body, compresslevel=9, mtime=0)
+    try:
+        import brotli
+    except ImportError:
+        return None
+    return brotli.compress(body, quality=11)
+
+
+def _encode_all(body: bytes) -> dict:
+    encoded = {}
+    for encoding in ENCODINGS:
+        data = _compress(body, encoding)
+        if data is not None and len(data) <= len(body) * (1 - _MIN_SAVING):
+            encoded[encoding] = data
+    return encoded
+
+
+def _source(name: str) -> bytes:
+    body = (ASSET_DIR / name).read_bytes()
+    if name in PAGES:
+        # Point /static/style.css and friends at their fingerprinted URLs.
+        text = re.sub(
+            r"/static/([\w.-]+)",
+            lambda m: url(m.group(1)) if m.group(1) in ASSETS else m.group(0),
+            body.decode("utf-8"),
+        )
+        body = text.encode("utf-8")
+    return body
+
+
+def _manifest() -> dict:
+    try:
+        return json.loads((BUILD_DIR / "manifest.json").read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def _load(name: str) -> Asset:
+    body = _source(name)
+    digest = hashlib.blake2b(body, digest_size=4).hexdigest()
+    stem, ext = name.rsplit(".", 1)
+    media_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+    if media_type.startswith("text/") or media_type.endswith("javascript"):
+        media_type += "; charset=utf-8"
+
+    built = _manifest().get(name)
+    if built and built["digest"] == digest:
+        encoded = {enc: (BUILD_DIR / file).read_bytes() for enc, file in built["encoded"].items()}
+    else:
+        encoded = _encode_all(body)
+    return Asset(name, f"/a/{stem}.{digest}.{ext}", body, media_type, f'"{digest}"', encoded)
+
+
+def get(name: str) -> Asset:
+    """The current version of ``name`` (one of ``ASSETS`` or ``PAGES``), loaded on first use."""
+    asset = _assets.get(name)
+    if asset is None:
+        if name not in ASSETS and name not in PAGES:
+            raise KeyError(name)
+        with _lock:
+            asset = _assets.get(name)
+            if asset is None:
+                asset = _assets[name] = _load(name)
+    return asset
+
+
+def url(name: str) -> str:
+    return get(name).path
+
+
+def lookup(fingerprinted: str) -> tuple[Optional[Asset], bool]:
+    """Resolve ``landing.<hash>.css`` to (asset, whether the hash is the current one)."""
+    parts = fingerprinted.split(".")
+    if len(parts) != 3 or f"{parts[0]}.{parts[2]}" not in ASSETS:
+        return None, False
+    asset = get(f"{parts[0]}.{parts[2]}")
+    return asset, asset.path == f"/a/{fingerprinted}"
+
+
+def respond(request: Request, asset: Asset, cache_control: str) -> Response:
+    """``asset`` in the best encoding the client accepts, or a 304 if it already has it."""
+    encoding = negotiate(request.headers.get("accept-encoding"), asset.encoded)
+    # Each encoding is its own representation, with its own validator.
+    etag = asset.etag if encoding is None else f'{asset.etag[:-1]}-{_SUFFIX[encoding]}"'
+    headers = {"ETag": etag, "Cache-Control": cache_control, "Vary": "Accept-Encoding"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    if encoding is None:
+        return Response(asset.body, media_type=asset.media_type, headers=headers)
+    headers["Content-Encoding"] = encoding
+    return Response(asset.encoded[encoding], media_type=asset.media_type, headers=headers)
+
+
+def build(out: Path = BUILD_DIR) -> dict:
+    """Write every encoded file plus ``manifest.json`` to ``out``. Returns the manifest."""
+    out.mkdir(parents=True, exist_ok=True)
+    manifest = {}
+    for name in ASSETS + PAGES:
+        body = _source(name)
+        digest = hashlib.blake2b(body, digest_size=4).hexdigest()
+        stem, ext = name.rsplit(".", 1)
+        files = {}
+        for encoding, data in _encode_all(body).items():
+            file = f"{stem}.{digest}.{ext}.{_SUFFIX[encoding]}"
+            (out / file).write_bytes(data)
+            files[encoding] = file
+        manifest[name] = {
+            "digest": digest,
+            "bytes": len(body),
+            "encoded": files,
+            "encoded_bytes": {enc: (out / f).stat().st_size for enc, f in files.items()},
+        }
+    (out / "manifest.json").write_text(json.dumps(manifest, indent=2) + "\n")
+    # Drop files from earlier builds.
+    keep = {"manifest.json"} | {file for entry in manifest.values() for file in entry["encoded"].values()}
+    for path in out.iterdir():
+        if path.name not in keep:
+            path.unlink()
+    reset()
+    return manifest
+
+
+def reset() -> None:
+    """Forget loaded files, e.g. after editing them in a running dev server."""
+    with _lock:
+        _assets.clear()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    logging.basicConfig(level=logging.INFO)
+
+    parser = argparse.ArgumentParser(description="Fingerprint and precompress the static assets")
+    parser.add_argument("command", choices=["build"])
+    parser.add_argument("--out", type=Path, default=BUILD_DIR)
+    args = parser.parse_args()
+
+    try:
+        import brotli  # noqa: F401
+    except ImportError:
+        logger.warning("brotli is not installed; writing gzip only (pip install brotli)")
+    for name, entry in build(args.out).items():
+        sizes = ", ".join(f"{enc} {n}" for enc, n in entry["encoded_bytes"].items()) or "not compressed"
+        logger.info("%-16s %6d bytes -> %s", name, entry["bytes"], sizes)
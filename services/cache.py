@@ -0,0 +1,72 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+
+class TTLCache:
+    """Thread-safe LRU cache with a per-entry TTL and hit/miss counters."""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 300.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return default
+            expires_at, value = item
+            if expires_at <= now:
+                del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Any, value: Any, ttl: Optional[float] = None) -> None:
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def pop(self, key: Any) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+# Resolved /r/{code} landing pages, keyed by short code.
+short_link_cache = TTLCache(
+    maxsize=int(os.getenv("SHORT_LINK_CACHE_SIZE", "10000")),
+    ttl=float(os.getenv("SHORT_LINK_CACHE_TTL", "300")),
+)
@@ -0,0 +1,60 @@
+import os
+import threading
+import time
+
+
+class CircuitBreaker:
+    """Per-key (e.g. per-host) circuit breaker.
+
+    After ``threshold`` consecutive failures a key is open: ``allow`` returns
+    False for ``cooldown`` seconds. After the cooldown a single trial call is
+    let through; its success closes the circuit, a failure opens it again.
+    """
+
+    def __init__(self, threshold: int = 5, cooldown: float = 30.0):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self._failures: dict[str, int] = {}
+        self._open_until: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def allow(self, key: str) -> bool:
+        with self._lock:
+            if self._failures.get(key, 0) < self.threshold:
+                return True
+            now = time.monotonic()
+            if now < self._open_until.get(key, 0.0):
+                return False
+            # Half-open: hold the circuit shut for everyone else during the trial.
+            self._open_until[key] = now + self.cooldown
+            return True
+
+    def record(self, key: str, ok: bool) -> None:
+        with self._lock:
+            if ok:
+                self._failures.pop(key, None)
+                self._open_until.pop(key, None)
+                return
+            failures = self._failures.get(key, 0) + 1
+            self._failures[key] = failures
+            if failures >= self.threshold:
+                self._open_until[key] = time.monotonic() + self.cooldown
+
+    def is_open(self, key: str) -> bool:
+        with self._lock:
+            return (
+                self._failures.get(key, 0) >= self.threshold
+                and time.monotonic() < self._open_until.get(key, 0.0)
+            )
+
+    def reset(self) -> None:
+        with self._lock:
+            self._failures.clear()
+            self._open_until.clear()
+
+
+# Hosts of share links resolved by _follow_redirects.
+redirect_breaker = CircuitBreaker(
+    threshold=int(os.getenv("REDIRECT_BREAKER_THRESHOLD", "5")),
+    cooldown=float(os.getenv("REDIRECT_BREAKER_COOLDOWN", "60")),
+)
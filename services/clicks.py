@@ -0,0 +1,157 @@
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Callable, Optional
+
+from sqlalchemy import case, update
+
+from .stats import record_review_events
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on ids per UPDATE statement (keeps the CASE expression small).
+_CHUNK = 500
+
+
+class ClickRecorder:
+    """Write-behind buffer for ``sent -> clicked`` transitions.
+
+    Clicks are coalesced per review request and flushed to ``review_requests``
+    in batched UPDATEs once ``max_batch`` clicks are pending, ``flush_interval``
+    seconds have passed, or on shutdown. A failed flush puts its clicks back in
+    the buffer, so every click is written at least once; the UPDATE only
+    matches rows still in ``sent`` which makes replays harmless.
+
+    The buffer lives in process memory: a crash loses at most one flush
+    interval of clicks. With ``sync`` (the default on the serverless engine
+    profile, where an instance can be frozen or recycled right after a
+    response) ``record`` writes the click before it returns.
+    """
+
+    def __init__(self, session_factory=None, max_batch: int = 100, flush_interval: float = 1.0, sync: bool = False):
+        self.session_factory = session_factory
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.sync = sync
+        self._pending: dict[int, tuple[datetime, Optional[Callable[[], None]]]] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def record(
+        self,
+        review_id: int,
+        clicked_at: Optional[datetime] = None,
+        on_written: Optional[Callable[[], None]] = None,
+    ) -> bool:
+        """Buffer a click. Returns True when the caller should trigger a flush.
+
+        ``on_written`` is called once the click has been committed.
+        """
+        with self._lock:
+            self._pending.setdefault(review_id, (clicked_at or datetime.now(timezone.utc), on_written))
+            due = self._due()
+        if self.sync:
+            self.flush()
+            return False
+        return due
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def _due(self) -> bool:
+        return (
+            len(self._pending) >= self.max_batch
+            or time.monotonic() - self._last_flush >= self.flush_interval
+        )
+
+    def flush(self) -> int:
+        """Write all buffered clicks. Returns the number of clicks flushed."""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+                self._last_flush = time.monotonic()
+            if not batch:
+                return 0
+            try:
+                self._write({review_id: clicked_at for review_id, (clicked_at, _) in batch.items()})
+            except Exception as e:
+                logger.error("Click flush failed, will retry %d clicks: %s", len(batch), e)
+                with self._lock:
+                    for review_id, pending in batch.items():
+                        self._pending.setdefault(review_id, pending)
+                return 0
+            for _, on_written in batch.values():
+                if on_written is not None:
+                    on_written()
+            return len(batch)
+
+    def _write(self, batch: dict[int, datetime]) -> None:
+        from models import ReviewRequest
+
+        factory = self.session_factory
+        if factory is None:
+            from database import SessionLocal as factory
+
+        ids = list(batch)
+        db = factory()
+        try:
+            for i in range(0, len(ids), _CHUNK):
+                chunk = ids[i:i + _CHUNK]
+                flipped = db.execute(
+                    update(ReviewRequest)
+                    .where(ReviewRequest.id.in_(chunk), ReviewRequest.status == "sent")
+                    .values(
+                        status="clicked",
+                        clicked_at=case({rid: batch[rid] for rid in chunk}, value=ReviewRequest.id),
+                    )
+                    .returning(ReviewRequest.id, ReviewRequest.business_id)
+                    .execution_options(synchronize_session=False)
+                ).all()
+                # Counted in the same transaction, so a replayed batch is never double-counted.
+                record_review_events(db, "clicked", ((row.business_id, batch[row.id]) for row in flipped))
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def start(self) -> None:
+        """Start the background timer that flushes stragglers."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="click-recorder", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.wait(max(self.flush_interval, 0.1)):
+            if self.pending():
+                self.flush()
+
+    def close(self) -> None:
+        """Stop the timer and flush whatever is still buffered."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+        self.flush()
+
+
+def _serverless() -> bool:
+    from database import DB_PROFILE
+
+    return DB_PROFILE == "serverless"
+
+
+click_recorder = ClickRecorder(
+    max_batch=int(os.getenv("CLICK_FLUSH_BATCH", "100")),
+    flush_interval=float(os.getenv("CLICK_FLUSH_INTERVAL", "1.0")),
+    sync=_serverless(),
+)
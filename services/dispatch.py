@@ -0,0 +1,48 @@
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+from .ratelimit import TokenBucket
+from .sms import send_sms
+
+logger = logging.getLogger(__name__)
+
+# Per-backend send rate (messages/second, 0 = unlimited), shared by all dispatches.
+_limiters = {
+    "twilio": TokenBucket(float(os.getenv("SMS_RATE_LIMIT_TWILIO", "10"))),
+    "email": TokenBucket(float(os.getenv("SMS_RATE_LIMIT_EMAIL", "5"))),
+}
+
+
+def dispatch_sms(
+    messages: list[tuple[str, str]],
+    carrier: str = "",
+    concurrency: Optional[int] = None,
+    send: Callable[..., dict] = send_sms,
+) -> list[dict]:
+    """Send ``(to, body)`` pairs concurrently, respecting the backend rate limit.
+
+    Returns one ``send_sms``-style result dict per message, in input order.
+    """
+    if not messages:
+        return []
+    if concurrency is None:
+        concurrency = int(os.getenv("SMS_DISPATCH_CONCURRENCY", "8"))
+    backend = os.getenv("SMS_BACKEND", "twilio").lower()
+    limiter = _limiters.get(backend, _limiters["email"])
+
+    def _send_one(message: tuple[str, str]) -> dict:
+        to, body = message
+        limiter.acquire()
+        try:
+            return send(to=to, body=body, carrier=carrier)
+        except Exception as e:
+            logger.error("SMS dispatch to %s raised: %s", to, e)
+            return {"ok": False, "error": f"Dispatch error: {e}"}
+
+    workers = max(1, min(concurrency, len(messages)))
+    if workers == 1:
+        return [_send_one(m) for m in messages]
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="sms-dispatch") as pool:
+        return list(pool.map(_send_one, messages))
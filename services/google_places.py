@@ -1,123 +1,451 @@
+import asyncio
+import codecs
 import json
 import logging
 import os
 import re
+import threading
+import time
 import urllib.parse
 import urllib.request
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from . import places_cache
+from .circuit import redirect_breaker
+from .http import get_async_client
+from .metrics import timed
 
 logger = logging.getLogger(__name__)
 
 
-def resolve_google_place(user_input: str) -> dict | None:
-    """Resolve a Google Maps URL OR a business name to {name, place_id}."""
+def resolve_google_place(user_input: str, db: Optional[Session] = None) -> Optional[dict]:
+    """Resolve a Google Maps URL OR a business name to {name, place_id}.
+
+    Results, including "not found", are cached in memory and, when ``db`` is
+    given, in the ``place_cache`` table.
+    """
+    text = user_input.strip()
+
+    if not text:
+        return None
+
+    key = places_cache.input_key(text)
+    cached = places_cache.get(key, db)
+    if cached is not places_cache.MISS:
+        logger.info("Place cache hit: %s", key)
+        return cached
+
     api_key = os.getenv("GOOGLE_MAPS_API_KEY", "").strip()
+    result, full_url = _resolve_uncached(text, api_key, db)
+    return _remember(key, result, full_url, api_key, db)
+
+
+async def resolve_google_place_async(user_input: str, db: Optional[Session] = None) -> Optional[dict]:
+    """Async variant of resolve_google_place, built on the shared async HTTP client."""
     text = user_input.strip()
 
     if not text:
         return None
 
+    key = places_cache.input_key(text)
+    cached = await _cache_get_async(key, db)
+    if cached is not places_cache.MISS:
+        logger.info("Place cache hit: %s", key)
+        return cached
+
+    api_key = os.getenv("GOOGLE_MAPS_API_KEY", "").strip()
+    result, full_url = await _resolve_uncached_async(text, api_key, db)
+    if db is None:
+        return _remember(key, result, full_url, api_key, None)
+    return await asyncio.to_thread(_remember, key, result, full_url, api_key, db)
+
+
+async def _cache_get_async(key: str, db: Optional[Session]):
+    # Memory tier inline; only the table lookup goes to a worker thread.
+    cached = places_cache.get(key)
+    if cached is places_cache.MISS and db is not None:
+        cached = await asyncio.to_thread(_cache_lookup, key, db)
+    return cached
+
+
+def _cache_lookup(key: str, db: Session):
+    try:
+        return places_cache.get(key, db)
+    finally:
+        # End the read so the connection goes back to the pool instead of
+        # being held while the caller awaits Google.
+        db.commit()
+
+
+def _remember(key: str, result: Optional[dict], full_url: Optional[str], api_key: str, db: Optional[Session]) -> Optional[dict]:
+    if not api_key:
+        # A config problem: a miss isn't real, and a hit has at best the name
+        # in the URL ("Business" otherwise). Cache neither.
+        logger.warning("GOOGLE_MAPS_API_KEY is not set!")
+        return result
+
+    keys = [key]
+    if full_url:
+        keys.append(places_cache.url_key(full_url))
+    if result:
+        keys.append(places_cache.place_key(result["place_id"]))
+    places_cache.put(keys, result, db)
+    return result
+
+
+def _resolve_uncached(text: str, api_key: str, db: Optional[Session]) -> tuple[Optional[dict], Optional[str]]:
+    """Returns (result, canonical Maps URL or None)."""
+    calls = {
+        "follow": _follow_redirects,
+        "cache": lambda key: places_cache.get(key, db),
+        "details": _get_place_name,
+        "search": _find_place_from_text,
+    }
+    steps = _resolve_steps(text, api_key)
+    try:
+        step = next(steps)
+        while True:
+            op, *args = step
+            try:
+                answer = calls[op](*args)
+            except Exception as e:
+                step = steps.throw(e)
+            else:
+                step = steps.send(answer)
+    except StopIteration as done:
+        return done.value
+
+
+async def _resolve_uncached_async(text: str, api_key: str, db: Optional[Session]) -> tuple[Optional[dict], Optional[str]]:
+    """Async driver of the same steps as _resolve_uncached."""
+    calls = {
+        "follow": _follow_redirects_async,
+        "cache": lambda key: _cache_get_async(key, db),
+        "details": _get_place_name_async,
+        "search": _find_place_from_text_async,
+    }
+    steps = _resolve_steps(text, api_key)
+    try:
+        step = next(steps)
+        while True:
+            op, *args = step
+            try:
+                answer = await calls[op](*args)
+            except Exception as e:
+                step = steps.throw(e)
+            else:
+                step = steps.send(answer)
+    except StopIteration as done:
+        return done.value
+
+
+def _resolve_steps(text: str, api_key: str):
+    """How ``text`` is resolved, without doing any I/O.
+
+    A generator: it yields each call it needs as ``(op, *args)`` — ``follow``
+    a share link, look up a ``cache`` key, fetch Place ``details``, ``search``
+    by text — is sent the answer, and returns (result, canonical Maps URL or
+    None). ``_resolve_uncached`` and ``_resolve_uncached_async`` make the calls.
+    """
     is_url = text.startswith("http") or "google.com/maps" in text or "goo.gl/" in text
 
     if is_url:
         url = text if text.startswith("http") else "https://" + text
-        full_url = _follow_redirects(url) or url
+        with timed("share_link", "follow_redirects") as call:
+            maps_url = yield ("follow", url)
+            call.outcome = "found" if maps_url else "not_found"
+        full_url = maps_url or url
         logger.info("Redirected URL: %s", full_url)
 
+        cached = yield ("cache", places_cache.url_key(full_url))
+        if cached is not places_cache.MISS:
+            return cached, full_url
+
         place_id = _extract_place_id(full_url)
         if place_id:
+            known = yield ("cache", places_cache.place_key(place_id))
+            if known is not places_cache.MISS and known:
+                return known, full_url
             name = _extract_name_from_url(full_url) or "Business"
             if api_key:
-                api_name = _get_place_name(place_id, api_key)
+                api_name = yield ("details", place_id, api_key)
                 if api_name:
                     name = api_name
-            return {"name": name, "place_id": place_id}
+            return {"name": name, "place_id": place_id}, full_url
 
         query = _extract_name_from_url(full_url)
         coords = _extract_coords(full_url)
         logger.info("Extracted from URL — query: %s, coords: %s", query, coords)
 
         if api_key and query:
-            result = _find_place_from_text(query, coords, api_key)
+            result = yield ("search", query, coords, api_key)
             if result:
-                return result
+                return result, full_url
 
         if api_key and coords and not query:
-            result = _find_place_from_text(f"{coords[0]},{coords[1]}", coords, api_key)
+            result = yield ("search", f"{coords[0]},{coords[1]}", coords, api_key)
             if result:
-                return result
-    else:
-        logger.info("Searching by name: %s", text)
-        if api_key:
-            result = _find_place_from_text(text, None, api_key)
-            if result:
-                return result
+                return result, full_url
+        return None, full_url
 
-    if not api_key:
-        logger.warning("GOOGLE_MAPS_API_KEY is not set!")
-    return None
+    logger.info("Searching by name: %s", text)
+    if api_key:
+        result = yield ("search", text, None, api_key)
+        if result:
+            return result, None
+    return None, None
+
+
+_UA_STRATEGIES = [
+    ("bot", {"User-Agent": "facebookexternalhit/1.1"}),
+    ("browser", {
+        "User-Agent": (
+            "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
+            "AppleWebKit/537.36 (KHTML, like Gecko) "
+            "Chrome/120.0.0.0 Safari/537.36"
+        ),
+        "Accept": "text/html,application/xhtml+xml",
+        "Accept-Language": "en-US,en;q=0.9",
+    }),
+]
+
+
+# Both UA strategies run at once by default and the first Maps URL wins;
+# REDIRECT_HEDGE=0 restores trying them one after the other.
+_HEDGE = os.getenv("REDIRECT_HEDGE", "1").strip().lower() not in ("0", "false", "no")
+_REDIRECT_DEADLINE = float(os.getenv("REDIRECT_DEADLINE", "10"))
+_REDIRECT_TIMEOUT = 15.0
+_redirect_pool = ThreadPoolExecutor(
+    max_workers=int(os.getenv("REDIRECT_HEDGE_WORKERS", "64")), thread_name_prefix="redirect-hedge"
+)
+
+
+class _RedirectLookup:
+    """Circuit breaker, deadline and outcome of one share-link lookup.
 
+    The sync and async shells only differ in how they run the UA strategies
+    (``_strategy_batches``); both hand each finished attempt to ``take``.
+    """
 
-def _follow_redirects(url: str) -> str | None:
+    def __init__(self, url: str):
+        self.url = url
+        self.host = urllib.parse.urlsplit(url).hostname or ""
+        self.deadline = time.monotonic() + _REDIRECT_DEADLINE
+        self.reachable = False
+
+    def allowed(self) -> bool:
+        if redirect_breaker.allow(self.host):
+            return True
+        logger.warning("Circuit open for %s — skipping redirect lookup", self.host)
+        return False
+
+    def remaining(self) -> float:
+        # Capped: benchmarks turn the deadline off with an infinite one.
+        return min(threading.TIMEOUT_MAX, max(0.0, self.deadline - time.monotonic()))
+
+    def timed_out(self) -> None:
+        logger.warning("Redirect lookup for %s hit the %.0fs deadline", self.url, _REDIRECT_DEADLINE)
+
+    def take(self, label: str, attempt) -> Optional[str]:
+        """The Maps URL a finished attempt (a Future or a Task) found, if any."""
+        try:
+            maps_url = attempt.result()
+        except Exception as e:
+            logger.warning("%s UA request failed: %s", label, e)
+            return None
+        self.reachable = True
+        return maps_url
+
+    def finish(self) -> None:
+        redirect_breaker.record(self.host, self.reachable)
+
+
+def _strategy_batches() -> list:
+    """Hedged, every strategy at once; otherwise one at a time, in order."""
+    return [_UA_STRATEGIES] if _HEDGE else [[strategy] for strategy in _UA_STRATEGIES]
+
+
+def _follow_redirects(url: str) -> Optional[str]:
     try:
-        import requests as req
+        import requests  # noqa: F401
     except ImportError:
         logger.error("'requests' not installed — run: pip install requests")
         return None
 
-    ua_strategies = [
-        ("bot", {"User-Agent": "facebookexternalhit/1.1"}),
-        ("browser", {
-            "User-Agent": (
-                "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
-                "AppleWebKit/537.36 (KHTML, like Gecko) "
-                "Chrome/120.0.0.0 Safari/537.36"
-            ),
-            "Accept": "text/html,application/xhtml+xml",
-            "Accept-Language": "en-US,en;q=0.9",
-        }),
-    ]
-
-    for label, headers in ua_strategies:
-        try:
-            resp = req.get(url, allow_redirects=True, timeout=15, headers=headers)
-            logger.info("%s UA — HTTP %s, final URL: %s", label, resp.status_code, resp.url)
+    lookup = _RedirectLookup(url)
+    if not lookup.allowed():
+        return None
+    cancel = threading.Event()
+    try:
+        for batch in _strategy_batches():
+            futures = {
+                _redirect_pool.submit(_try_strategy, url, label, headers, lookup.deadline, cancel): label
+                for label, headers in batch
+            }
+            pending = set(futures)
+            while pending:
+                done, pending = wait(pending, timeout=lookup.remaining(), return_when=FIRST_COMPLETED)
+                if not done:
+                    lookup.timed_out()
+                    return None
+                for future in done:
+                    maps_url = lookup.take(futures[future], future)
+                    if maps_url:
+                        return maps_url
+        return None
+    finally:
+        # Stops the losing strategy at its next chunk.
+        cancel.set()
+        lookup.finish()
 
-            if "google.com/maps" in resp.url:
-                return resp.url
 
-            maps_url = _find_maps_url_in_html(resp.text[:200_000])
-            if maps_url:
-                logger.info("Found via %s UA: %s", label, maps_url)
-                return maps_url
-        except Exception as e:
-            logger.warning("%s UA request failed: %s", label, e)
+async def _follow_redirects_async(url: str) -> Optional[str]:
+    lookup = _RedirectLookup(url)
+    if not lookup.allowed():
+        return None
+    tasks: dict[asyncio.Task, str] = {}
+    try:
+        for batch in _strategy_batches():
+            started = {
+                asyncio.create_task(_try_strategy_async(url, label, headers, lookup.deadline)): label
+                for label, headers in batch
+            }
+            tasks.update(started)
+            pending = set(started)
+            while pending:
+                done, pending = await asyncio.wait(pending, timeout=lookup.remaining(), return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    lookup.timed_out()
+                    return None
+                for task in done:
+                    maps_url = lookup.take(tasks[task], task)
+                    if maps_url:
+                        return maps_url
+        return None
+    finally:
+        for task in tasks:
+            task.cancel()
+        lookup.finish()
 
-    return None
+
+def _try_strategy(url: str, label: str, headers: dict, deadline: float, cancel: threading.Event) -> Optional[str]:
+    import requests as req
+
+    timeout = min(_REDIRECT_TIMEOUT, max(0.1, deadline - time.monotonic()))
+    with req.get(url, allow_redirects=True, timeout=timeout, headers=headers, stream=True) as resp:
+        maps_url = _landed_on_maps(label, resp.status_code, resp.url)
+        if not maps_url:
+            maps_url = _found_in_html(label, _read_html(resp, cancel))
+    return maps_url
+
+
+async def _try_strategy_async(url: str, label: str, headers: dict, deadline: float) -> Optional[str]:
+    timeout = min(_REDIRECT_TIMEOUT, max(0.1, deadline - time.monotonic()))
+    async with get_async_client().stream("GET", url, follow_redirects=True, timeout=timeout, headers=headers) as resp:
+        maps_url = _landed_on_maps(label, resp.status_code, str(resp.url))
+        if not maps_url:
+            html = _HtmlBuffer(resp.charset_encoding)
+            async for chunk in resp.aiter_bytes(_CHUNK_SIZE):
+                if html.feed(chunk):
+                    break
+            maps_url = _found_in_html(label, html.text)
+    return maps_url
+
+
+def _landed_on_maps(label: str, status: int, final_url: str) -> Optional[str]:
+    logger.info("%s UA — HTTP %s, final URL: %s", label, status, final_url)
+    return final_url if "google.com/maps" in final_url else None
+
+
+def _found_in_html(label: str, html: str) -> Optional[str]:
+    maps_url = _find_maps_url_in_html(html)
+    if maps_url:
+        logger.info("Found via %s UA: %s", label, maps_url)
+    return maps_url
+
+
+_HTML_LIMIT = 200_000
+_CHUNK_SIZE = 16_384
+
+
+class _HtmlBuffer:
+    """Accumulates up to 200 KB of a streamed HTML body.
+
+    ``feed`` returns True once reading can stop: the limit is reached or the
+    top-priority match (a Maps URL in a <meta content>) has been seen.
+    """
+
+    def __init__(self, encoding: Optional[str]):
+        self._decoder = codecs.getincrementaldecoder(encoding or "utf-8")(errors="replace")
+        self.text = ""
+
+    def feed(self, chunk: bytes) -> bool:
+        # Re-scan a little of the previous chunk so a tag split across chunks is seen.
+        scan_from = max(0, len(self.text) - 2048)
+        self.text += self._decoder.decode(chunk)
+        if len(self.text) >= _HTML_LIMIT:
+            self.text = self.text[:_HTML_LIMIT]
+            return True
+        return _MAPS_URL_RE_I[0].search(self.text, scan_from) is not None
+
+
+def _read_html(resp, cancel: Optional[threading.Event] = None) -> str:
+    html = _HtmlBuffer(resp.encoding)
+    for chunk in resp.iter_content(chunk_size=_CHUNK_SIZE):
+        if html.feed(chunk) or (cancel is not None and cancel.is_set()):
+            break
+    return html.text
+
+
+# Tried in priority order; the first pattern that matches anywhere wins.
+_MAPS_URL_PATTERNS = [
+    r'<meta[^>]+content="(https://(?:www\.)?google\.[a-z.]+/maps/[^"]+)"',
+    r'<link[^>]+href="[^"]*?(https://(?:www\.)?google\.[a-z.]+/maps/[^"&]+)',
+    r'(https://(?:www\.)?google\.[a-z.]+/maps/(?:place|search)/[^\s"\'<>\\]+)',
+    r'(https://(?:www\.)?google\.[a-z.]+/maps/[^\s"\'<>\\]+)',
+    r'(https%3A%2F%2F(?:www\.)?google\.\w+%2Fmaps%2F[^\s"\'<>]+)',
+    r'<meta[^>]+content="\d+;\s*url=(https://[^"]+)"',
+    r'window\.location(?:\.href\s*=\s*|\.replace\s*\(\s*|\.assign\s*\(\s*)["\']'
+    r'(https://[^"\']+)',
+    r'href="(https://[^"]*google\.[^"]*\/maps\/[^"]+)"',
+]
+# Case-insensitive matching is done by lowercasing the body once and running
+# case-sensitive patterns over it: sre can then use its fast literal-prefix
+# search, which re.IGNORECASE disables. Spans map 1:1 back onto the original
+# text because str.lower() preserves length for every character except U+0130.
+_MAPS_URL_RE = [re.compile(p.replace("%3A", "%3a").replace("%2F", "%2f")) for p in _MAPS_URL_PATTERNS]
+_MAPS_URL_RE_I = [re.compile(p, re.IGNORECASE) for p in _MAPS_URL_PATTERNS]
+# Characters for which that shortcut would differ from re.IGNORECASE: U+0130
+# changes length, and all four fold onto ASCII letters (see the re docs).
+_FOLDING_CHARS = ("\u0130", "\u0131", "\u017f", "\u212a")
 
 
-def _find_maps_url_in_html(body: str) -> str | None:
-    patterns = [
-        r'<meta[^>]+content="(https://(?:www\.)?google\.[a-z.]+/maps/[^"]+)"',
-        r'<link[^>]+href="[^"]*?(https://(?:www\.)?google\.[a-z.]+/maps/[^"&]+)',
-        r'(https://(?:www\.)?google\.[a-z.]+/maps/(?:place|search)/[^\s"\'<>\\]+)',
-        r'(https://(?:www\.)?google\.[a-z.]+/maps/[^\s"\'<>\\]+)',
-        r'(https%3A%2F%2F(?:www\.)?google\.\w+%2Fmaps%2F[^\s"\'<>]+)',
-        r'<meta[^>]+content="\d+;\s*url=(https://[^"]+)"',
-        r'window\.location(?:\.href\s*=\s*|\.replace\s*\(\s*|\.assign\s*\(\s*)["\']'
-        r'(https://[^"\']+)',
-        r'href="(https://[^"]*google\.[^"]*\/maps\/[^"]+)"',
-    ]
-    for pattern in patterns:
-        m = re.search(pattern, body, re.IGNORECASE)
+def _find_maps_url_in_html(body: str) -> Optional[str]:
+    # The top pattern usually hits in <head>; try it before paying for lower().
+    m = _MAPS_URL_RE_I[0].search(body)
+    if m:
+        return _clean_maps_url(m.group(1))
+    if any(c in body for c in _FOLDING_CHARS):
+        haystack, compiled = body, _MAPS_URL_RE_I
+    else:
+        haystack, compiled = body.lower(), _MAPS_URL_RE
+    for pattern in compiled[1:]:
+        m = pattern.search(haystack)
         if m:
-            found = m.group(1)
-            if "%" in found:
-                found = urllib.parse.unquote(found)
-            return found
+            return _clean_maps_url(body[m.start(1):m.end(1)])
     return None
 
 
-def _extract_place_id(url: str) -> str | None:
+def _clean_maps_url(found: str) -> str:
+    if "%" in found:
+        found = urllib.parse.unquote(found)
+    return found
+
+
+def _extract_place_id(url: str) -> Optional[str]:
     m = re.search(r"place_id[=:]([A-Za-z0-9_-]+)", url)
     if m:
         return m.group(1)
@@ -127,7 +455,7 @@ def _extract_place_id(url: str) -> str | None:
     return None
 
 
-def _extract_name_from_url(url: str) -> str | None:
+def _extract_name_from_url(url: str) -> Optional[str]:
     m = re.search(r"/maps/place/([^/@]+)", url)
     if m:
         return urllib.parse.unquote_plus(m.group(1)).replace("+", " ")
@@ -137,16 +465,18 @@ def _extract_name_from_url(url: str) -> str | None:
     return None
 
 
-def _extract_coords(url: str) -> tuple[float, float] | None:
+def _extract_coords(url: str) -> Optional[tuple[float, float]]:
     m = re.search(r"@(-?\d+\.\d+),(-?\d+\.\d+)", url)
     if m:
         return (float(m.group(1)), float(m.group(2)))
     return None
 
 
-def _find_place_from_text(
-    query: str, coords: tuple | None, api_key: str
-) -> dict | None:
+def _places_api_base() -> str:
+    return os.getenv("PLACES_API_BASE", "https://places.googleapis.com/v1").rstrip("/")
+
+
+def _search_text_request(query: str, coords: Optional[tuple], api_key: str) -> tuple[str, dict, dict]:
     body_dict: dict = {"textQuery": query}
     if coords:
         body_dict["locationBias"] = {
@@ -155,45 +485,84 @@ def _find_place_from_text(
                 "radius": 500.0,
             }
         }
+    headers = {
+        "Content-Type": "application/json",
+        "X-Goog-Api-Key": api_key,
+        "X-Goog-FieldMask": "places.id,places.displayName",
+    }
+    return f"{_places_api_base()}/places:searchText", body_dict, headers
+
+
+def _first_place(data: dict, query: str) -> Optional[dict]:
+    places = data.get("places", [])
+    logger.info("Places API response: %d results", len(places))
+    if places:
+        p = places[0]
+        return {
+            "name": p.get("displayName", {}).get("text", query),
+            "place_id": p["id"],
+        }
+    return None
+
+
+def _details_request(place_id: str, api_key: str) -> tuple[str, dict]:
+    headers = {
+        "X-Goog-Api-Key": api_key,
+        "X-Goog-FieldMask": "displayName",
+    }
+    return f"{_places_api_base()}/places/{place_id}", headers
+
+
+def _find_place_from_text(
+    query: str, coords: Optional[tuple], api_key: str
+) -> Optional[dict]:
+    url, body_dict, headers = _search_text_request(query, coords, api_key)
     try:
         body_bytes = json.dumps(body_dict).encode("utf-8")
-        req = urllib.request.Request(
-            "https://places.googleapis.com/v1/places:searchText",
-            data=body_bytes,
-            headers={
-                "Content-Type": "application/json",
-                "X-Goog-Api-Key": api_key,
-                "X-Goog-FieldMask": "places.id,places.displayName",
-            },
-            method="POST",
-        )
-        resp = urllib.request.urlopen(req, timeout=10)
-        data = json.loads(resp.read())
-        places = data.get("places", [])
-        logger.info("Places API response: %d results", len(places))
-        if places:
-            p = places[0]
-            return {
-                "name": p.get("displayName", {}).get("text", query),
-                "place_id": p["id"],
-            }
+        req = urllib.request.Request(url, data=body_bytes, headers=headers, method="POST")
+        with timed("places", "search_text"):
+            resp = urllib.request.urlopen(req, timeout=10)
+            data = json.loads(resp.read())
+        return _first_place(data, query)
+    except Exception as e:
+        logger.error("Places API error: %s", e)
+    return None
+
+
+async def _find_place_from_text_async(
+    query: str, coords: Optional[tuple], api_key: str
+) -> Optional[dict]:
+    url, body_dict, headers = _search_text_request(query, coords, api_key)
+    try:
+        with timed("places", "search_text"):
+            resp = await get_async_client().post(url, json=body_dict, headers=headers, timeout=10)
+            resp.raise_for_status()
+        return _first_place(resp.json(), query)
     except Exception as e:
         logger.error("Places API error: %s", e)
     return None
 
 
-def _get_place_name(place_id: str, api_key: str) -> str | None:
+def _get_place_name(place_id: str, api_key: str) -> Optional[str]:
+    url, headers = _details_request(place_id, api_key)
     try:
-        req = urllib.request.Request(
-            f"https://places.googleapis.com/v1/places/{place_id}",
-            headers={
-                "X-Goog-Api-Key": api_key,
-                "X-Goog-FieldMask": "displayName",
-            },
-        )
-        resp = urllib.request.urlopen(req, timeout=10)
-        data = json.loads(resp.read())
+        req = urllib.request.Request(url, headers=headers)
+        with timed("places", "place_details"):
+            resp = urllib.request.urlopen(req, timeout=10)
+            data = json.loads(resp.read())
         return data.get("displayName", {}).get("text")
     except Exception as e:
         logger.error("Place Details API error: %s", e)
     return None
+
+
+async def _get_place_name_async(place_id: str, api_key: str) -> Optional[str]:
+    url, headers = _details_request(place_id, api_key)
+    try:
+        with timed("places", "place_details"):
+            resp = await get_async_client().get(url, headers=headers, timeout=10)
+            resp.raise_for_status()
+        return resp.json().get("displayName", {}).get("text")
+    except Exception as e:
+        logger.error("Place Details API error: %s", e)
+    return None
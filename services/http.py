@@ -0,0 +1,53 @@
+import asyncio
+import os
+from typing import Optional
+
+import httpx
+
+
+class _BoundedAsyncClient(httpx.AsyncClient):
+    """``AsyncClient`` that queues requests on a semaphore sized to the pool.
+
+    httpcore rescans every queued request whenever a connection frees up,
+    which goes quadratic under a burst; waiting here keeps its queue empty.
+    """
+
+    def __init__(self, max_connections: int, **kwargs):
+        super().__init__(**kwargs)
+        self._slots = asyncio.Semaphore(max_connections)
+
+    async def send(self, request, **kwargs):
+        async with self._slots:
+            return await super().send(request, **kwargs)
+
+
+_client: Optional[_BoundedAsyncClient] = None
+_client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """Shared pooled ``httpx.AsyncClient`` for outbound calls.
+
+    One client per event loop; connections are kept alive between requests.
+    """
+    global _client, _client_loop
+    loop = asyncio.get_running_loop()
+    if _client is None or _client.is_closed or _client_loop is not loop:
+        max_connections = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+        _client = _BoundedAsyncClient(
+            max_connections,
+            timeout=httpx.Timeout(15.0, connect=5.0),
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=int(os.getenv("HTTP_MAX_KEEPALIVE", "20")),
+            ),
+        )
+        _client_loop = loop
+    return _client
+
+
+async def close_async_client() -> None:
+    global _client, _client_loop
+    if _client is not None and _client_loop is asyncio.get_running_loop():
+        await _client.aclose()
+    _client = _client_loop = None
@@ -0,0 +1,351 @@
+"""In-process metrics in the Prometheus text format, plus optional tracing.
+
+``GET /metrics`` renders ``registry``. What is recorded:
+
+* ``http_request_duration_seconds`` and ``db_queries_per_request`` per route
+  (``MetricsMiddleware``; queries are counted through a context variable
+  bumped by an engine-wide SQLAlchemy hook)
+* ``outbound_request_duration_seconds`` per integration and operation
+  (``timed``): Places searchText / Place Details, share-link redirects,
+  SMTP and Twilio
+* ``sms_messages_total`` by backend and outcome
+* cache and connection-pool figures, read from their own counters at
+  scrape time
+
+With ``OTEL_EXPORTER_OTLP_ENDPOINT`` set and the OpenTelemetry SDK and OTLP
+exporter installed, requests and outbound calls are also exported as spans.
+"""
+
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional, Union
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labels: tuple = ()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._values: dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels) -> float:
+        with self._lock:
+            return self._values.get(labels, 0)
+
+    def render(self) -> list[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        lines += [f"{self.name}{_labels(self.labels, k)} {_number(v)}" for k, v in items]
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labels: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = tuple(buckets) + (float("inf"),)
+        # labels -> [per-bucket counts..., sum, count]
+        self._values: dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels) -> None:
+        with self._lock:
+            series = self._values.get(labels)
+            if series is None:
+                series = self._values[labels] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            series[-2] += value
+            series[-1] += 1
+
+    def count(self, *labels) -> int:
+        with self._lock:
+            series = self._values.get(labels)
+            return series[-1] if series else 0
+
+    def render(self) -> list[str]:
+        with self._lock:
+            items = sorted((k, list(v)) for k, v in self._values.items())
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, series in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets, series):
+                cumulative += n
+                le = 'le="%s"' % _number(bound)
+                lines.append(f"{self.name}_bucket{_labels(self.labels, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labels, labels)} {_number(series[-2])}")
+            lines.append(f"{self.name}_count{_labels(self.labels, labels)} {series[-1]}")
+        return lines
+
+
+class Registry:
+    """Named metrics plus collectors that report figures kept elsewhere.
+
+    A collector is a function returning ``(name, type, help, [(labels, value), ...])``
+    tuples, where ``labels`` is a dict; it runs on every render.
+    """
+
+    def __init__(self):
+        self._metrics: dict[str, Union[Counter, Histogram]] = {}
+        self._collectors: list = []
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, help: str, labels: tuple = ()) -> Counter:
+        return self._add(Counter(name, help, labels))
+
+    def histogram(self, name: str, help: str, labels: tuple = (), buckets: tuple = LATENCY_BUCKETS) -> Histogram:
+        return self._add(Histogram(name, help, labels, buckets))
+
+    def collector(self, fn):
+        with self._lock:
+            self._collectors.append(fn)
+        return fn
+
+    def _add(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} already registered")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors)
+        lines = []
+        for metric in metrics:
+            lines += metric.render()
+        for collect in collectors:
+            try:
+                families = collect()
+            except Exception as e:
+                logger.warning("Metrics collector %s failed: %s", collect.__name__, e)
+                continue
+            for name, kind, help, samples in families:
+                lines += [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+                for labels, value in samples:
+                    lines.append(f"{name}{_labels(tuple(labels), tuple(labels.values()))} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds", "Request latency by route", ("method", "route", "status")
+)
+db_queries_per_request = registry.histogram(
+    "db_queries_per_request", "SQL statements executed per request", ("route",), QUERY_BUCKETS
+)
+db_queries_total = registry.counter("db_queries_total", "SQL statements executed", ())
+outbound_duration = registry.histogram(
+    "outbound_request_duration_seconds",
+    "Latency of calls to external services",
+    ("integration", "operation", "outcome"),
+)
+sms_messages = registry.counter("sms_messages_total", "SMS send attempts by result", ("backend", "outcome"))
+short_link_admissions = registry.counter(
+    "short_link_requests_total", "Short-link requests by admission outcome", ("outcome",)
+)
+
+
+# ── Tracing (optional) ───────────────────────────────────────────────────────
+
+_tracer = None
+
+
+def _setup_tracing() -> None:
+    """Export spans over OTLP/HTTP when an endpoint is configured and the SDK is installed."""
+    global _tracer
+    endpoint = os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT", "").strip()
+    if not endpoint:
+        return
+    try:
+        from opentelemetry import trace
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+    except ImportError:
+        logger.warning(
+            "OTEL_EXPORTER_OTLP_ENDPOINT is set but tracing needs: "
+            "pip install opentelemetry-sdk opentelemetry-exporter-otlp-proto-http"
+        )
+        return
+    provider = TracerProvider(resource=Resource.create({"service.name": os.getenv("OTEL_SERVICE_NAME", "review-boost")}))
+    provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter(endpoint=f"{endpoint.rstrip('/')}/v1/traces")))
+    trace.set_tracer_provider(provider)
+    _tracer = trace.get_tracer(__name__)
+    logger.info("Exporting traces to %s", endpoint)
+
+
+@contextmanager
+def _span(name: str, **attributes):
+    if _tracer is None:
+        yield None
+        return
+    with _tracer.start_as_current_span(name, attributes=attributes) as span:
+        yield span
+
+
+_setup_tracing()
+
+
+# ── Outbound calls ───────────────────────────────────────────────────────────
+
+class _Call:
+    __slots__ = ("outcome",)
+
+    def __init__(self):
+        self.outcome = "ok"
+
+
+@contextmanager
+def timed(integration: str, operation: str):
+    """Time an outbound call. An exception marks it ``error``; set ``.outcome`` for other results."""
+    call = _Call()
+    start = time.perf_counter()
+    with _span(f"{integration} {operation}", integration=integration) as span:
+        try:
+            yield call
+        except BaseException:
+            call.outcome = "error"
+            raise
+        finally:
+            outbound_duration.observe(time.perf_counter() - start, integration, operation, call.outcome)
+            if span is not None:
+                span.set_attribute("outcome", call.outcome)
+
+
+def record_sms(backend: str, result: dict) -> dict:
+    sms_messages.inc(backend, "ok" if result.get("ok") else "error")
+    return result
+
+
+# ── Per-request metrics ──────────────────────────────────────────────────────
+
+_request_queries: ContextVar[Optional[list]] = ContextVar("request_queries", default=None)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _count_query(conn, cursor, statement, parameters, context, executemany) -> None:
+    db_queries_total.inc()
+    counter = _request_queries.get()
+    if counter is not None:
+        counter[0] += 1
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency and SQL statement count per route.
+
+    Routes are labelled by their path template (``/r/{code}``), and requests
+    that match no route as ``unmatched``, so label values stay bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        queries = [0]
+        token = _request_queries.set(queries)
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        with _span(f"{scope['method']} {scope['path']}") as span:
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                _request_queries.reset(token)
+                route = getattr(scope.get("route"), "path", None) or "unmatched"
+                http_request_duration.observe(time.perf_counter() - start, scope["method"], route, status)
+                db_queries_per_request.observe(queries[0], route)
+                if span is not None:
+                    span.update_name(f"{scope['method']} {route}")
+                    span.set_attribute("http.status_code", status)
+
+
+# ── Figures kept elsewhere ───────────────────────────────────────────────────
+
+@registry.collector
+def _cache_figures():
+    from .cache import short_link_cache
+    from .places_cache import places_cache
+
+    caches = {"short_links": short_link_cache.stats(), "places": places_cache.stats()}
+    return [
+        (f"cache_{field}", kind, help, [({"cache": name}, stats[field]) for name, stats in caches.items()])
+        for field, kind, help in (
+            ("hits", "counter", "Cache hits"),
+            ("misses", "counter", "Cache misses"),
+            ("evictions", "counter", "Cache evictions"),
+            ("hit_ratio", "gauge", "Cache hits / lookups since start"),
+            ("size", "gauge", "Cached entries"),
+        )
+    ]
+
+
+@registry.collector
+def _pool_figures():
+    from database import pool_stats, replica_engines
+
+    pools = [({"db": "primary"}, pool_stats())]
+    pools += [({"db": f"replica{i}"}, pool_stats(e)) for i, e in enumerate(replica_engines)]
+    pools = [(labels, stats) for labels, stats in pools if "checkouts" in stats]
+    return [
+        (f"db_pool_{field}", kind, help, [(labels, stats[field]) for labels, stats in pools])
+        for field, kind, help in (
+            ("checked_out", "gauge", "Connections currently checked out"),
+            ("saturation", "gauge", "Checked out / (pool size + max overflow)"),
+            ("checkouts", "counter", "Connection checkouts"),
+            ("timeouts", "counter", "Checkouts that timed out waiting for a connection"),
+            ("wait_avg_ms", "gauge", "Mean checkout wait in milliseconds"),
+            ("wait_max_ms", "gauge", "Longest checkout wait in milliseconds"),
+        )
+    ]
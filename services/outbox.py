@@ -0,0 +1,328 @@
+"""DB-backed outbox for SMS sends.
+
+``/api/send`` only writes a ``SendJob`` and one ``OutboxMessage`` per
+recipient; a worker claims pending messages, sends them through the
+dispatcher and records the outcome. Failed sends are retried with
+exponential backoff, and a message whose worker died mid-send is reclaimed
+once its lease expires.
+
+Run a standalone worker with ``python -m services.outbox``.
+"""
+
+import hashlib
+import logging
+import os
+import random
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import func, or_, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from .cache import short_link_cache
+from .dispatch import dispatch_sms
+from .sms import send_sms
+from .stats import record_review_events
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_send(db: Session, items: list[dict], carrier: str = "", idempotency_key: Optional[str] = None):
+    """Apply preview edits and queue one outbox message per review request.
+
+    A repeated ``idempotency_key`` returns the job created the first time
+    instead of queueing the batch again, also when the two requests race.
+    """
+    from models import ReviewRequest
+
+    if idempotency_key:
+        job = _existing_job(db, idempotency_key)
+        if job:
+            return job
+
+    ids = [item.get("id") for item in items]
+    rows = {rr.id: rr for rr in db.query(ReviewRequest).filter(ReviewRequest.id.in_(ids)).all()}
+
+    try:
+        job, codes = _queue(db, rows, items, carrier, idempotency_key)
+    except IntegrityError:
+        # Another request with the same key committed its job between the
+        # lookup above and this insert.
+        db.rollback()
+        job = _existing_job(db, idempotency_key) if idempotency_key else None
+        if job is None:
+            raise
+        return job
+    for code in codes:
+        short_link_cache.pop(code)
+    return job
+
+
+def _queue(db: Session, rows: dict, items: list[dict], carrier: str, idempotency_key: Optional[str]):
+    """Insert the job and its messages and commit; returns the job and the codes whose text changed."""
+    from models import OutboxMessage, SendJob
+
+    job = SendJob(idempotency_key=idempotency_key or None, carrier=carrier)
+    db.add(job)
+    db.flush()
+    key_prefix = _key_hash(idempotency_key) if idempotency_key else f"job{job.id}"
+
+    seen: set[int] = set()
+    messages = []
+    codes = []
+    for item in items:
+        rr = rows.get(item.get("id"))
+        if not rr or rr.id in seen:
+            continue
+        seen.add(rr.id)
+        review_text = (item.get("review_text") or "").strip()
+        if review_text:
+            rr.review_text = review_text
+            codes.append(rr.short_code)
+        messages.append(OutboxMessage(
+            job_id=job.id,
+            review_request_id=rr.id,
+            idempotency_key=f"{key_prefix}:{rr.id}",
+            recipient=rr.customer_contact,
+            body=(item.get("sms_body") or "").strip(),
+            carrier=carrier,
+        ))
+    job.total = len(messages)
+    db.add_all(messages)
+    db.commit()
+    return job, codes
+
+
+def _existing_job(db: Session, idempotency_key: str):
+    from models import SendJob
+
+    return db.query(SendJob).filter(SendJob.idempotency_key == idempotency_key).first()
+
+
+def _key_hash(key: str) -> str:
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()[:32]
+
+
+def job_progress(db: Session, job_id: int) -> Optional[dict]:
+    """Per-status counts plus the sent/failed/errors lists for a job."""
+    from models import OutboxMessage, SendJob
+
+    job = db.query(SendJob).filter(SendJob.id == job_id).first()
+    if not job:
+        return None
+
+    counts = dict(
+        db.query(OutboxMessage.status, func.count(OutboxMessage.id))
+        .filter(OutboxMessage.job_id == job_id)
+        .group_by(OutboxMessage.status)
+        .all()
+    )
+    in_flight = counts.get("pending", 0) + counts.get("sending", 0)
+    resp = {
+        "job_id": job.id,
+        "status": "done" if not in_flight else "running",
+        "total": job.total,
+        "pending": in_flight,
+        "sent": [],
+        "failed": [],
+    }
+    if counts.get("sent") or counts.get("failed"):
+        finished = (
+            db.query(OutboxMessage.recipient, OutboxMessage.status, OutboxMessage.last_error)
+            .filter(OutboxMessage.job_id == job_id, OutboxMessage.status.in_(("sent", "failed")))
+            .order_by(OutboxMessage.id)
+            .all()
+        )
+        errors = []
+        for recipient, status, error in finished:
+            resp[status].append(recipient)
+            if status == "failed":
+                errors.append(f"{recipient}: {error or 'unknown'}")
+        if errors:
+            resp["errors"] = errors
+    return resp
+
+
+class OutboxWorker:
+    """Claims pending outbox messages in batches and sends them."""
+
+    def __init__(
+        self,
+        session_factory=None,
+        batch_size: int = 50,
+        max_attempts: int = 5,
+        backoff: float = 30.0,
+        lease: float = 300.0,
+        poll_interval: float = 1.0,
+    ):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.lease = lease
+        self.poll_interval = poll_interval
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def _session(self) -> Session:
+        factory = self.session_factory
+        if factory is None:
+            from database import SessionLocal as factory
+        return factory()
+
+    def _claim(self, db: Session, now: datetime) -> list:
+        from models import OutboxMessage
+
+        due = or_(
+            (OutboxMessage.status == "pending") & (OutboxMessage.next_attempt_at <= now),
+            (OutboxMessage.status == "sending") & (OutboxMessage.claimed_at <= now - timedelta(seconds=self.lease)),
+        )
+        candidates = [
+            row.id
+            for row in db.query(OutboxMessage.id)
+            .filter(due)
+            .order_by(OutboxMessage.id)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+        ]
+        if not candidates:
+            db.rollback()
+            return []
+
+        # The token makes the claim safe without SKIP LOCKED (e.g. SQLite):
+        # only rows still due when the UPDATE runs get this worker's token.
+        token = uuid.uuid4().hex
+        db.execute(
+            update(OutboxMessage)
+            .where(OutboxMessage.id.in_(candidates), due)
+            .values(status="sending", claim_token=token, claimed_at=now, attempts=OutboxMessage.attempts + 1)
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        return db.query(OutboxMessage).filter(OutboxMessage.claim_token == token).order_by(OutboxMessage.id).all()
+
+    def process_batch(self, now: Optional[datetime] = None) -> int:
+        """Claim and send one batch. Returns the number of messages attempted."""
+        from models import ReviewRequest
+
+        now = now or datetime.now(timezone.utc)
+        db = self._session()
+        try:
+            claimed = self._claim(db, now)
+            if not claimed:
+                return 0
+
+            by_carrier: dict[str, list] = {}
+            for msg in claimed:
+                by_carrier.setdefault(msg.carrier or "", []).append(msg)
+
+            sent_ids: list[int] = []
+            for carrier, msgs in by_carrier.items():
+                results = dispatch_sms([(m.recipient, m.body) for m in msgs], carrier=carrier, send=send_sms)
+                for msg, result in zip(msgs, results):
+                    if result["ok"]:
+                        msg.status = "sent"
+                        msg.sent_at = now
+                        msg.last_error = None
+                        if msg.review_request_id:
+                            sent_ids.append(msg.review_request_id)
+                    elif msg.attempts >= self.max_attempts:
+                        msg.status = "failed"
+                        msg.last_error = result.get("error", "unknown")
+                    else:
+                        msg.status = "pending"
+                        msg.last_error = result.get("error", "unknown")
+                        msg.next_attempt_at = now + timedelta(seconds=self._delay(msg.attempts))
+                    msg.claim_token = None
+
+            if sent_ids:
+                flipped = db.execute(
+                    update(ReviewRequest)
+                    .where(ReviewRequest.id.in_(sent_ids), ReviewRequest.status == "pending")
+                    .values(status="sent", sent_at=now)
+                    .returning(ReviewRequest.business_id)
+                    .execution_options(synchronize_session=False)
+                ).all()
+                record_review_events(db, "sent", ((row.business_id, now) for row in flipped))
+            # Nothing to invalidate: /r/{code} doesn't cache links while pending.
+            db.commit()
+            return len(claimed)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _delay(self, attempts: int) -> float:
+        """Exponential backoff with jitter: backoff * 2^(attempts-1), +/-20%."""
+        return self.backoff * (2 ** (attempts - 1)) * random.uniform(0.8, 1.2)
+
+    def drain(self, budget: float = 20.0) -> int:
+        """Process batches until nothing is due or ``budget`` seconds have passed."""
+        deadline = time.monotonic() + budget
+        total = 0
+        while time.monotonic() < deadline:
+            n = self.process_batch()
+            if not n:
+                break
+            total += n
+        return total
+
+    def wake(self) -> None:
+        self._wake.set()
+
+    def run(self) -> None:
+        """Poll for due messages until stopped."""
+        while not self._stop.is_set():
+            try:
+                self.drain()
+            except Exception as e:
+                logger.error("Outbox worker batch failed: %s", e)
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self.run, name="outbox-worker", daemon=True)
+        self._thread.start()
+
+    def close(self) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout=30)
+            self._thread = None
+
+
+outbox_worker = OutboxWorker(
+    batch_size=int(os.getenv("OUTBOX_BATCH_SIZE", "50")),
+    max_attempts=int(os.getenv("OUTBOX_MAX_ATTEMPTS", "5")),
+    backoff=float(os.getenv("OUTBOX_RETRY_BACKOFF", "30")),
+)
+
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+
+    logging.basicConfig(level=logging.INFO)
+    load_dotenv()
+
+    from database import init_db
+
+    init_db()
+    logger.info("Outbox worker started")
+    try:
+        outbox_worker.run()
+    except KeyboardInterrupt:
+        pass
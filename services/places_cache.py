@@ -0,0 +1,148 @@
+"""Two-tier cache for Google Places resolution.
+
+Tier one is an in-process LRU; tier two is the ``place_cache`` table, so a
+business resolved by any worker is known to all of them. Misses ("could not
+resolve") are cached too, with a shorter TTL.
+"""
+
+import logging
+import os
+import re
+import urllib.parse
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from .cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+POSITIVE_TTL = float(os.getenv("PLACES_CACHE_TTL", str(7 * 24 * 3600)))
+NEGATIVE_TTL = float(os.getenv("PLACES_NEGATIVE_TTL", "300"))
+
+# Sentinel for "not cached"; a cached ``None`` means "known not to resolve".
+MISS = object()
+
+places_cache = TTLCache(maxsize=int(os.getenv("PLACES_CACHE_SIZE", "2048")), ttl=POSITIVE_TTL)
+
+_TRACKING_PARAMS = re.compile(r"^(utm_\w+|g_st|g_ep|entry|shorturl|coh|skid|hl)$", re.IGNORECASE)
+
+
+def input_key(text: str) -> str:
+    """Cache key for raw user input: a normalized URL, or a case-folded name."""
+    text = text.strip()
+    is_url = text.startswith("http") or "google.com/maps" in text or "goo.gl/" in text
+    if not is_url:
+        return "input:" + " ".join(text.casefold().split())
+    return "input:" + _normalize_url(text if text.startswith("http") else "https://" + text)
+
+
+def url_key(url: str) -> str:
+    return "url:" + _normalize_url(url)
+
+
+def place_key(place_id: str) -> str:
+    return "place:" + place_id
+
+
+def _normalize_url(url: str) -> str:
+    # Paths stay case-sensitive: short-link ids like maps.app.goo.gl/AbC are.
+    parts = urllib.parse.urlsplit(url.strip())
+    query = sorted(
+        (k, v) for k, v in urllib.parse.parse_qsl(parts.query, keep_blank_values=True)
+        if not _TRACKING_PARAMS.match(k)
+    )
+    return urllib.parse.urlunsplit((
+        "https",
+        parts.netloc.lower(),
+        parts.path.rstrip("/") or "/",
+        urllib.parse.urlencode(query),
+        "",
+    ))
+
+
+def get(key: str, db: Optional[Session] = None):
+    """Look ``key`` up in memory, then in the table. Returns ``MISS`` if unknown."""
+    value = places_cache.get(key, MISS)
+    if value is not MISS or db is None:
+        return value
+
+    from models import PlaceCacheEntry
+
+    try:
+        row = db.get(PlaceCacheEntry, key)
+    except Exception as e:
+        # On PostgreSQL the failed statement aborts the transaction; end it so
+        # the caller's session can go on (as ``put`` does).
+        db.rollback()
+        logger.warning("Place cache lookup failed: %s", e)
+        return MISS
+    if row is None:
+        return MISS
+    remaining = (_aware(row.expires_at) - datetime.now(timezone.utc)).total_seconds()
+    if remaining <= 0:
+        return MISS
+    value = {"name": row.name, "place_id": row.place_id} if row.place_id else None
+    places_cache.set(key, value, ttl=remaining)
+    return value
+
+
+def put(keys: list[str], value: Optional[dict], db: Optional[Session] = None) -> None:
+    """Store a result (or ``None`` for a miss) under every key in ``keys``."""
+    ttl = POSITIVE_TTL if value else NEGATIVE_TTL
+    for key in keys:
+        places_cache.set(key, value, ttl=ttl)
+    if db is None:
+        return
+
+    from models import PlaceCacheEntry
+
+    expires_at = datetime.now(timezone.utc) + timedelta(seconds=ttl)
+    try:
+        for key in keys:
+            db.merge(PlaceCacheEntry(
+                key=key,
+                place_id=value["place_id"] if value else None,
+                name=value["name"] if value else None,
+                expires_at=expires_at,
+            ))
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.warning("Place cache write failed: %s", e)
+
+
+def purge(db: Optional[Session] = None, target: str = "") -> int:
+    """Drop cached resolutions. ``target`` may be a raw input, a URL or a place id;
+    empty purges everything. Returns the number of persistent rows removed."""
+    from models import PlaceCacheEntry
+
+    if not target:
+        places_cache.clear()
+        if db is None:
+            return 0
+        removed = db.query(PlaceCacheEntry).delete(synchronize_session=False)
+        db.commit()
+        return removed
+
+    keys = {input_key(target), place_key(target.strip())}
+    if target.strip().startswith("http"):
+        keys.add(url_key(target))
+    for key in keys:
+        places_cache.pop(key)
+    if db is None:
+        return 0
+    query = db.query(PlaceCacheEntry).filter(
+        (PlaceCacheEntry.key.in_(keys)) | (PlaceCacheEntry.place_id == target.strip())
+    )
+    # Rows keyed by input/url that point at a purged place id drop out of memory too.
+    for (key,) in query.with_entities(PlaceCacheEntry.key):
+        places_cache.pop(key)
+    removed = query.delete(synchronize_session=False)
+    db.commit()
+    return removed
+
+
+def _aware(dt: datetime) -> datetime:
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
@@ -0,0 +1,77 @@
+import threading
+import time
+from typing import Optional
+
+from .cache import TTLCache
+
+
+class TokenBucket:
+    """Thread-safe token bucket. ``rate`` tokens/second, bursts up to ``capacity``.
+
+    A rate of 0 disables limiting.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self, tokens: float = 1.0) -> bool:
+        """Take tokens if available right now; never blocks."""
+        if self.rate <= 0:
+            return True
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return True
+            return False
+
+    def acquire(self, tokens: float = 1.0) -> None:
+        """Block until tokens are available."""
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                self._refill(time.monotonic())
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait = (tokens - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class KeyedRateLimiter:
+    """A ``TokenBucket`` per key (client IP, short code, …), at most ``maxsize`` of them.
+
+    A bucket idle long enough to refill completely is dropped; the least
+    recently used are dropped first when there are too many keys. A rate of
+    0 disables limiting.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None, maxsize: int = 100_000):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        ttl = self.capacity / rate if rate > 0 else 0.0
+        self._buckets = TTLCache(maxsize=maxsize, ttl=max(ttl, 1.0))
+        self._lock = threading.Lock()
+
+    def try_acquire(self, key, tokens: float = 1.0) -> bool:
+        if self.rate <= 0:
+            return True
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = TokenBucket(self.rate, self.capacity)
+            # Re-set on every use so a busy key keeps its (empty) bucket.
+            self._buckets.set(key, bucket)
+        return bucket.try_acquire(tokens)
+
+    def clear(self) -> None:
+        self._buckets.clear()
@@ -0,0 +1,149 @@
+"""Streaming recipient import: a CSV or XLSX file in, normalized US numbers out.
+
+Rows are read one at a time (``csv.reader`` over the upload, or openpyxl in
+read-only mode), checked with ``normalize_us_phone`` and de-duplicated, and
+the result is reported as a stream of events, so a 100k-row file never sits in
+memory as a whole. Only the set of numbers already seen grows with the file.
+
+Events, in file order:
+
+* ``{"phones": ["+14155551234", ...]}`` — up to ``BATCH`` new valid numbers
+* ``{"row": 7, "value": "555-12", "error": "Invalid US phone number: 555-12"}``
+* ``{"done": true, "rows": …, "valid": …, "duplicates": …, "invalid": …}`` last;
+  it carries an ``"error"`` instead of ``"done": true`` if the file could not
+  be read to the end
+"""
+
+import csv
+import io
+import json
+import logging
+from typing import BinaryIO, Iterable, Iterator, Optional
+
+from .sms import normalize_us_phone
+
+logger = logging.getLogger(__name__)
+
+BATCH = 500
+# Header names (lower-cased) that mark the phone column.
+PHONE_HEADERS = {"phone", "phone number", "phone_number", "phones", "mobile", "cell", "number", "tel", "telephone"}
+
+
+def file_kind(filename: Optional[str], content_type: Optional[str] = None) -> Optional[str]:
+    """``"csv"``, ``"xlsx"`` or None for an upload we can't read."""
+    name = (filename or "").lower()
+    if name.endswith((".csv", ".txt")) or content_type in ("text/csv", "text/plain"):
+        return "csv"
+    if name.endswith(".xlsx") or content_type == "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet":
+        return "xlsx"
+    return None
+
+
+def _cell_text(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        # Spreadsheets often store numbers as floats: 4155551234.0
+        value = int(value)
+    return str(value).strip()
+
+
+class _RawReader(io.RawIOBase):
+    """Adapts an object with only ``read`` (SpooledTemporaryFile before 3.11) for ``io`` wrappers."""
+
+    def __init__(self, file):
+        self._file = file
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        data = self._file.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+
+def read_rows(file: BinaryIO, kind: str) -> Iterator[list[str]]:
+    """The rows of an uploaded file as lists of cell strings, read lazily."""
+    if kind == "csv":
+        if not hasattr(file, "readable"):
+            file = io.BufferedReader(_RawReader(file))
+        # utf-8-sig drops the BOM Excel writes; undecodable bytes become U+FFFD
+        # (and so an invalid row) rather than aborting the whole import.
+        text = io.TextIOWrapper(file, encoding="utf-8-sig", errors="replace", newline="")
+        try:
+            yield from csv.reader(text)
+        finally:
+            # Leave the upload open; the framework closes it.
+            text.detach()
+        return
+
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(file, read_only=True, data_only=True)
+    try:
+        for row in workbook.worksheets[0].iter_rows(values_only=True):
+            yield [_cell_text(value) for value in row]
+    finally:
+        workbook.close()
+
+
+def _phone_column(first: list[str]) -> tuple[int, bool]:
+    """(column index, whether ``first`` is a header row)."""
+    for i, cell in enumerate(first):
+        if cell.strip().lower() in PHONE_HEADERS:
+            return i, True
+    for i, cell in enumerate(first):
+        if normalize_us_phone(cell):
+            return i, False
+    return 0, False
+
+
+def import_events(rows: Iterable[list[str]]) -> Iterator[dict]:
+    """Validate and de-duplicate the phone column of ``rows``; see the module docstring."""
+    seen: set[str] = set()
+    batch: list[str] = []
+    counts = {"rows": 0, "valid": 0, "duplicates": 0, "invalid": 0}
+    column = None
+
+    try:
+        for number, row in enumerate(rows, start=1):
+            if not any(cell.strip() for cell in row):
+                continue
+            if column is None:
+                column, header = _phone_column(row)
+                if header:
+                    continue
+            counts["rows"] += 1
+            value = row[column].strip() if column < len(row) else ""
+            digits = normalize_us_phone(value)
+            if digits is None:
+                counts["invalid"] += 1
+                error = f"Invalid US phone number: {value}" if value else "Missing phone number"
+                yield {"row": number, "value": value, "error": error}
+            elif digits in seen:
+                counts["duplicates"] += 1
+            else:
+                seen.add(digits)
+                counts["valid"] += 1
+                batch.append(f"+1{digits}")
+                if len(batch) >= BATCH:
+                    yield {"phones": batch}
+                    batch = []
+    except Exception as e:
+        # A malformed file: report what was read so far.
+        logger.warning("Recipient import stopped: %s", e)
+        if batch:
+            yield {"phones": batch}
+        yield {"done": False, **counts, "error": f"Could not read the file: {e}"}
+        return
+
+    if batch:
+        yield {"phones": batch}
+    yield {"done": True, **counts}
+
+
+def ndjson(file: BinaryIO, kind: str) -> Iterator[bytes]:
+    """``import_events`` for an uploaded file, one JSON document per line."""
+    for event in import_events(read_rows(file, kind)):
+        yield (json.dumps(event) + "\n").encode()
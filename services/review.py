@@ -1,9 +1,10 @@
 import secrets
 import string
 
-import anthropic
 from sqlalchemy.orm import Session
 
+from .shortcodes import short_code_allocator
+
 
 def generate_short_code(length: int = 7) -> str:
     alphabet = string.ascii_lowercase + string.digits
@@ -24,8 +25,49 @@ def generate_unique_short_code(db: Session, max_retries: int = 5) -> str:
     raise RuntimeError(f"Failed to generate unique short code after {max_retries} attempts")
 
 
+def reserve_short_codes(db: Session, count: int) -> list[str]:
+    """``count`` distinct short codes from the configured allocator.
+
+    See ``services/shortcodes.py``; the unique constraint on ``short_code``
+    remains the final guard.
+    """
+    return short_code_allocator.allocate(db, count)
+
+
+def probe_short_codes(db: Session, count: int, max_retries: int = 5) -> list[str]:
+    """Generate ``count`` distinct random short codes not yet in the DB.
+
+    Candidates are checked with one ``IN`` query per round; only the ones that
+    collided are regenerated. The unique constraint still guards against a
+    concurrent batch taking the same code before the insert.
+    """
+    from models import ReviewRequest
+
+    codes: set[str] = set()
+    for attempt in range(max_retries):
+        candidates = set()
+        while len(codes) + len(candidates) < count:
+            code = generate_short_code()
+            if code not in codes:
+                candidates.add(code)
+        taken = set()
+        pending = list(candidates)
+        for i in range(0, len(pending), 500):
+            taken.update(
+                code for (code,) in db.query(ReviewRequest.short_code).filter(
+                    ReviewRequest.short_code.in_(pending[i:i + 500])
+                )
+            )
+        codes |= candidates - taken
+        if len(codes) == count:
+            return list(codes)
+    raise RuntimeError(f"Failed to reserve {count} unique short codes after {max_retries} attempts")
+
+
 def generate_review_text(business_name: str, timeout: float = 30.0) -> str:
     """Generate AI review text. Raises on API failure or empty response."""
+    import anthropic  # imported on first use: it dominates cold-start import time
+
     client = anthropic.Anthropic(timeout=timeout)
     message = client.messages.create(
         model="claude-sonnet-4-5-20250929",
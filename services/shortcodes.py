@@ -0,0 +1,199 @@
+"""Short-code allocation for review links.
+
+``SHORT_CODE_ALLOCATOR`` picks the strategy:
+
+* ``sequence`` (default) — each process reserves blocks of ``SHORT_CODE_BLOCK``
+  numbers from a counter row in ``short_code_sequence`` (one atomic
+  ``UPDATE … RETURNING`` per block, committed on its own) and maps every number
+  to a 7-character code with a keyed permutation. Distinct numbers give
+  distinct codes, so codes are unique across workers without looking anything
+  up, and without the key consecutive numbers give unrelated-looking codes.
+* ``random`` — random codes checked against ``review_requests`` before use.
+
+The permutation key is ``SHORT_CODE_KEY``, or when that is empty a random key
+stored on the counter row the first time it is created. Changing the key later
+can only collide with codes issued under the old one, which the unique
+constraint on ``short_code`` still rejects (``/api/generate`` retries).
+"""
+
+import hashlib
+import logging
+import os
+import secrets
+import string
+import threading
+from typing import Optional
+
+from sqlalchemy import insert, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+ALPHABET = string.ascii_lowercase + string.digits
+CODE_LENGTH = 7
+
+# The permutation works on (left, right) pairs of 3 and 4 base-36 digits.
+_LEFT = 36 ** 3
+_RIGHT = 36 ** 4
+DOMAIN = _LEFT * _RIGHT
+
+
+class CodePermutation:
+    """Keyed bijection between ``range(DOMAIN)`` and 7-character codes.
+
+    An alternating Feistel network over Z(36^3) x Z(36^4): each round adds a
+    keyed BLAKE2b hash of one half to the other, modulo that half's size.
+    Every round is undone by subtracting the same hash, so the whole network
+    is a permutation of the domain.
+    """
+
+    def __init__(self, key: bytes, rounds: int = 8):
+        self._rounds = [
+            hashlib.blake2b(key=key[:64], digest_size=8, salt=r.to_bytes(16, "little"))
+            for r in range(rounds)
+        ]
+
+    def _f(self, r: int, value: int) -> int:
+        h = self._rounds[r].copy()
+        h.update(value.to_bytes(4, "little"))
+        return int.from_bytes(h.digest(), "little")
+
+    def encode(self, n: int) -> str:
+        if not 0 <= n < DOMAIN:
+            raise ValueError(f"{n} is outside the short-code domain")
+        left, right = divmod(n, _RIGHT)
+        for r in range(len(self._rounds)):
+            if r % 2 == 0:
+                left = (left + self._f(r, right)) % _LEFT
+            else:
+                right = (right + self._f(r, left)) % _RIGHT
+        n = left * _RIGHT + right
+        chars = []
+        for _ in range(CODE_LENGTH):
+            n, digit = divmod(n, 36)
+            chars.append(ALPHABET[digit])
+        return "".join(chars)
+
+    def decode(self, code: str) -> int:
+        if len(code) != CODE_LENGTH:
+            raise ValueError(f"Short codes are {CODE_LENGTH} characters")
+        n = 0
+        for char in reversed(code):
+            n = n * 36 + ALPHABET.index(char)
+        left, right = divmod(n, _RIGHT)
+        for r in reversed(range(len(self._rounds))):
+            if r % 2 == 0:
+                left = (left - self._f(r, right)) % _LEFT
+            else:
+                right = (right - self._f(r, left)) % _RIGHT
+        return left * _RIGHT + right
+
+
+class SequenceAllocator:
+    """Hands out codes from blocks of a shared counter.
+
+    Blocks are reserved through ``session_factory`` (``SessionLocal`` by
+    default) in their own transaction, so a rolled-back request never hands
+    its block back to another worker. Unused numbers in a block are simply
+    skipped when the process exits.
+    """
+
+    def __init__(self, session_factory=None, block_size: int = 1000, key: str = "", name: str = "review_requests"):
+        self.session_factory = session_factory
+        self.block_size = block_size
+        self.key = key
+        self.name = name
+        self._next = 0
+        self._end = 0
+        self._permutation: Optional[CodePermutation] = None
+        self._lock = threading.Lock()
+
+    def allocate(self, db: Session, count: int) -> list[str]:
+        """``count`` fresh codes. ``db`` is unused; blocks use their own session."""
+        numbers = []
+        with self._lock:
+            while len(numbers) < count:
+                if self._next == self._end:
+                    self._next, self._end = self._reserve(max(self.block_size, count - len(numbers)))
+                take = min(self._end - self._next, count - len(numbers))
+                numbers.extend(range(self._next, self._next + take))
+                self._next += take
+            permutation = self._permutation
+        return [permutation.encode(n) for n in numbers]
+
+    def _reserve(self, size: int) -> tuple[int, int]:
+        from models import ShortCodeSequence
+
+        factory = self.session_factory
+        if factory is None:
+            from database import SessionLocal as factory
+
+        db = factory()
+        try:
+            for _ in range(3):
+                row = db.execute(
+                    update(ShortCodeSequence)
+                    .where(ShortCodeSequence.name == self.name)
+                    .values(next_value=ShortCodeSequence.next_value + size)
+                    .returning(ShortCodeSequence.next_value, ShortCodeSequence.key)
+                    .execution_options(synchronize_session=False)
+                ).first()
+                if row is not None:
+                    db.commit()
+                    break
+                try:
+                    db.execute(insert(ShortCodeSequence).values(name=self.name, next_value=0, key=secrets.token_hex(32)))
+                    db.commit()
+                except IntegrityError:
+                    db.rollback()  # another worker created the row first
+            else:
+                raise RuntimeError("Could not reserve a short-code block")
+        finally:
+            db.close()
+
+        end = row.next_value
+        if end > DOMAIN:
+            raise RuntimeError("Short-code space exhausted")
+        if self._permutation is None:
+            self._permutation = CodePermutation((self.key or row.key).encode())
+        logger.debug("Reserved short-code block %d-%d", end - size, end)
+        return end - size, end
+
+    def reset(self) -> None:
+        """Drop the current block and key (e.g. after pointing at another database)."""
+        with self._lock:
+            self._next = self._end = 0
+            self._permutation = None
+
+
+class RandomAllocator:
+    """Random codes, checked against ``review_requests`` one ``IN`` query per round."""
+
+    session_factory = None
+
+    def __init__(self, max_retries: int = 5):
+        self.max_retries = max_retries
+
+    def allocate(self, db: Session, count: int) -> list[str]:
+        from .review import probe_short_codes
+
+        return probe_short_codes(db, count, self.max_retries)
+
+    def reset(self) -> None:
+        pass
+
+
+def make_allocator(kind: Optional[str] = None):
+    kind = (kind or os.getenv("SHORT_CODE_ALLOCATOR", "sequence")).strip().lower()
+    if kind == "random":
+        return RandomAllocator()
+    if kind != "sequence":
+        logger.warning("Unknown SHORT_CODE_ALLOCATOR %r, using 'sequence'", kind)
+    return SequenceAllocator(
+        block_size=int(os.getenv("SHORT_CODE_BLOCK", "1000")),
+        key=os.getenv("SHORT_CODE_KEY", ""),
+    )
+
+
+short_code_allocator = make_allocator()
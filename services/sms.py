@@ -1,11 +1,20 @@
+import asyncio
 import logging
 import os
+import re
 import smtplib
+import threading
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
+from typing import Optional
+
+from .metrics import record_sms, timed
+from .smtp_pool import get_smtp_pool
 
 logger = logging.getLogger(__name__)
 
+_NON_DIGITS = re.compile(r"[^0-9]")
+
 SMS_GATEWAYS = {
     "tmobile": {"gateway": "tmomail.net", "label": "T-Mobile / Mint / Metro"},
     "att": {"gateway": "txt.att.net", "label": "AT&T / Cricket"},
@@ -32,10 +41,8 @@ def _send_email_internal(to: str, subject: str, body: str) -> dict:
     msg.attach(MIMEText(body, "html"))
 
     try:
-        with smtplib.SMTP(smtp_host, smtp_port) as server:
-            server.starttls()
-            server.login(smtp_user, smtp_pass)
-            server.sendmail(from_email, to, msg.as_string())
+        with timed("smtp", "send"):
+            get_smtp_pool(smtp_host, smtp_port, smtp_user, smtp_pass).sendmail(from_email, to, msg.as_string())
         return {"ok": True}
     except smtplib.SMTPAuthenticationError as e:
         return {"ok": False, "error": f"SMTP auth failed (check SMTP_USER/SMTP_PASSWORD): {e}"}
@@ -45,6 +52,18 @@ def _send_email_internal(to: str, subject: str, body: str) -> dict:
         return {"ok": False, "error": f"Email send error: {e}"}
 
 
+def normalize_us_phone(raw: str) -> Optional[str]:
+    """The 10 digits of a US number, ignoring punctuation and a leading country code 1; None if it isn't one."""
+    if raw.isascii():
+        # Same result as the isdigit() filter below, without a Python-level loop per character.
+        digits = _NON_DIGITS.sub("", raw)
+    else:
+        digits = "".join(c for c in raw if c.isdigit())
+    if digits.startswith("1") and len(digits) == 11:
+        digits = digits[1:]
+    return digits if len(digits) == 10 else None
+
+
 def _send_sms_via_email(to: str, body: str, carrier: str) -> dict:
     """Send SMS via carrier email gateway. Returns {"ok": True/False, "error": ...}."""
     entry = SMS_GATEWAYS.get(carrier)
@@ -52,10 +71,8 @@ def _send_sms_via_email(to: str, body: str, carrier: str) -> dict:
         return {"ok": False, "error": f"Unknown carrier: '{carrier}'. Supported: {list(SMS_GATEWAYS.keys())}"}
     gateway = entry["gateway"]
 
-    digits = "".join(c for c in to if c.isdigit())
-    if digits.startswith("1") and len(digits) == 11:
-        digits = digits[1:]
-    if len(digits) != 10:
+    digits = normalize_us_phone(to)
+    if digits is None:
         return {"ok": False, "error": f"Invalid US phone number: {to}"}
 
     sms_email = f"{digits}@{gateway}"
@@ -67,23 +84,120 @@ def _send_sms_via_email(to: str, body: str, carrier: str) -> dict:
     return result
 
 
+_TWILIO_DEFAULT_BASE = "https://api.twilio.com"
+
+
+class _TwilioBackend:
+    """Twilio client built once per set of credentials.
+
+    The client's HTTP session keeps its connections alive, so consecutive
+    messages skip the TCP/TLS setup.
+    """
+
+    def __init__(self, sid: str, token: str, from_num: str, service_sid: str):
+        from requests.adapters import HTTPAdapter
+        from twilio.http.http_client import TwilioHttpClient
+        from twilio.rest import Client
+
+        self.key = (sid, token, from_num, service_sid)
+        self.from_num = from_num
+        self.service_sid = service_sid
+        http_client = TwilioHttpClient(pool_connections=True, timeout=30)
+        pool_size = max(10, int(os.getenv("SMS_DISPATCH_CONCURRENCY", "8")))
+        http_client.session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=pool_size))
+        base = os.getenv("TWILIO_API_BASE", "").rstrip("/")
+        if base and base != _TWILIO_DEFAULT_BASE:
+            # Local stand-in (load tests): the SDK's host is fixed, so rewrite the URLs.
+            request = http_client.request
+
+            def rebased(method, url, *args, **kwargs):
+                return request(method, url.replace(_TWILIO_DEFAULT_BASE, base, 1), *args, **kwargs)
+
+            http_client.request = rebased
+        self.client = Client(sid, token, http_client=http_client)
+
+    def send(self, to: str, body: str):
+        # A Messaging Service picks the sender from its pool and queues bulk sends.
+        if self.service_sid:
+            return self.client.messages.create(body=body, messaging_service_sid=self.service_sid, to=to)
+        return self.client.messages.create(body=body, from_=self.from_num, to=to)
+
+
+_twilio_backend: Optional[_TwilioBackend] = None
+_twilio_lock = threading.Lock()
+
+
+def _twilio_settings() -> Optional[tuple[str, str, str, str]]:
+    sid = os.getenv("TWILIO_ACCOUNT_SID", "")
+    token = os.getenv("TWILIO_AUTH_TOKEN", "")
+    from_num = os.getenv("TWILIO_FROM_NUMBER", "")
+    service_sid = os.getenv("TWILIO_MESSAGING_SERVICE_SID", "").strip()
+    if not (sid and token and (from_num or service_sid)):
+        return None
+    return sid, token, from_num, service_sid
+
+
+def _get_twilio_backend() -> Optional[_TwilioBackend]:
+    """Return the cached Twilio backend, rebuilding it if the credentials changed."""
+    global _twilio_backend
+    key = _twilio_settings()
+    if key is None:
+        return None
+
+    sid, token, from_num, service_sid = key
+    backend = _twilio_backend
+    if backend is not None and backend.key == key:
+        return backend
+    with _twilio_lock:
+        if _twilio_backend is None or _twilio_backend.key != key:
+            _twilio_backend = _TwilioBackend(sid, token, from_num, service_sid)
+        return _twilio_backend
+
+
 def _send_via_twilio(to: str, body: str) -> dict:
     """Send SMS via Twilio. Returns {"ok": True/False, "error": ...}."""
-    sid = os.getenv("TWILIO_ACCOUNT_SID")
-    token = os.getenv("TWILIO_AUTH_TOKEN")
-    from_num = os.getenv("TWILIO_FROM_NUMBER")
-    if not all([sid, token, from_num]):
-        return {"ok": False, "error": "Twilio env vars not set (TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN, TWILIO_FROM_NUMBER)"}
     try:
-        from twilio.rest import Client
-
-        msg = Client(sid, token).messages.create(body=body, from_=from_num, to=to)
+        backend = _get_twilio_backend()
+        if backend is None:
+            return {"ok": False, "error": "Twilio env vars not set (TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN, TWILIO_FROM_NUMBER)"}
+        with timed("twilio", "send"):
+            msg = backend.send(to, body)
         logger.info("SMS sent to %s | SID: %s", to, msg.sid)
         return {"ok": True}
     except Exception as e:
         return {"ok": False, "error": f"Twilio failed: {e}"}
 
 
+async def _send_via_twilio_async(to: str, body: str) -> dict:
+    """Send SMS through Twilio's REST API on the shared async HTTP client."""
+    from .http import get_async_client
+
+    settings = _twilio_settings()
+    if settings is None:
+        return {"ok": False, "error": "Twilio env vars not set (TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN, TWILIO_FROM_NUMBER)"}
+    sid, token, from_num, service_sid = settings
+    base = os.getenv("TWILIO_API_BASE", _TWILIO_DEFAULT_BASE).rstrip("/")
+    data = {"To": to, "Body": body}
+    if service_sid:
+        data["MessagingServiceSid"] = service_sid
+    else:
+        data["From"] = from_num
+    try:
+        with timed("twilio", "send") as call:
+            resp = await get_async_client().post(
+                f"{base}/2010-04-01/Accounts/{sid}/Messages.json", data=data, auth=(sid, token), timeout=30
+            )
+            if resp.status_code >= 400:
+                call.outcome = "error"
+        payload = resp.json()
+        if resp.status_code >= 400:
+            return {"ok": False, "error": f"Twilio failed: HTTP {resp.status_code} {payload.get('message', '')}".rstrip()}
+        logger.info("SMS sent to %s | SID: %s", to, payload.get("sid"))
+        return {"ok": True}
+    except Exception as e:
+        return {"ok": False, "error": f"Twilio failed: {e}"}
+
+
 def diagnose_sms() -> dict:
     """Check SMS backend configuration and SMTP connectivity."""
     backend = os.getenv("SMS_BACKEND", "twilio").lower()
@@ -93,7 +207,9 @@ def diagnose_sms() -> dict:
         sid = os.getenv("TWILIO_ACCOUNT_SID")
         token = os.getenv("TWILIO_AUTH_TOKEN")
         from_num = os.getenv("TWILIO_FROM_NUMBER")
-        info["twilio_configured"] = bool(sid and token and from_num)
+        service_sid = os.getenv("TWILIO_MESSAGING_SERVICE_SID")
+        info["twilio_configured"] = bool(sid and token and (from_num or service_sid))
+        info["twilio_messaging_service"] = bool(service_sid)
         if not info["twilio_configured"]:
             info["error"] = "Missing TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN, or TWILIO_FROM_NUMBER"
         return info
@@ -135,8 +251,24 @@ def send_sms(to: str, body: str, carrier: str = "") -> dict:
     backend = os.getenv("SMS_BACKEND", "twilio").lower()
 
     if backend == "twilio":
-        return _send_via_twilio(to, body)
+        return record_sms(backend, _send_via_twilio(to, body))
+
+    if not carrier:
+        return record_sms(backend, {"ok": False, "error": f"Email backend requires carrier selection. SMS_BACKEND={backend}"})
+    return record_sms(backend, _send_sms_via_email(to, body, carrier))
+
+
+async def send_sms_async(to: str, body: str, carrier: str = "") -> dict:
+    """Async variant of send_sms for ``async def`` routes.
+
+    Twilio goes over the shared async HTTP client; the email gateway runs the
+    pooled (blocking) SMTP send in a worker thread.
+    """
+    backend = os.getenv("SMS_BACKEND", "twilio").lower()
+
+    if backend == "twilio":
+        return record_sms(backend, await _send_via_twilio_async(to, body))
 
     if not carrier:
-        return {"ok": False, "error": f"Email backend requires carrier selection. SMS_BACKEND={backend}"}
-    return _send_sms_via_email(to, body, carrier)
+        return record_sms(backend, {"ok": False, "error": f"Email backend requires carrier selection. SMS_BACKEND={backend}"})
+    return record_sms(backend, await asyncio.to_thread(_send_sms_via_email, to, body, carrier))
@@ -0,0 +1,169 @@
+import logging
+import os
+import queue
+import smtplib
+import threading
+import time
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class _PooledConnection:
+    def __init__(self, smtp: smtplib.SMTP):
+        self.smtp = smtp
+        self.sent = 0
+        self.last_used = time.monotonic()
+
+
+class SMTPPool:
+    """Pool of authenticated SMTP sessions reused across messages.
+
+    Idle sessions are health-checked with NOOP before reuse, a session is
+    retired after ``max_messages`` sends, and a send that hits
+    ``SMTPServerDisconnected`` reconnects and retries once.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        user: str,
+        password: str,
+        size: int = 4,
+        max_messages: int = 100,
+        idle_check: float = 30.0,
+        timeout: float = 30.0,
+        starttls: bool = True,
+    ):
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.size = size
+        self.max_messages = max_messages
+        self.idle_check = idle_check
+        self.timeout = timeout
+        self.starttls = starttls
+        self._idle: queue.LifoQueue = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self.connects = 0
+
+    def _connect(self) -> _PooledConnection:
+        smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            if self.starttls:
+                smtp.starttls()
+            else:
+                smtp.ehlo_or_helo_if_needed()
+            # Plain-text local stand-ins (aiosmtpd, smtpd) usually offer no AUTH.
+            if self.user and (self.starttls or smtp.has_extn("auth")):
+                smtp.login(self.user, self.password)
+        except Exception:
+            _quit(smtp)
+            raise
+        self.connects += 1
+        return _PooledConnection(smtp)
+
+    def _healthy(self, conn: _PooledConnection) -> bool:
+        if time.monotonic() - conn.last_used < self.idle_check:
+            return True
+        try:
+            return conn.smtp.noop()[0] == 250
+        except (smtplib.SMTPException, OSError):
+            return False
+
+    def _checkout(self) -> _PooledConnection:
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                return self._connect()
+            if self._healthy(conn):
+                return conn
+            _quit(conn.smtp)
+
+    def _checkin(self, conn: _PooledConnection) -> None:
+        conn.sent += 1
+        conn.last_used = time.monotonic()
+        if conn.sent >= self.max_messages:
+            _quit(conn.smtp)
+        else:
+            self._idle.put(conn)
+
+    def sendmail(self, from_addr: str, to: str, msg: str) -> None:
+        """Send one message on a pooled session. SMTP errors propagate to the caller."""
+        with self._slots:
+            conn = self._checkout()
+            try:
+                conn.smtp.sendmail(from_addr, to, msg)
+            except smtplib.SMTPServerDisconnected:
+                logger.info("SMTP session to %s dropped, reconnecting", self.host)
+                _quit(conn.smtp)
+                conn = self._connect()
+                try:
+                    conn.smtp.sendmail(from_addr, to, msg)
+                except Exception:
+                    _quit(conn.smtp)
+                    raise
+            except (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused):
+                # Session is still usable; smtplib already sent RSET.
+                self._checkin(conn)
+                raise
+            except Exception:
+                _quit(conn.smtp)
+                raise
+            self._checkin(conn)
+
+    def close(self) -> None:
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            _quit(conn.smtp)
+
+
+def _quit(smtp: smtplib.SMTP) -> None:
+    try:
+        smtp.quit()
+    except Exception:
+        try:
+            smtp.close()
+        except Exception:
+            pass
+
+
+_pool: Optional[SMTPPool] = None
+_pool_key: Optional[tuple] = None
+_pool_lock = threading.Lock()
+
+
+def get_smtp_pool(host: str, port: int, user: str, password: str) -> SMTPPool:
+    """Return the process-wide pool, rebuilding it when the SMTP settings change."""
+    global _pool, _pool_key
+    starttls = os.getenv("SMTP_STARTTLS", "1").strip().lower() not in ("0", "false", "no")
+    key = (host, port, user, password, starttls)
+    with _pool_lock:
+        if _pool is None or _pool_key != key:
+            if _pool is not None:
+                _pool.close()
+            _pool = SMTPPool(
+                host,
+                port,
+                user,
+                password,
+                size=int(os.getenv("SMTP_POOL_SIZE", "4")),
+                max_messages=int(os.getenv("SMTP_MAX_MESSAGES_PER_CONN", "100")),
+                starttls=starttls,
+            )
+            _pool_key = key
+        return _pool
+
+
+def close_smtp_pool() -> None:
+    global _pool, _pool_key
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+        _pool = _pool_key = None
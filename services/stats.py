@@ -0,0 +1,242 @@
+"""Pre-aggregated review counters.
+
+``business_stats`` and ``daily_review_stats`` are bumped in the same
+transaction as the status change they count: creation in /api/generate,
+``pending -> sent`` in the outbox worker, ``sent -> clicked`` in the click
+flush, and deletion in DELETE /api/review. Dashboards read them instead of
+scanning ``review_requests``.
+
+Rebuild from the raw rows or verify them with
+``python -m services.stats rebuild|check [--business ID]``.
+"""
+
+import logging
+from collections import Counter
+from datetime import date, datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import Date, case, delete, func, insert, update
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+
+def bump_business_stats(db: Session, business_id: int, total: int = 0, sent: int = 0, clicked: int = 0) -> None:
+    """Add the deltas to a business's counters (creating the row if needed)."""
+    from models import BusinessStats
+
+    _upsert(db, BusinessStats, {"business_id": business_id}, {"total": total, "sent": sent, "clicked": clicked})
+
+
+def bump_daily_stats(db: Session, business_id: int, day: date, sent: int = 0, clicked: int = 0) -> None:
+    from models import DailyReviewStats
+
+    _upsert(db, DailyReviewStats, {"business_id": business_id, "day": day}, {"sent": sent, "clicked": clicked})
+
+
+def record_review_events(db: Session, field: str, events) -> int:
+    """Count ``(business_id, at)`` events as ``sent`` or ``clicked``.
+
+    Collapses them to one bump per business and per business-day.
+    """
+    per_business: Counter = Counter()
+    per_day: Counter = Counter()
+    for business_id, at in events:
+        per_business[business_id] += 1
+        per_day[business_id, _day(at)] += 1
+    for business_id, n in per_business.items():
+        bump_business_stats(db, business_id, **{field: n})
+    for (business_id, day), n in per_day.items():
+        bump_daily_stats(db, business_id, day, **{field: n})
+    return sum(per_business.values())
+
+
+def forget_review_request(db: Session, rr) -> None:
+    """Take a review request that is about to be deleted out of the counters."""
+    was_sent = rr.status in ("sent", "clicked")
+    was_clicked = rr.status == "clicked"
+    bump_business_stats(db, rr.business_id, total=-1, sent=-int(was_sent), clicked=-int(was_clicked))
+    if rr.sent_at:
+        bump_daily_stats(db, rr.business_id, _day(rr.sent_at), sent=-1)
+    if rr.clicked_at:
+        bump_daily_stats(db, rr.business_id, _day(rr.clicked_at), clicked=-1)
+
+
+def _day(at: datetime) -> date:
+    if at.tzinfo is not None:
+        at = at.astimezone(timezone.utc)
+    return at.date()
+
+
+def _upsert(db: Session, model, keys: dict, deltas: dict) -> None:
+    deltas = {k: v for k, v in deltas.items() if v}
+    if not deltas:
+        return
+    dialect = db.get_bind().dialect.name
+    if dialect in ("sqlite", "postgresql"):
+        if dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        stmt = dialect_insert(model).values(**keys, **deltas)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(keys),
+            set_={k: getattr(model, k) + stmt.excluded[k] for k in deltas},
+        )
+        db.execute(stmt)
+        return
+
+    updated = db.execute(
+        update(model)
+        .where(*(getattr(model, k) == v for k, v in keys.items()))
+        .values({k: getattr(model, k) + v for k, v in deltas.items()})
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if not updated:
+        db.execute(insert(model).values(**keys, **deltas))
+
+
+def review_timeseries(db: Session, business_id: int, days: int = 90, today: Optional[date] = None) -> list[dict]:
+    """Sent/clicked per day for the last ``days`` days, oldest first, zero-filled."""
+    from models import DailyReviewStats
+
+    end = today or datetime.now(timezone.utc).date()
+    start = end - timedelta(days=days - 1)
+    rows = {
+        row.day: row
+        for row in db.query(DailyReviewStats.day, DailyReviewStats.sent, DailyReviewStats.clicked).filter(
+            DailyReviewStats.business_id == business_id,
+            DailyReviewStats.day >= start,
+            DailyReviewStats.day <= end,
+        )
+    }
+    series = []
+    for i in range(days):
+        day = start + timedelta(days=i)
+        row = rows.get(day)
+        series.append({"day": day.isoformat(), "sent": row.sent if row else 0, "clicked": row.clicked if row else 0})
+    return series
+
+
+# ── Rebuild & consistency check ──────────────────────────────────────────────
+
+def _expected(db: Session, business_id: Optional[int] = None) -> tuple[dict, dict]:
+    """Counters recomputed from ``review_requests``: (per business, per business-day)."""
+    from models import ReviewRequest
+
+    def scoped(query):
+        return query.filter(ReviewRequest.business_id == business_id) if business_id is not None else query
+
+    totals = {
+        row.business_id: {"total": row.total, "sent": int(row.sent or 0), "clicked": int(row.clicked or 0)}
+        for row in scoped(
+            db.query(
+                ReviewRequest.business_id,
+                func.count(ReviewRequest.id).label("total"),
+                func.sum(case((ReviewRequest.status.in_(("sent", "clicked")), 1), else_=0)).label("sent"),
+                func.sum(case((ReviewRequest.status == "clicked", 1), else_=0)).label("clicked"),
+            )
+        ).group_by(ReviewRequest.business_id)
+    }
+
+    daily: dict = {}
+    for field, column in (("sent", ReviewRequest.sent_at), ("clicked", ReviewRequest.clicked_at)):
+        day = func.date(column, type_=Date)
+        for business_id_, day_value, n in scoped(
+            db.query(ReviewRequest.business_id, day, func.count(ReviewRequest.id)).filter(column.isnot(None))
+        ).group_by(ReviewRequest.business_id, day):
+            daily.setdefault((business_id_, day_value), {"sent": 0, "clicked": 0})[field] = n
+    return totals, daily
+
+
+def rebuild_stats(db: Session, business_id: Optional[int] = None) -> tuple[int, int]:
+    """Recompute the counters from ``review_requests``. Returns (business rows, daily rows)."""
+    from models import BusinessStats, DailyReviewStats
+
+    totals, daily = _expected(db, business_id)
+    for model in (BusinessStats, DailyReviewStats):
+        stmt = delete(model)
+        if business_id is not None:
+            stmt = stmt.where(model.business_id == business_id)
+        db.execute(stmt)
+    if totals:
+        db.execute(insert(BusinessStats), [{"business_id": b, **counts} for b, counts in totals.items()])
+    if daily:
+        db.execute(
+            insert(DailyReviewStats),
+            [{"business_id": b, "day": d, **counts} for (b, d), counts in daily.items()],
+        )
+    db.commit()
+    return len(totals), len(daily)
+
+
+def check_stats(db: Session, business_id: Optional[int] = None) -> list[dict]:
+    """Differences between the stored counters and the raw rows (empty when consistent)."""
+    from models import BusinessStats, DailyReviewStats
+
+    totals, daily = _expected(db, business_id)
+    zero = {"total": 0, "sent": 0, "clicked": 0}
+
+    stored_q = db.query(BusinessStats)
+    daily_q = db.query(DailyReviewStats)
+    if business_id is not None:
+        stored_q = stored_q.filter(BusinessStats.business_id == business_id)
+        daily_q = daily_q.filter(DailyReviewStats.business_id == business_id)
+    stored = {s.business_id: {"total": s.total, "sent": s.sent, "clicked": s.clicked} for s in stored_q}
+    stored_daily = {(s.business_id, s.day): {"sent": s.sent, "clicked": s.clicked} for s in daily_q}
+
+    problems = []
+    for b in sorted(set(totals) | set(stored)):
+        expected, actual = totals.get(b, zero), stored.get(b, zero)
+        for field in zero:
+            if expected[field] != actual[field]:
+                problems.append({
+                    "table": "business_stats",
+                    "business_id": b,
+                    "field": field,
+                    "expected": expected[field],
+                    "actual": actual[field],
+                })
+    for key in sorted(set(daily) | set(stored_daily)):
+        expected = daily.get(key, {"sent": 0, "clicked": 0})
+        actual = stored_daily.get(key, {"sent": 0, "clicked": 0})
+        for field in ("sent", "clicked"):
+            if expected[field] != actual[field]:
+                problems.append({
+                    "table": "daily_review_stats",
+                    "business_id": key[0],
+                    "day": key[1].isoformat(),
+                    "field": field,
+                    "expected": expected[field],
+                    "actual": actual[field],
+                })
+    return problems
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    from dotenv import load_dotenv
+
+    logging.basicConfig(level=logging.INFO)
+    load_dotenv()
+
+    from database import SessionLocal, init_db
+
+    parser = argparse.ArgumentParser(description="Rebuild or check the pre-aggregated review counters")
+    parser.add_argument("command", choices=["rebuild", "check"])
+    parser.add_argument("--business", type=int, help="limit to one business id")
+    args = parser.parse_args()
+
+    init_db()
+    with SessionLocal() as session:
+        if args.command == "rebuild":
+            n_business, n_daily = rebuild_stats(session, args.business)
+            logger.info("Rebuilt %d business rows and %d daily rows", n_business, n_daily)
+        else:
+            problems = check_stats(session, args.business)
+            for p in problems:
+                logger.warning("Mismatch: %s", p)
+            logger.info("%d mismatches", len(problems))
+            sys.exit(1 if problems else 0)
@@ -0,0 +1,27 @@
+// Short-link landing page: copy the review, then send the customer to Google.
+// The per-code data comes from the page's inline <script id="review"> payload.
+(() => {
+  const review = JSON.parse(document.getElementById('review').textContent);
+  const status = document.getElementById('status');
+  const copyButton = document.querySelector('.copy');
+
+  copyButton.addEventListener('click', async () => {
+    try {
+      await navigator.clipboard.writeText(review.text);
+      copyButton.textContent = 'Copied!';
+    } catch (e) {
+      prompt('Copy this review:', review.text);
+    }
+  });
+
+  (async () => {
+    try {
+      await navigator.clipboard.writeText(review.text);
+      status.textContent = 'Review copied! Redirecting…';
+      setTimeout(() => { window.location.href = review.url; }, 1500);
+    } catch (e) {
+      status.textContent = 'Tap Copy, then open Google Reviews.';
+      document.getElementById('fallback').classList.remove('hidden');
+    }
+  })();
+})();
@@ -1,11 +1,18 @@
+import os
+
 import pytest
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 from starlette.testclient import TestClient
 
-from database import Base, get_db
+# Tables are created per test below, not against the app's own database.
+os.environ["DB_INIT_ON_STARTUP"] = "0"
+
+from database import Base, get_db, get_read_db
 from main import app
+from models import Business, ReviewRequest
+from services import admission, click_recorder, outbox_worker, short_code_allocator, short_link_cache
 
 engine = create_engine(
     "sqlite:///:memory:",
@@ -14,6 +21,12 @@ engine = create_engine(
 )
 TestSession = sessionmaker(bind=engine)
 
+# Flush every click right after its response so tests see the write.
+click_recorder.session_factory = TestSession
+click_recorder.flush_interval = 0
+outbox_worker.session_factory = TestSession
+short_code_allocator.session_factory = TestSession
+
 
 @pytest.fixture()
 def db():
@@ -24,11 +37,46 @@ def db():
     finally:
         session.close()
         Base.metadata.drop_all(bind=engine)
+        short_code_allocator.reset()
+
+
+@pytest.fixture()
+def seed(db):
+    """Create a business with one review request per status: ``biz, rows = seed(["sent", "pending"])``.
+
+    Short codes run c0, c1, … across calls; contacts default to 5550000000, 5550000001, ….
+    """
+    codes = iter(range(10**6))
+
+    def create(statuses, contacts=None):
+        biz = Business(name="Test Biz", google_place_id="place123")
+        db.add(biz)
+        db.commit()
+        contacts = contacts or [f"555{n:07d}" for n in range(len(statuses))]
+        rows = [
+            ReviewRequest(
+                business_id=biz.id,
+                customer_contact=contact,
+                short_code=f"c{next(codes)}",
+                review_text="Nice",
+                status=status,
+            )
+            for status, contact in zip(statuses, contacts)
+        ]
+        db.add_all(rows)
+        db.commit()
+        return biz, rows
+
+    return create
 
 
 @pytest.fixture()
 def client(db):
     app.dependency_overrides[get_db] = lambda: db
+    app.dependency_overrides[get_read_db] = lambda: db
+    short_link_cache.clear()
+    admission.reset()
     with TestClient(app) as c:
         yield c
     app.dependency_overrides.clear()
+    short_link_cache.clear()
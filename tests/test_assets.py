@@ -0,0 +1,28 @@
+import gzip
+import json
+
+from services import assets
+
+
+def test_portal_assets_precompressed(client, tmp_path):
+    """Portal HTML is negotiated per Accept-Encoding, revalidated by ETag, and links fingerprinted CSS."""
+    plain = client.get("/portal/send", headers={"Accept-Encoding": "identity"})
+    assert plain.status_code == 200 and "content-encoding" not in plain.headers
+    assert plain.headers["cache-control"] == "no-cache"
+    assert plain.headers["vary"] == "Accept-Encoding"
+    assert "/static/style.css" not in plain.text and assets.url("style.css") in plain.text
+
+    gz = client.get("/portal/send", headers={"Accept-Encoding": "gzip, br;q=0"})
+    assert gz.headers["content-encoding"] == "gzip"
+    assert gz.text == plain.text
+    assert gz.headers["etag"] != plain.headers["etag"]
+    again = client.get("/portal/send", headers={"Accept-Encoding": "gzip, br;q=0", "If-None-Match": gz.headers["etag"]})
+    assert again.status_code == 304
+
+    css = client.get(assets.url("style.css"))
+    assert css.headers["cache-control"] == assets.IMMUTABLE
+
+    manifest = assets.build(tmp_path)
+    entry = manifest["send.html"]
+    assert gzip.decompress((tmp_path / entry["encoded"]["gzip"]).read_bytes()).decode() == plain.text
+    assert json.loads((tmp_path / "manifest.json").read_text()) == manifest
@@ -0,0 +1,131 @@
+from unittest.mock import patch
+
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+
+from services import ClickRecorder, admission, click_recorder, short_link_cache
+from services.ratelimit import KeyedRateLimiter
+
+
+def test_click_recorder_batches_and_retries(db, seed):
+    """Clicks are coalesced, survive a failed flush, and land in one batch."""
+    _, rows = seed(["sent"] * 3)
+    recorder = ClickRecorder(session_factory=sessionmaker(bind=db.get_bind()), max_batch=10, flush_interval=60)
+
+    for rr in rows + rows:
+        assert recorder.record(rr.id) is False
+    assert recorder.pending() == 3
+
+    with patch.object(recorder, "_write", side_effect=RuntimeError("db down")):
+        assert recorder.flush() == 0
+    assert recorder.pending() == 3
+
+    assert recorder.flush() == 3
+    assert recorder.pending() == 0
+    for rr in rows:
+        db.refresh(rr)
+        assert rr.status == "clicked"
+        assert rr.clicked_at is not None
+
+
+def test_cached_link_turns_clicked_only_after_the_write(client, db, seed):
+    """A failed flush leaves the cached entry "sent", so the next visit records the click again."""
+    _, (rr,) = seed(["sent"])
+    with patch.object(click_recorder, "_write", side_effect=RuntimeError("db down")):
+        assert client.get("/r/c0").status_code == 200
+    assert short_link_cache.get("c0").status == "sent"
+    db.refresh(rr)
+    assert rr.status == "sent"
+
+    assert client.get("/r/c0").status_code == 200
+    assert short_link_cache.get("c0").status == "clicked"
+    db.refresh(rr)
+    assert rr.status == "clicked"
+
+
+def test_sync_recorder_writes_before_returning(db, seed):
+    """On the serverless profile a click is committed inside ``record``."""
+    _, (rr,) = seed(["sent"])
+    written = []
+    recorder = ClickRecorder(session_factory=sessionmaker(bind=db.get_bind()), flush_interval=60, sync=True)
+
+    assert recorder.record(rr.id, on_written=lambda: written.append(rr.id)) is False
+    assert recorder.pending() == 0 and written == [rr.id]
+    db.refresh(rr)
+    assert rr.status == "clicked"
+
+
+def test_previews_and_floods_skip_the_database(client, db, seed):
+    """Link previews get a static page and are not clicks; over-limit requests are shed; neither runs SQL."""
+    _, rows = seed(["sent"] * 2)
+    statements = []
+
+    def listener(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.get_bind(), "before_cursor_execute", listener)
+    try:
+        for method, headers in (
+            ("GET", {"User-Agent": "WhatsApp/2.23.20 A"}),
+            ("GET", {"User-Agent": "Mozilla/5.0 (compatible; Googlebot/2.1; +http://www.google.com/bot.html)"}),
+            ("GET", {"User-Agent": ""}),
+            ("GET", {"User-Agent": "Mozilla/5.0 (iPhone)", "Sec-Purpose": "prefetch"}),
+            ("HEAD", {"User-Agent": "Mozilla/5.0 (iPhone)"}),
+        ):
+            resp = client.request(method, "/r/c0", headers=headers)
+            assert resp.status_code == 200, (method, headers)
+            assert resp.headers["cache-control"] == "no-store"
+            if method == "GET":
+                assert b'<a href="/r/c0?go=1" rel="nofollow">' in resp.content
+
+        with patch.object(admission, "code_limiter", KeyedRateLimiter(0.001, 2)):
+            assert client.get("/r/nope").status_code == 404
+            assert client.get("/r/nope").status_code == 404
+            shed = client.get("/r/nope")
+            assert shed.status_code == 429 and shed.headers["retry-after"] == "1"
+            # Previews don't spend a link's budget.
+            assert client.get("/r/nope", headers={"User-Agent": "TelegramBot (like TwitterBot)"}).status_code == 200
+        with patch.object(admission, "ip_limiter", KeyedRateLimiter(0.001, 1)):
+            client.get("/r/c1", headers={"User-Agent": "Slackbot-LinkExpanding 1.0"})
+            assert client.get("/r/c1").status_code == 429
+    finally:
+        event.remove(db.get_bind(), "before_cursor_execute", listener)
+
+    # Only the two admitted lookups of the unknown code reached the database.
+    assert len(statements) == 2
+    for rr in rows:
+        db.refresh(rr)
+        assert rr.status == "sent"
+
+    assert client.get("/r/c0", headers={"User-Agent": "Mozilla/5.0 (iPhone)"}).status_code == 200
+    db.refresh(rows[0])
+    assert rows[0].status == "clicked"
+
+
+def test_phones_named_like_bots_are_people(client, db, seed):
+    """CUBOT phones end their model in "bot"; they land and click like any other browser."""
+    _, rows = seed(["sent"] * 2)
+    cubot = "Mozilla/5.0 (Linux; Android 10; CUBOT X30) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0 Mobile Safari/537.36"
+    assert admission.classify("GET", {"user-agent": cubot}) is None
+    assert client.get("/r/c0", headers={"User-Agent": cubot}).status_code == 200
+    db.refresh(rows[0])
+    assert rows[0].status == "clicked"
+
+    # Anyone still taken for a preview can follow the page's link through.
+    slack = {"User-Agent": "Slackbot-LinkExpanding 1.0"}
+    assert b"go=1" in client.get("/r/c1", headers=slack).content
+    db.refresh(rows[1])
+    assert rows[1].status == "sent"
+    assert b"Link not found" not in client.get("/r/c1?go=1", headers=slack).content
+    db.refresh(rows[1])
+    assert rows[1].status == "clicked"
+    assert client.head("/r/c1?go=1").headers["cache-control"] == "no-store"
+
+
+def test_keyed_rate_limiter_is_bounded():
+    limiter = KeyedRateLimiter(0.001, 1, maxsize=2)
+    assert limiter.try_acquire("a") and not limiter.try_acquire("a")
+    assert limiter.try_acquire("b") and limiter.try_acquire("c")
+    # "a" was evicted as least recently used and starts over with a full bucket.
+    assert limiter.try_acquire("a")
+    assert KeyedRateLimiter(0).try_acquire("a")
@@ -0,0 +1,113 @@
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+from sqlalchemy import event
+
+from models import Business, ReviewRequest
+from services import check_stats, rebuild_stats
+
+
+def test_dashboard_counts_in_one_indexed_pass(client, db, seed):
+    """Counters come from business_stats; without a row, one indexed aggregation."""
+    business_id = seed(["pending", "sent", "sent", "clicked"])[0].id
+
+    for backfilled in (False, True):
+        if backfilled:
+            rebuild_stats(db)
+        executed = _capture(db, lambda: client.get("/api/dashboard", params={"business_id": business_id}))
+        stats = executed.pop("response").json()["stats"]
+        assert stats["total_sent"] == 4 and stats["total_clicked"] == 1 and stats["click_rate"] == 25.0
+        assert stats["by_status"] == {"pending": 1, "sent": 2, "clicked": 1}
+
+        statements = executed["statements"]
+        *stats_queries, (list_sql, list_params) = statements
+        if backfilled:
+            assert len(stats_queries) == 1 and "FROM business_stats" in stats_queries[0][0]
+        else:
+            count_sql, count_params = stats_queries[-1]
+            assert "COVERING INDEX ix_review_requests_business_status" in _plan(db, count_sql, count_params)
+        list_plan = _plan(db, list_sql, list_params)
+        assert "ix_review_requests_business_created" in list_plan
+        assert "TEMP B-TREE" not in list_plan
+
+
+def _capture(db, call) -> dict:
+    engine = db.get_bind()
+    statements = []
+
+    def listener(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        response = call()
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+    return {"response": response, "statements": statements}
+
+
+def _plan(db, statement, params) -> str:
+    rows = db.connection().exec_driver_sql("EXPLAIN QUERY PLAN " + statement, tuple(params))
+    return " ".join(row[-1] for row in rows)
+
+
+def test_dashboard_keyset_pages(client, db, seed):
+    business_id = seed(["sent", "clicked", "sent", "pending", "sent", "clicked", "sent"])[0].id
+    base = datetime(2024, 5, 1)
+    for rr in db.query(ReviewRequest).order_by(ReviewRequest.id):
+        # Ties on created_at are broken by id.
+        rr.created_at = base + timedelta(hours=rr.id // 2)
+    db.commit()
+    newest_first = [
+        rr.id for rr in db.query(ReviewRequest).order_by(ReviewRequest.created_at.desc(), ReviewRequest.id.desc())
+    ]
+
+    seen, cursor = [], None
+    while True:
+        params = {"business_id": business_id, "limit": 3}
+        if cursor:
+            params["cursor"] = cursor
+        data = client.get("/api/dashboard", params=params).json()
+        assert ("stats" in data) == (cursor is None)
+        seen += [r["id"] for r in data["reviews"]]
+        cursor = data["next_cursor"]
+        if not cursor:
+            break
+    assert seen == newest_first
+
+    data = client.get(
+        "/api/dashboard",
+        params={"business_id": business_id, "status": "sent,clicked", "since": "2024-05-01T01:00:00", "until": "2024-05-01T03:00:00"},
+    ).json()
+    assert [r["id"] for r in data["reviews"]] == [5, 3, 2]
+    assert data["next_cursor"] is None
+
+    assert client.get("/api/dashboard", params={"business_id": business_id, "cursor": "bogus"}).status_code == 400
+
+
+def test_counters_follow_status_changes(client, db):
+    """generate -> send -> click -> delete keeps business_stats and the daily rollup exact."""
+    with (
+        patch("routes.api.resolve_google_place", return_value={"name": "Test Biz", "place_id": "place123"}),
+        patch("routes.api.generate_review_text", return_value="Great place!"),
+        patch("routes.api.reserve_short_codes", return_value=["c1", "c2", "c3"]),
+    ):
+        reviews = client.post(
+            "/api/generate", json={"google_link": "x", "phones": ["1111111111", "2222222222", "3333333333"]}
+        ).json()["reviews"]
+    with patch("services.outbox.send_sms", return_value={"ok": True}):
+        client.post("/api/send", json={"reviews": [{"id": r["id"], "sms_body": "Hi"} for r in reviews[:2]]})
+    client.get("/r/c1")
+    client.get("/r/c1")
+
+    business_id = db.query(Business.id).scalar()
+    stats = client.get("/api/dashboard", params={"business_id": business_id}).json()["stats"]
+    assert stats["by_status"] == {"pending": 1, "sent": 1, "clicked": 1}
+    today = client.get("/api/dashboard/timeseries", params={"business_id": business_id, "days": 7}).json()["days"][-1]
+    assert today["sent"] == 2 and today["clicked"] == 1
+    assert check_stats(db) == []
+
+    client.delete(f"/api/review/{reviews[0]['id']}")
+    stats = client.get("/api/dashboard", params={"business_id": business_id}).json()["stats"]
+    assert stats["total_sent"] == 2 and stats["total_clicked"] == 0
+    assert check_stats(db) == []
@@ -0,0 +1,111 @@
+import threading
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+from starlette.testclient import TestClient
+
+import database
+from database import Base, build_engine, get_db, pool_stats
+from main import app
+from models import Business
+from services import short_code_allocator, short_link_cache
+
+
+def test_sqlite_profile_enables_wal(tmp_path):
+    engine = build_engine(f"sqlite:///{tmp_path / 'wal.db'}", "sqlite")
+    with engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+    engine.dispose()
+
+
+def test_serverless_profile_holds_no_connections(tmp_path):
+    engine = build_engine(f"sqlite:///{tmp_path / 'nullpool.db'}", "serverless")
+    assert isinstance(engine.pool, NullPool)
+    assert pool_stats(engine) == {"profile": None, "pool": "NullPool"}
+
+
+def test_pooled_profile_reports_waits_and_saturation(tmp_path, monkeypatch):
+    monkeypatch.setenv("DB_POOL_SIZE", "1")
+    monkeypatch.setenv("DB_MAX_OVERFLOW", "0")
+    monkeypatch.setenv("DB_POOL_TIMEOUT", "0.2")
+    engine = build_engine(f"sqlite:///{tmp_path / 'pooled.db'}", "pooled")
+
+    held = engine.connect()
+    assert pool_stats(engine)["saturation"] == 1.0
+    with pytest.raises(PoolTimeoutError):
+        engine.connect()
+
+    release = threading.Timer(0.1, held.close)
+    release.start()
+    with engine.connect():  # waits for the timer to hand the connection back
+        pass
+    release.join()
+
+    stats = pool_stats(engine)
+    assert stats["checkouts"] == 3 and stats["timeouts"] == 1
+    assert stats["wait_max_ms"] >= 150
+    assert stats["checked_out"] == 0 and stats["saturation"] == 0.0
+    engine.dispose()
+
+
+def test_read_replica_routing(tmp_path, monkeypatch):
+    """Reads go to the replica, fall back to the primary, and stick to it after a write."""
+    primary = build_engine(f"sqlite:///{tmp_path / 'primary.db'}", "sqlite")
+    replica = build_engine(f"sqlite:///{tmp_path / 'replica.db'}", "sqlite")
+    for engine, name in ((primary, "Primary Biz"), (replica, "Lagging Biz")):
+        Base.metadata.create_all(bind=engine)
+        with sessionmaker(bind=engine)() as db:
+            db.add(Business(name=name, google_place_id=name))
+            db.commit()
+
+    primary_sessions = sessionmaker(bind=primary)
+    monkeypatch.setattr(database, "SessionLocal", primary_sessions)
+    monkeypatch.setattr("routes.public.SessionLocal", primary_sessions)
+    monkeypatch.setattr(database, "replica_engines", [replica])
+    monkeypatch.setattr(database, "_replica_breaker", None)
+    monkeypatch.setattr(short_code_allocator, "session_factory", primary_sessions)
+    short_code_allocator.reset()
+
+    def primary_db():
+        with primary_sessions() as db:
+            yield db
+
+    app.dependency_overrides[get_db] = primary_db
+    short_link_cache.clear()
+    try:
+        client = TestClient(app)
+
+        def names():
+            return [b["name"] for b in client.get("/api/businesses").json()]
+
+        assert names() == ["Lagging Biz"]
+
+        with (
+            patch("routes.api.resolve_google_place", return_value={"name": "New Biz", "place_id": "new"}),
+            patch("routes.api.generate_review_text", return_value="Great place!"),
+        ):
+            resp = client.post("/api/generate", json={"google_link": "x", "phones": ["1234567890"]})
+        assert database.READ_YOUR_WRITES_COOKIE in resp.cookies
+        assert names() == ["New Biz", "Primary Biz"]
+
+        # A fresh browser reads the replica, which has not seen the new link yet.
+        client.cookies.clear()
+        assert names() == ["Lagging Biz"]
+        code = resp.json()["reviews"][0]["link"].rsplit("/", 1)[1]
+        assert client.get(f"/r/{code}").status_code == 200
+
+        # A dead replica is skipped in favour of the primary.
+        monkeypatch.setattr(database, "replica_engines", [build_engine(f"sqlite:///{tmp_path / 'missing' / 'x.db'}")])
+        assert names() == ["New Biz", "Primary Biz"]
+        assert database._replica_breaker.is_open("replica0")
+    finally:
+        app.dependency_overrides.clear()
+        short_link_cache.clear()
+        short_code_allocator.reset()
+        primary.dispose()
+        replica.dispose()
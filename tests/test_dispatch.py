@@ -0,0 +1,29 @@
+import threading
+import time
+from unittest.mock import patch
+
+from services import TokenBucket, dispatch_sms
+
+
+def test_dispatch_runs_concurrently():
+    """Wall time follows the concurrency setting, not the list length."""
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def slow_send(to, body, carrier=""):
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        time.sleep(0.05)
+        with lock:
+            active -= 1
+        return {"ok": True}
+
+    messages = [(str(i), "Hi") for i in range(8)]
+    with patch.dict("services.dispatch._limiters", {"twilio": TokenBucket(0), "email": TokenBucket(0)}):
+        results = dispatch_sms(messages, concurrency=4, send=slow_send)
+
+    assert results == [{"ok": True}] * 8
+    assert peak == 4
@@ -0,0 +1,80 @@
+import csv
+import io
+import json
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+from database import get_read_db
+from main import app
+from models import ReviewRequest
+from services import export_review_requests
+
+
+def test_export_streams_in_chunks(client, db, seed):
+    """CSV and NDJSON exports stream oldest first, across several fetch batches and chunks."""
+    business_id = seed(["sent", "clicked", "pending", "sent", "clicked"])[0].id
+    other, _ = seed([])
+    db.add(ReviewRequest(business_id=other.id, customer_contact="1", short_code="other", review_text="x"))
+    base = datetime(2024, 5, 1)
+    for rr in db.query(ReviewRequest).filter_by(business_id=business_id):
+        rr.created_at = base - timedelta(hours=rr.id)
+    db.commit()
+
+    with patch("services.export.YIELD_PER", 2), patch("services.export.CHUNK_BYTES", 1):
+        # The header on its own, then one chunk per row.
+        assert len(list(export_review_requests(db, business_id, "csv"))) == 6
+        resp = client.get("/api/export", params={"business_id": business_id})
+    assert resp.headers["content-type"] == "text/csv; charset=utf-8"
+    assert resp.headers["content-disposition"] == f'attachment; filename="review-requests-{business_id}.csv"'
+    records = list(csv.DictReader(io.StringIO(resp.text)))
+    assert [r["short_code"] for r in records] == ["c4", "c3", "c2", "c1", "c0"]
+    assert records[0]["created_at"] == "2024-04-30T19:00:00" and records[0]["sent_at"] == ""
+
+    resp = client.get(
+        "/api/export",
+        params={"business_id": business_id, "format": "ndjson", "status": "sent,clicked", "since": "2024-04-30T20:00:00"},
+    )
+    assert resp.headers["content-type"] == "application/x-ndjson"
+    assert [json.loads(line)["short_code"] for line in resp.text.splitlines()] == ["c3", "c1", "c0"]
+
+    assert client.get("/api/export", params={"business_id": business_id, "format": "xml"}).status_code == 400
+    assert client.get("/api/export", params={"business_id": business_id, "until": "soon"}).status_code == 400
+
+
+def test_export_session_outlives_the_body(client, db, seed):
+    """The request's session is closed only after the last chunk has been sent."""
+    business_id = seed(["sent", "clicked"])[0].id
+    events = []
+
+    def session():
+        try:
+            yield db
+        finally:
+            events.append("closed")
+
+    def chunks(*args, **kwargs):
+        for chunk in export_review_requests(*args, **kwargs):
+            events.append("chunk")
+            yield chunk
+
+    app.dependency_overrides[get_read_db] = session
+    with patch("routes.api.export_review_requests", chunks), patch("services.export.CHUNK_BYTES", 1):
+        assert client.get("/api/export", params={"business_id": business_id}).status_code == 200
+    assert events == ["chunk"] * 3 + ["closed"]
+
+
+def test_csv_export_defuses_formulas(client, db, seed):
+    """CSV cells that a spreadsheet would run as formulas get a leading quote; NDJSON is left as stored."""
+    biz, (rr,) = seed(["sent"], contacts=["+14155551234"])
+    rr.review_text = '=HYPERLINK("http://evil.example","Click")'
+    db.commit()
+
+    resp = client.get("/api/export", params={"business_id": biz.id})
+    (record,) = csv.DictReader(io.StringIO(resp.text))
+    assert record["customer_contact"] == "'+14155551234"
+    assert record["review_text"] == '\'=HYPERLINK("http://evil.example","Click")'
+    assert record["status"] == "sent"
+
+    resp = client.get("/api/export", params={"business_id": biz.id, "format": "ndjson"})
+    record = json.loads(resp.text)
+    assert record["customer_contact"] == "+14155551234" and record["review_text"].startswith("=")
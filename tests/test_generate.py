@@ -0,0 +1,42 @@
+from unittest.mock import patch
+
+from models import ReviewRequest
+from services import probe_short_codes
+
+
+def test_generate_bulk_insert_reserves_codes(client, db, seed):
+    """Codes are checked in one query per round; an insert conflict retries with fresh codes."""
+    seed(["pending"])  # takes short code c0
+
+    with patch("services.review.generate_short_code", side_effect=["c0", "new1", "new2"]):
+        assert sorted(probe_short_codes(db, 2)) == ["new1", "new2"]
+
+    with (
+        patch("routes.api.resolve_google_place", return_value={"name": "Test Biz", "place_id": "place123"}),
+        patch("routes.api.generate_review_text", return_value="Great place!"),
+        patch("routes.api.reserve_short_codes", side_effect=[["c0", "a1"], ["b1", "b2"]]),
+    ):
+        resp = client.post("/api/generate", json={"google_link": "x", "phones": ["2222222222", "3333333333"]})
+
+    assert resp.status_code == 200
+    assert [r["link"].rsplit("/", 1)[1] for r in resp.json()["reviews"]] == ["b1", "b2"]
+    rows = db.query(ReviewRequest).filter(ReviewRequest.short_code.in_(["b1", "b2"])).order_by(ReviewRequest.id).all()
+    assert [r.customer_contact for r in rows] == ["2222222222", "3333333333"]
+    assert all(r.created_at is not None for r in rows)
+
+
+def test_generate_caps_and_dedupes_phones(client, db):
+    """A number typed bare and imported in E.164 is one person; lists over the cap are refused."""
+    with (
+        patch("routes.api.resolve_google_place", return_value={"name": "Test Biz", "place_id": "place123"}),
+        patch("routes.api.generate_review_text", return_value="Great place!") as generate,
+        patch("routes.api.GENERATE_MAX_PHONES", 2),
+    ):
+        resp = client.post("/api/generate", json={"google_link": "x", "phones": ["4155551234", "+1 (415) 555-1234"]})
+        assert [r["phone"] for r in resp.json()["reviews"]] == ["4155551234"]
+        assert generate.call_count == 1
+
+        resp = client.post("/api/generate", json={"google_link": "x", "phones": ["4155551234", "4155551235", "4155551236"]})
+        assert resp.status_code == 413 and resp.json()["max_phones"] == 2
+        assert generate.call_count == 1
+    assert db.query(ReviewRequest).count() == 1
@@ -0,0 +1,59 @@
+import re
+
+from sqlalchemy import event
+
+from routes.public import _render_landing
+from services.assets import etag_for
+
+
+def test_short_link_revalidation(client, db, seed):
+    """A matching If-None-Match gets a 304 and still counts the click; assets are immutable."""
+    _, (rr,) = seed(["sent"])
+
+    etag = etag_for(_render_landing("Nice", "place123"))
+    resp = client.get("/r/c0", headers={"If-None-Match": etag})
+    assert resp.status_code == 304
+    assert resp.content == b""
+    assert resp.headers["etag"] == etag
+    assert resp.headers["cache-control"] == "no-cache"
+    db.refresh(rr)
+    assert rr.status == "clicked"
+
+    page = client.get("/r/c0")
+    assert page.status_code == 200 and page.headers["etag"] == etag
+    css = re.search(r'href="(/a/landing\.\w+\.css)"', page.text).group(1)
+    resp = client.get(css)
+    assert resp.status_code == 200
+    assert resp.headers["cache-control"] == "public, max-age=31536000, immutable"
+    assert resp.headers["content-type"].startswith("text/css")
+    assert client.get(css, headers={"If-None-Match": resp.headers["etag"]}).status_code == 304
+
+    stale = client.get("/a/landing.00000000.css")
+    assert stale.status_code == 200 and stale.headers["cache-control"] == "no-cache"
+    assert client.get("/a/send.00000000.html").status_code == 404
+
+
+def test_short_link_cache(client, db, seed):
+    """A repeat click is served from the cache; DELETE invalidates the entry."""
+    _, (rr,) = seed(["clicked"])
+    assert client.get("/r/c0").status_code == 200
+
+    statements = []
+
+    def listener(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.get_bind(), "before_cursor_execute", listener)
+    try:
+        resp = client.get("/r/c0")
+    finally:
+        event.remove(db.get_bind(), "before_cursor_execute", listener)
+    assert resp.status_code == 200
+    assert "Nice" in resp.text
+    assert statements == []
+
+    stats = client.get("/api/cache-stats").json()["short_links"]
+    assert stats["hits"] == 1 and stats["misses"] == 1
+
+    assert client.delete(f"/api/review/{rr.id}").status_code == 200
+    assert client.get("/r/c0").status_code == 404
@@ -0,0 +1,48 @@
+from unittest.mock import patch
+
+import pytest
+
+from services import send_sms
+from services.metrics import db_queries_per_request, http_request_duration, outbound_duration, sms_messages, timed
+
+
+def test_metrics_endpoint_reports_routes_and_queries(client, seed):
+    business_id = seed([])[0].id
+
+    before = http_request_duration.count("GET", "/api/dashboard", 200)
+    assert client.get("/api/dashboard", params={"business_id": business_id}).status_code == 200
+    assert client.get("/no-such-page").status_code == 404
+    assert http_request_duration.count("GET", "/api/dashboard", 200) == before + 1
+    assert db_queries_per_request.count("/api/dashboard") >= 1
+
+    with patch.dict("os.environ", {"ADMIN_TOKEN": "s3cret"}):
+        text = client.get("/metrics", headers={"Authorization": "Bearer s3cret"}).text
+    assert '# TYPE http_request_duration_seconds histogram' in text
+    assert 'http_request_duration_seconds_bucket{method="GET",route="/api/dashboard",status="200",le="+Inf"}' in text
+    # Unknown paths share one label value instead of one series per URL.
+    assert 'route="unmatched",status="404"' in text and "/no-such-page" not in text
+    assert 'db_queries_per_request_sum{route="/api/dashboard"}' in text
+    assert 'cache_hit_ratio{cache="short_links"}' in text
+
+
+def test_metrics_require_a_token_unless_public(client):
+    with patch.dict("os.environ", {"ADMIN_TOKEN": "", "METRICS_PUBLIC": ""}):
+        assert client.get("/metrics").status_code == 403
+    with patch.dict("os.environ", {"ADMIN_TOKEN": "s3cret", "METRICS_PUBLIC": ""}):
+        assert client.get("/metrics").status_code == 401
+        assert client.get("/metrics", headers={"Authorization": "Bearer s3cret"}).status_code == 200
+    with patch.dict("os.environ", {"ADMIN_TOKEN": "", "METRICS_PUBLIC": "1"}):
+        assert client.get("/metrics").status_code == 200
+
+
+def test_outbound_and_sms_metrics():
+    before = outbound_duration.count("places", "search_text", "error")
+    with pytest.raises(ConnectionError):
+        with timed("places", "search_text"):
+            raise ConnectionError("down")
+    assert outbound_duration.count("places", "search_text", "error") == before + 1
+
+    before = sms_messages.value("email", "error")
+    with patch.dict("os.environ", {"SMS_BACKEND": "email"}):
+        assert send_sms("5551234567", "hi")["ok"] is False
+    assert sms_messages.value("email", "error") == before + 1
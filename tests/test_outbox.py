@@ -0,0 +1,109 @@
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+from models import OutboxMessage, SendJob
+from services import TTLCache, enqueue_send, outbox_worker, short_link_cache
+from services.outbox import _existing_job
+
+
+def test_send_enqueues_job(client, db, seed):
+    """POST /api/send returns a job id; the job reports per-recipient results."""
+    _, rows = seed(["pending"] * 3, contacts=["1111111111", "2222222222", "3333333333"])
+
+    def fake_send(to, body, carrier=""):
+        return {"ok": False, "error": "carrier rejected"} if to == "2222222222" else {"ok": True}
+
+    payload = {"reviews": [{"id": rr.id, "sms_body": "Hi", "review_text": "New"} for rr in rows] + [{"id": 999}]}
+    with (
+        patch("services.outbox.send_sms", side_effect=fake_send) as send,
+        patch.object(outbox_worker, "max_attempts", 1),
+    ):
+        resp = client.post("/api/send", json=payload, headers={"Idempotency-Key": "batch-1"})
+        again = client.post("/api/send", json=payload, headers={"Idempotency-Key": "batch-1"})
+
+    assert resp.status_code == 202
+    assert again.json()["job_id"] == resp.json()["job_id"]
+    assert send.call_count == 3
+
+    job = client.get(f"/api/jobs/{resp.json()['job_id']}").json()
+    assert job["status"] == "done"
+    assert job["sent"] == ["1111111111", "3333333333"]
+    assert job["failed"] == ["2222222222"]
+    assert job["errors"] == ["2222222222: carrier rejected"]
+
+    statuses = {}
+    for rr in rows:
+        db.refresh(rr)
+        assert rr.review_text == "New"
+        statuses[rr.customer_contact] = rr.status
+    # Only delivered messages mark the review as sent.
+    assert statuses == {"1111111111": "sent", "2222222222": "pending", "3333333333": "sent"}
+
+
+def test_outbox_retries_with_backoff(client, db, seed):
+    """A failed send is retried once its backoff has elapsed."""
+    _, (rr,) = seed(["pending"])
+    with patch("services.outbox.send_sms", return_value={"ok": False, "error": "timeout"}):
+        client.post("/api/send", json={"reviews": [{"id": rr.id, "sms_body": "Hi"}]})
+
+    msg = db.query(OutboxMessage).one()
+    assert (msg.status, msg.attempts, msg.last_error) == ("pending", 1, "timeout")
+    assert outbox_worker.process_batch() == 0  # still backing off
+
+    later = datetime.now(timezone.utc) + timedelta(hours=1)
+    with patch("services.outbox.send_sms", return_value={"ok": True}):
+        assert outbox_worker.process_batch(now=later) == 1
+    db.refresh(msg)
+    db.refresh(rr)
+    assert (msg.status, msg.attempts) == ("sent", 2)
+    assert rr.status == "sent"
+
+
+def test_worker_in_another_process_sees_no_stale_link(client, db, seed):
+    """A link opened while pending isn't cached, so a worker elsewhere marking it sent needs no invalidation."""
+    _, (rr,) = seed(["pending"])
+    assert client.get("/r/c0").status_code == 200
+    assert short_link_cache.get("c0") is None
+
+    enqueue_send(db, [{"id": rr.id, "sms_body": "Hi"}])
+    # The worker of a standalone "python -m services.outbox" has a cache of its own.
+    with (
+        patch("services.outbox.short_link_cache", TTLCache()),
+        patch("services.outbox.send_sms", return_value={"ok": True}),
+    ):
+        assert outbox_worker.process_batch() == 1
+    db.refresh(rr)
+    assert rr.status == "sent"
+
+    assert client.get("/r/c0").status_code == 200
+    db.refresh(rr)
+    assert rr.status == "clicked"
+
+
+def test_racing_sends_with_one_key_share_a_job(client, db, seed):
+    """A send that loses the race on its idempotency key returns the winner's job."""
+    _, (rr,) = seed(["pending"])
+    first = enqueue_send(db, [{"id": rr.id, "sms_body": "Hi"}], idempotency_key="batch-1")
+    # The second request looked the key up before the first one committed.
+    lookups = []
+
+    def lookup(db, key):
+        lookups.append(key)
+        return None if len(lookups) == 1 else _existing_job(db, key)
+
+    with patch("services.outbox._existing_job", side_effect=lookup):
+        second = enqueue_send(db, [{"id": rr.id, "sms_body": "Hi"}], idempotency_key="batch-1")
+    assert second.id == first.id and len(lookups) == 2
+    assert db.query(SendJob).count() == 1
+    assert db.query(OutboxMessage).count() == 1
+
+
+def test_drain_requires_cron_secret(client, monkeypatch):
+    monkeypatch.delenv("CRON_SECRET", raising=False)
+    assert client.get("/api/outbox/drain").status_code == 403
+
+    monkeypatch.setenv("CRON_SECRET", "s3cret")
+    assert client.get("/api/outbox/drain").status_code == 401
+    with patch.object(outbox_worker, "drain", return_value=0):
+        resp = client.get("/api/outbox/drain", headers={"Authorization": "Bearer s3cret"})
+    assert resp.json() == {"processed": 0}
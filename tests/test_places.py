@@ -0,0 +1,183 @@
+import asyncio
+import json
+import threading
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+import httpx
+from sqlalchemy.exc import OperationalError
+
+from models import Business, PlaceCacheEntry
+from services import google_places, places_cache, resolve_google_place, resolve_google_place_async
+from services.circuit import CircuitBreaker
+from services.google_places import _find_maps_url_in_html, _read_html
+from services.places_cache import MISS
+from services.places_cache import get as cached_place
+
+SHORT = "https://maps.app.goo.gl/AbC123"
+FULL = "https://www.google.com/maps/place/Test+Biz/data=!1sChIJabc123"
+
+
+def test_place_resolution_is_cached(db):
+    """A repeat lookup never leaves the process; the table survives a memory flush."""
+    places_cache.clear()
+    with (
+        patch.dict("os.environ", {"GOOGLE_MAPS_API_KEY": "k"}),
+        patch("services.google_places._follow_redirects", return_value=FULL) as follow,
+        patch("services.google_places._get_place_name", return_value="Test Biz") as details,
+    ):
+        first = resolve_google_place(SHORT + "?utm_source=sms", db=db)
+        assert resolve_google_place(SHORT, db=db) == first
+        assert follow.call_count == 1 and details.call_count == 1
+
+        places_cache.clear()
+        assert resolve_google_place(SHORT, db=db) == {"name": "Test Biz", "place_id": "ChIJabc123"}
+        assert follow.call_count == 1
+
+        # A different short link to the same place skips the Details call.
+        resolve_google_place("https://maps.app.goo.gl/Other", db=db)
+        assert follow.call_count == 2 and details.call_count == 1
+    places_cache.clear()
+
+
+def test_negative_cache_and_purge(client, db):
+    places_cache.clear()
+    with (
+        patch.dict("os.environ", {"GOOGLE_MAPS_API_KEY": "k"}),
+        patch("services.google_places._find_place_from_text", return_value=None) as search,
+    ):
+        assert resolve_google_place("Nowhere Cafe", db=db) is None
+        assert resolve_google_place("  nowhere   cafe ", db=db) is None
+        assert search.call_count == 1
+
+        row = db.get(PlaceCacheEntry, "input:nowhere cafe")
+        assert row is not None and row.place_id is None
+
+        with patch.dict("os.environ", {"ADMIN_TOKEN": ""}):
+            assert client.delete("/api/place-cache", params={"target": "Nowhere Cafe"}).status_code == 403
+        with patch.dict("os.environ", {"ADMIN_TOKEN": "s3cret"}):
+            assert client.delete("/api/place-cache", params={"target": "Nowhere Cafe"}).status_code == 401
+            resp = client.delete(
+                "/api/place-cache", params={"target": "Nowhere Cafe"}, headers={"Authorization": "Bearer s3cret"}
+            )
+        assert resp.json() == {"ok": True, "removed": 1}
+        resolve_google_place("Nowhere Cafe", db=db)
+        assert search.call_count == 2
+    places_cache.clear()
+
+
+def test_keyless_results_are_not_cached(db):
+    """Without an API key the name is a placeholder; it must not outlive the missing key."""
+    places_cache.clear()
+    link = "https://www.google.com/maps?place_id=ChIJabc123"
+    with (
+        patch.dict("os.environ", {"GOOGLE_MAPS_API_KEY": ""}),
+        patch("services.google_places._follow_redirects", return_value=None),
+    ):
+        assert resolve_google_place(link, db=db) == {"name": "Business", "place_id": "ChIJabc123"}
+    assert db.query(PlaceCacheEntry).count() == 0
+
+    with (
+        patch.dict("os.environ", {"GOOGLE_MAPS_API_KEY": "k"}),
+        patch("services.google_places._follow_redirects", return_value=None),
+        patch("services.google_places._get_place_name", return_value="Test Biz"),
+    ):
+        assert resolve_google_place(link, db=db) == {"name": "Test Biz", "place_id": "ChIJabc123"}
+    places_cache.clear()
+
+
+def test_failed_cache_lookup_leaves_the_session_usable(db):
+    """A DB error reading the cache is a miss, and its transaction is rolled back."""
+    places_cache.clear()
+    with (
+        patch.object(db, "get", side_effect=OperationalError("SELECT", {}, Exception("aborted"))),
+        patch.object(db, "rollback", wraps=db.rollback) as rollback,
+    ):
+        assert cached_place("input:anything", db) is MISS
+    assert rollback.call_count == 1
+    db.add(Business(name="Still works", google_place_id="p1"))
+    db.commit()
+
+
+def test_maps_url_extraction_fixtures():
+    """The compiled extractor returns the saved result for every share-page fixture."""
+    fixtures = Path(__file__).parent.parent / "benchmarks" / "fixtures" / "share_pages"
+    expected = json.loads((fixtures / "expected.json").read_text(encoding="utf-8"))
+    assert expected
+    for name, url in expected.items():
+        body = (fixtures / f"{name}.html").read_text(encoding="utf-8")
+        assert _find_maps_url_in_html(body) == url, name
+
+
+def test_read_html_stops_at_first_strong_match():
+    class FakeResponse:
+        encoding = "utf-8"
+        chunks_read = 0
+
+        def iter_content(self, chunk_size):
+            head = b'<head><meta property="og:url" content="https://www.google.com/maps/place/X">'
+            for chunk in [head] + [b"x" * chunk_size] * 20:
+                self.chunks_read += 1
+                yield chunk
+
+    resp = FakeResponse()
+    assert "maps/place/X" in _read_html(resp)
+    assert resp.chunks_read == 1
+
+
+def test_async_resolution_over_shared_client():
+    """The async path follows the share link and calls Places on the injected client."""
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request.url.path)
+        if request.url.host == "maps.app.goo.gl":
+            return httpx.Response(302, headers={"Location": FULL})
+        if request.url.host == "www.google.com":
+            return httpx.Response(200, text="<html></html>")
+        assert request.headers["X-Goog-Api-Key"] == "k"
+        return httpx.Response(200, json={"displayName": {"text": "Async Biz"}})
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            with patch("services.google_places.get_async_client", return_value=client):
+                return await resolve_google_place_async(SHORT)
+
+    places_cache.clear()
+    with patch.dict("os.environ", {"GOOGLE_MAPS_API_KEY": "k", "PLACES_API_BASE": "https://places.test/v1"}):
+        assert asyncio.run(run()) == {"name": "Async Biz", "place_id": "ChIJabc123"}
+    assert seen[-1] == "/v1/places/ChIJabc123"
+    places_cache.clear()
+
+
+def test_hedged_redirect_returns_first_maps_url():
+    """The slow strategy is cancelled once the other one finds the Maps URL."""
+    cancelled = []
+    bot_done = threading.Event()
+
+    def fake_strategy(url, label, headers, deadline, cancel):
+        if label == "bot":
+            cancelled.append(cancel.wait(2))
+            bot_done.set()
+            return None
+        return FULL
+
+    with patch("services.google_places._try_strategy", side_effect=fake_strategy):
+        start = time.monotonic()
+        assert google_places._follow_redirects(SHORT) == FULL
+        assert time.monotonic() - start < 1
+    assert bot_done.wait(2) and cancelled == [True]
+
+
+def test_redirect_circuit_breaker_fails_fast():
+    with (
+        patch("services.google_places.redirect_breaker", CircuitBreaker(threshold=2, cooldown=60)),
+        patch("services.google_places._try_strategy", side_effect=ConnectionError("down")) as attempt,
+    ):
+        assert google_places._follow_redirects(SHORT) is None
+        assert google_places._follow_redirects(SHORT) is None
+        assert attempt.call_count == 4  # both UAs, twice
+
+        assert google_places._follow_redirects("https://maps.app.goo.gl/Other") is None
+        assert attempt.call_count == 4
@@ -0,0 +1,58 @@
+import io
+import json
+from unittest.mock import patch
+
+import pytest
+
+from services import normalize_us_phone
+
+
+def _events(resp) -> list[dict]:
+    return [json.loads(line) for line in resp.text.splitlines()]
+
+
+def test_normalize_us_phone():
+    assert normalize_us_phone("(415) 555-1234") == "4155551234"
+    assert normalize_us_phone("+1 415.555.1234") == "4155551234"
+    assert normalize_us_phone("555-1234") is None
+    assert normalize_us_phone("2415551234 9") is None
+
+
+def test_import_csv_streams_batches_and_row_errors(client):
+    """Header column is found, numbers are normalized and de-duplicated, bad rows are reported."""
+    rows = ["Name,Mobile"] + [f"c{i},(415) 555-{i % 3:04d}" for i in range(6)] + ["x,555-12", ",", "y,"]
+    with patch("services.recipients.BATCH", 2):
+        resp = client.post("/api/recipients/import", files={"file": ("list.csv", "\n".join(rows), "text/csv")})
+
+    assert resp.status_code == 200
+    assert resp.headers["content-type"] == "application/x-ndjson"
+    events = _events(resp)
+    assert [e["phones"] for e in events if "phones" in e] == [["+14155550000", "+14155550001"], ["+14155550002"]]
+    assert [(e["row"], e["error"]) for e in events if "error" in e] == [
+        (8, "Invalid US phone number: 555-12"),
+        (10, "Missing phone number"),
+    ]
+    assert events[-1] == {"done": True, "rows": 8, "valid": 3, "duplicates": 3, "invalid": 2}
+
+
+def test_import_without_header_and_bad_types(client):
+    resp = client.post("/api/recipients/import", files={"file": ("list.txt", b"\xef\xbb\xbfref1,4155551234\nref2,4155551234\n")})
+    assert _events(resp)[-1] == {"done": True, "rows": 2, "valid": 1, "duplicates": 1, "invalid": 0}
+
+    resp = client.post("/api/recipients/import", files={"file": ("list.pdf", b"%PDF", "application/pdf")})
+    assert resp.status_code == 400
+
+
+def test_import_xlsx(client):
+    openpyxl = pytest.importorskip("openpyxl")
+    workbook = openpyxl.Workbook()
+    for row in (["Customer", "Phone"], ["a", 4155551234], ["b", 4155551234.0], ["c", "n/a"]):
+        workbook.active.append(row)
+    data = io.BytesIO()
+    workbook.save(data)
+
+    resp = client.post("/api/recipients/import", files={"file": ("list.xlsx", data.getvalue())})
+    events = _events(resp)
+    assert events[0] == {"row": 4, "value": "n/a", "error": "Invalid US phone number: n/a"}
+    assert events[1] == {"phones": ["+14155551234"]}
+    assert events[-1]["done"] is True
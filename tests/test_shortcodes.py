@@ -0,0 +1,32 @@
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+
+from services.shortcodes import DOMAIN, CodePermutation, SequenceAllocator
+
+
+def test_sequence_allocator_unique_across_workers(db):
+    """Two allocators sharing the counter never hand out the same code, and never query review_requests."""
+    permutation = CodePermutation(b"test key")
+    for n in (0, 1, 12345, DOMAIN - 1):
+        code = permutation.encode(n)
+        assert len(code) == 7 and permutation.decode(code) == n
+    assert CodePermutation(b"other key").encode(12345) != permutation.encode(12345)
+
+    statements = []
+
+    def listener(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.get_bind(), "before_cursor_execute", listener)
+    try:
+        workers = [SequenceAllocator(sessionmaker(bind=db.get_bind()), block_size=64) for _ in range(2)]
+        codes = []
+        for i in range(50):
+            codes += workers[i % 2].allocate(db, 7)
+    finally:
+        event.remove(db.get_bind(), "before_cursor_execute", listener)
+
+    assert len(codes) == len(set(codes)) == 350
+    assert not any("review_requests" in s for s in statements)
+    # 350 codes from 64-code blocks: a handful of block reservations, not one per code.
+    assert sum("UPDATE short_code_sequence" in s for s in statements) <= 8
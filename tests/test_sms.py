@@ -0,0 +1,165 @@
+import asyncio
+import smtplib
+import socket
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from services import send_sms_async, sms
+from services.smtp_pool import SMTPPool
+
+
+class FakeSMTP:
+    """Stand-in for smtplib.SMTP that records connections and deliveries."""
+
+    instances: list["FakeSMTP"] = []
+    drop_next = False
+
+    def __init__(self, host, port, timeout=None):
+        self.sent: list[str] = []
+        self.closed = False
+        FakeSMTP.instances.append(self)
+
+    def starttls(self):
+        pass
+
+    def login(self, user, password):
+        pass
+
+    def noop(self):
+        return (250, b"OK")
+
+    def sendmail(self, from_addr, to, msg):
+        if FakeSMTP.drop_next:
+            FakeSMTP.drop_next = False
+            raise smtplib.SMTPServerDisconnected("gone")
+        self.sent.append(to)
+
+    def quit(self):
+        self.closed = True
+
+    close = quit
+
+
+def test_smtp_pool_reuses_sessions():
+    """Sessions are reused, retired after max_messages, and rebuilt after a drop."""
+    FakeSMTP.instances = []
+    with patch("services.smtp_pool.smtplib.SMTP", FakeSMTP):
+        pool = SMTPPool("localhost", 1025, "user", "pw", size=2, max_messages=3)
+        for i in range(5):
+            pool.sendmail("me@example.com", f"{i}@example.com", "hi")
+        assert pool.connects == 2
+        assert [len(s.sent) for s in FakeSMTP.instances] == [3, 2]
+        assert FakeSMTP.instances[0].closed
+
+        FakeSMTP.drop_next = True
+        pool.sendmail("me@example.com", "retry@example.com", "hi")
+        assert pool.connects == 3
+        assert FakeSMTP.instances[-1].sent == ["retry@example.com"]
+
+
+def test_smtp_pool_against_a_real_server():
+    """Over real sockets: one session for many messages, NOOP before reusing an idle one, reconnect after a drop."""
+    aiosmtpd_controller = pytest.importorskip("aiosmtpd.controller")
+
+    class Handler:
+        def __init__(self):
+            self.delivered: list[str] = []
+            self.noops = 0
+
+        async def handle_DATA(self, server, session, envelope):
+            self.delivered += envelope.rcpt_tos
+            return "250 OK"
+
+        async def handle_NOOP(self, server, session, envelope, arg):
+            self.noops += 1
+            return "250 OK"
+
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    handler = Handler()
+
+    def start():
+        server = aiosmtpd_controller.Controller(handler, hostname="127.0.0.1", port=port)
+        server.start()
+        return server
+
+    server = start()
+    pool = SMTPPool("127.0.0.1", port, "", "", size=1, starttls=False, idle_check=3600)
+    try:
+        for i in range(3):
+            pool.sendmail("me@example.com", f"{i}@example.com", "hi")
+        assert pool.connects == 1 and handler.noops == 0
+
+        # Idle past idle_check: the session is checked with NOOP and reused.
+        pool.idle_check = 0
+        pool.sendmail("me@example.com", "3@example.com", "hi")
+        assert pool.connects == 1 and handler.noops == 1
+
+        # The server goes away under an idle session that isn't checked: the send reconnects.
+        server.stop()
+        server = start()
+        pool.idle_check = 3600
+        pool.sendmail("me@example.com", "4@example.com", "hi")
+        assert pool.connects == 2
+
+        # Same with the check on: the failed NOOP discards the session first.
+        server.stop()
+        server = start()
+        pool.idle_check = 0
+        pool.sendmail("me@example.com", "5@example.com", "hi")
+        assert pool.connects == 3
+        assert handler.delivered == [f"{i}@example.com" for i in range(6)]
+    finally:
+        pool.close()
+        server.stop()
+
+
+def test_twilio_client_is_reused():
+    """One Twilio client serves every message until the credentials change."""
+    env = {
+        "TWILIO_ACCOUNT_SID": "AC1",
+        "TWILIO_AUTH_TOKEN": "tok",
+        "TWILIO_FROM_NUMBER": "+15550000000",
+        "TWILIO_MESSAGING_SERVICE_SID": "",
+    }
+    sms._twilio_backend = None
+    with patch.dict("os.environ", env), patch("twilio.rest.Client") as client_cls:
+        for _ in range(3):
+            assert sms._send_via_twilio("+15551112222", "Hi") == {"ok": True}
+        assert client_cls.call_count == 1
+        client_cls.return_value.messages.create.assert_called_with(body="Hi", from_="+15550000000", to="+15551112222")
+
+        with patch.dict("os.environ", {"TWILIO_AUTH_TOKEN": "rotated", "TWILIO_MESSAGING_SERVICE_SID": "MG1"}):
+            assert sms._send_via_twilio("+15551112222", "Hi") == {"ok": True}
+        assert client_cls.call_count == 2
+        client_cls.return_value.messages.create.assert_called_with(body="Hi", messaging_service_sid="MG1", to="+15551112222")
+    sms._twilio_backend = None
+
+
+def test_async_twilio_send_posts_to_rest_api():
+    requests_seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests_seen.append(request)
+        return httpx.Response(201, json={"sid": "SM1"})
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            with patch("services.http.get_async_client", return_value=client):
+                return await send_sms_async("+15551112222", "Hi")
+
+    env = {
+        "SMS_BACKEND": "twilio",
+        "TWILIO_ACCOUNT_SID": "AC1",
+        "TWILIO_AUTH_TOKEN": "tok",
+        "TWILIO_FROM_NUMBER": "+15550000000",
+        "TWILIO_MESSAGING_SERVICE_SID": "",
+    }
+    with patch.dict("os.environ", env):
+        assert asyncio.run(run()) == {"ok": True}
+    req = requests_seen[0]
+    assert req.url.path == "/2010-04-01/Accounts/AC1/Messages.json"
+    assert b"From=%2B15550000000" in req.content